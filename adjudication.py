@@ -0,0 +1,309 @@
+"""Round adjudication rules for Reaction Duel, plus a what-if re-scorer.
+
+reaction_duel.py decides every live round with adjudicate_ns() and scores it
+with apply_round(), so the rules here are exactly the rules the game plays by. Running this file re-scores rounds
+exported with `reaction_duel.py --export` under alternate rule variants and
+reports which match winners would change:
+
+    python adjudication.py exports/ --variant wide_tie:eps=0.002 --variant trap_all:trap=all
+
+No pygame import here on purpose: worker processes import this module, and
+importing the game would open a window in each of them.
+"""
+import argparse
+import csv
+import glob
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# status column codes used by the round export
+STATUS_CODES = {"winner": 0, "tie": 1, "fault": 2, "no_response": 3, "false_start": 4}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+# Round timing is integer nanoseconds end to end; floats only at the edges
+NS_PER_SECOND = 1_000_000_000
+
+
+def to_ns(seconds):
+    return None if seconds is None else round(seconds * NS_PER_SECOND)
+
+
+class Rules:
+    """One rule set.
+
+    eps: presses closer than this (seconds) count as an exact tie
+    trap_penalty: "slowest" faults only the last presser on a trap GO,
+                  "all" faults everyone who pressed
+    false_start_penalty: points deducted for pressing before GO
+    """
+
+    def __init__(self, name="current", eps=0.0006, trap_penalty="slowest", false_start_penalty=1):
+        if trap_penalty not in ("slowest", "all"):
+            raise ValueError(f"unknown trap_penalty {trap_penalty!r}")
+        self.name = name
+        self.eps = eps
+        self.eps_ns = to_ns(eps)
+        self.trap_penalty = trap_penalty
+        self.false_start_penalty = false_start_penalty
+
+    def __repr__(self):
+        return (f"Rules({self.name!r}, eps={self.eps}, trap_penalty={self.trap_penalty!r}, "
+                f"false_start_penalty={self.false_start_penalty})")
+
+    @classmethod
+    def parse(cls, spec):
+        """Build rules from 'name:eps=0.001,trap=all,fs=0'."""
+        name, _, opts = spec.partition(":")
+        kwargs = {}
+        for opt in filter(None, opts.split(",")):
+            key, _, value = opt.partition("=")
+            if key == "eps":
+                kwargs["eps"] = float(value)
+            elif key == "trap":
+                kwargs["trap_penalty"] = value
+            elif key == "fs":
+                kwargs["false_start_penalty"] = int(value)
+            else:
+                raise ValueError(f"unknown rule option {key!r} in {spec!r}")
+        return cls(name, **kwargs)
+
+
+DEFAULT_RULES = Rules()
+
+
+def adjudicate(player_times, is_trap, rules=DEFAULT_RULES):
+    """Decide a round from per-player press times in seconds (None = no press).
+
+    Returns (status, players, reaction_time) like reaction_phase.
+    """
+    status, players, t = adjudicate_ns([to_ns(t) for t in player_times], is_trap, rules)
+    return status, players, None if t is None else t / NS_PER_SECOND
+
+
+def adjudicate_ns(player_ns, is_trap, rules=DEFAULT_RULES):
+    """adjudicate() on integer nanosecond press times; reaction_time is in ns.
+
+    This is what the live game and the re-scorer both call, so tie checks are
+    exact integer comparisons rather than float differences.
+    """
+    eps = rules.eps_ns
+    pressed = [(i, t) for i, t in enumerate(player_ns) if t is not None]
+    if not pressed:
+        return ("no_response", None, None)
+    if is_trap:
+        # Trap round: anyone who pressed gets a fault
+        if len(pressed) == 1:
+            return ("fault", [pressed[0][0]], pressed[0][1])
+        max_time = max(t for _, t in pressed)
+        if rules.trap_penalty == "all":
+            return ("fault", [i for i, _ in pressed], max_time)
+        # Multiple faulted: find slowest (last to press loses point)
+        slowest = [i for i, t in pressed if abs(t - max_time) < eps]
+        if len(slowest) > 1:
+            return ("tie", None, None)
+        return ("fault", slowest, max_time)
+    # Safe green round: determine fastest
+    min_time = min(t for _, t in pressed)
+    fastest = [i for i, t in pressed if abs(t - min_time) < eps]
+    if len(fastest) > 1:
+        return ("tie", None, None)
+    return ("winner", fastest, min_time)
+
+
+def apply_round(scores, status, players, rules=DEFAULT_RULES):
+    """Update scores in place for an adjudicated round."""
+    if status == "winner":
+        for p in players:
+            scores[p] += 1
+    elif status == "fault":
+        for p in players:
+            scores[p] = max(0, scores[p] - 1)
+    elif status == "false_start":
+        for p in players:
+            scores[p] = max(0, scores[p] - rules.false_start_penalty)
+
+
+def match_winners(scores):
+    best = max(scores)
+    return tuple(i for i, s in enumerate(scores) if s == best)
+
+
+def replay_match(match, rules):
+    """Re-score one match prepared by group_matches().
+
+    Play stops as soon as someone reaches points_to_win, like the game. If
+    nobody does (a different rule made the match longer than what was
+    recorded) the leader at the end of the data wins and finished is False.
+    """
+    num_players, target, rounds = match
+    scores = [0] * num_players
+    played = 0
+    for status, players, is_trap, times in rounds:
+        played += 1
+        if status != "false_start":
+            status, players, _ = adjudicate_ns(times, is_trap, rules)
+        apply_round(scores, status, players, rules)
+        if max(scores) >= target:
+            return match_winners(scores), scores, played, True
+    return match_winners(scores), scores, played, False
+
+
+def _replay_shard(args):
+    """Worker: replay a list of matches under every variant."""
+    matches, variants = args
+    out = []
+    for key, match in matches:
+        out.append((key, [replay_match(match, rules) for rules in variants]))
+    return out
+
+
+def load_rounds(path):
+    """Yield exported round rows (dicts) from a file or an export directory."""
+    if os.path.isdir(path):
+        files = sorted(glob.glob(os.path.join(path, "rounds-*")))
+    else:
+        files = [path]
+    for file_path in files:
+        # rounds-<session>[-<chunk>].<ext>
+        session = os.path.basename(file_path).split(".")[0][len("rounds-"):][:15]
+        if file_path.endswith(".csv"):
+            with open(file_path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    row["session"] = session
+                    yield row
+        elif file_path.endswith(".npz"):
+            import numpy
+            with numpy.load(file_path) as data:
+                names = list(data.files)
+                columns = [data[n].tolist() for n in names]
+            for values in zip(*columns):
+                row = dict(zip(names, values))
+                row["session"] = session
+                yield row
+        elif file_path.endswith(".parquet"):
+            import pyarrow.parquet
+            table = pyarrow.parquet.read_table(file_path)
+            for row in table.to_pylist():
+                row["session"] = session
+                yield row
+
+
+def group_matches(rows):
+    """Group exported rows into [((session, match), match)] for replay_match.
+
+    Rows are parsed once here into compact (status, players, is_trap, times)
+    tuples (times in integer nanoseconds) so replaying many variants (and
+    shipping shards to worker processes) stays cheap.
+    """
+    grouped = {}
+    for row in rows:
+        grouped.setdefault((row["session"], int(row["match"])), []).append(row)
+    matches = []
+    for key, rows in grouped.items():
+        rows.sort(key=lambda r: int(r["round"]))
+        num_players = int(rows[0]["num_players"])
+        rounds = []
+        for row in rows:
+            status = STATUS_NAMES.get(int(row["status"]), "no_response")
+            mask = int(row["players_mask"])
+            players = [i for i in range(num_players) if mask >> i & 1]
+            # presses after the live decision were kept for stats; never replayed
+            late = int(row.get("late_mask", 0) or 0)
+            times = []
+            for i in range(num_players):
+                t = float(row[f"p{i+1}_time"])
+                times.append(None if math.isnan(t) or late >> i & 1 else to_ns(t))
+            rounds.append((status, players, int(row["go_color"]) != 0, tuple(times)))
+        matches.append((key, (num_players, int(rows[0]["points_to_win"]), rounds)))
+    return matches
+
+
+def readjudicate(matches, variants, workers=None, shard_size=None):
+    """Replay every match under baseline + variants across a process pool.
+
+    Returns {key: [result for DEFAULT_RULES, result for each variant]} where a
+    result is (winners, scores, rounds played, finished).
+
+    Only presses that counted live are replayed. A live round is decided once
+    no key still up could beat the earliest (compensated) press; presses
+    after that are exported for the stats (late_mask) but left out here, so
+    trap=all can only fault players who pressed before the decision, and an
+    eps wider than that settle time can't find ties with later presses.
+    """
+    rule_sets = [DEFAULT_RULES] + list(variants)
+    workers = workers or os.cpu_count() or 1
+    if shard_size is None:
+        shard_size = max(1, len(matches) // (workers * 4))
+    shards = [(matches[i:i + shard_size], rule_sets) for i in range(0, len(matches), shard_size)]
+    results = {}
+    if workers == 1 or len(shards) <= 1:
+        for shard in shards:
+            results.update(_replay_shard(shard))
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for shard_results in pool.map(_replay_shard, shards):
+            results.update(shard_results)
+    return results
+
+
+def report(results, variants, out=sys.stdout):
+    """Print, per variant, how many match winners change versus current rules."""
+    total = len(results)
+    out.write(f"{total} matches re-scored\n")
+    out.write("(only presses captured before each live window closed are replayed; "
+              "see readjudicate)\n")
+    for v_idx, rules in enumerate(variants, start=1):
+        changed = []
+        unfinished = 0
+        for key, per_rule in sorted(results.items()):
+            base = per_rule[0]
+            alt = per_rule[v_idx]
+            if not alt[3]:
+                unfinished += 1
+            if alt[0] != base[0]:
+                changed.append((key, base, alt))
+        out.write(f"\n{rules}\n")
+        out.write(f"  winner changed in {len(changed)}/{total} matches"
+                  f" ({unfinished} would not have finished in the recorded rounds)\n")
+        for (session, match), base, alt in changed[:20]:
+            base_w = ",".join(f"P{p+1}" for p in base[0])
+            alt_w = ",".join(f"P{p+1}" for p in alt[0])
+            out.write(f"    {session} match {match}: {base_w} -> {alt_w}  scores {base[1]} -> {alt[1]}\n")
+        if len(changed) > 20:
+            out.write(f"    ... {len(changed) - 20} more\n")
+
+
+DEFAULT_VARIANTS = [
+    "tie_2ms:eps=0.002",
+    "tie_5ms:eps=0.005",
+    "trap_all:trap=all",
+    "no_false_start_penalty:fs=0",
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score exported rounds under alternate rules.")
+    parser.add_argument("path", help="export directory or a single rounds-* file")
+    parser.add_argument("--variant", action="append", default=[],
+                        help="name:eps=SECONDS,trap=slowest|all,fs=POINTS (repeatable)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    variants = [Rules.parse(spec) for spec in (args.variant or DEFAULT_VARIANTS)]
+    start = time.perf_counter()
+    matches = group_matches(load_rounds(args.path))
+    loaded = time.perf_counter()
+    results = readjudicate(matches, variants, args.workers)
+    done = time.perf_counter()
+    report(results, variants)
+    rounds = sum(len(m[2]) for _, m in matches)
+    print(f"\nloaded {rounds} rounds in {loaded - start:.2f}s, "
+          f"re-scored {len(variants) + 1} rule sets in {done - loaded:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
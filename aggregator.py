@@ -0,0 +1,224 @@
+"""Results aggregator for many Reaction Duel cabinets.
+
+Cabinets started with `reaction_duel.py --upload=http://HOST:9480/ingest` POST
+gzip JSON batches of finished rounds and matches here. Every record has a
+globally unique id and is stored with INSERT OR IGNORE, and every batch is
+remembered by its Idempotency-Key, so a batch retried after a timeout is
+acknowledged without being counted twice.
+
+    python aggregator.py --db results.db --port 9480
+    python aggregator.py --host 0.0.0.0     # accept cabinets from other hosts
+    python aggregator.py --bench 50000     # loopback ingest benchmark
+
+Each batch is one SQLite transaction (WAL, synchronous=NORMAL), which keeps
+ingest well above thousands of records per second on modest hardware. No
+pygame import here; this runs on a server.
+"""
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    id TEXT PRIMARY KEY,
+    cabinet TEXT, session TEXT, match INTEGER, round INTEGER,
+    status TEXT, players TEXT, reaction_time REAL, trap INTEGER,
+    scores TEXT, times TEXT, ts REAL
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id TEXT PRIMARY KEY,
+    cabinet TEXT, session TEXT, match INTEGER,
+    scores TEXT, winners TEXT, ts REAL
+);
+CREATE TABLE IF NOT EXISTS batches (
+    key TEXT PRIMARY KEY,
+    cabinet TEXT, records INTEGER, received REAL
+);
+"""
+MAX_BODY = 32 * 1024 * 1024  # bytes, after decompression
+MAX_WIRE_BODY = 8 * 1024 * 1024  # bytes as sent, checked before reading
+
+
+class ResultStore:
+    """One SQLite connection shared by the request threads behind a lock."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def ingest(self, batch_key, payload):
+        """Store a batch; returns (accepted, duplicates)."""
+        records = payload.get("records", [])
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise ValueError("records must be a list of objects")
+        rounds = []
+        matches = []
+        for r in records:
+            if r.get("kind") == "round":
+                rounds.append((r["id"], r.get("cabinet"), r.get("session"), r.get("match"),
+                               r.get("round"), r.get("status"), json.dumps(r.get("players")),
+                               r.get("reaction_time"), int(bool(r.get("trap"))),
+                               json.dumps(r.get("scores")), json.dumps(r.get("times")), r.get("ts")))
+            elif r.get("kind") == "match":
+                matches.append((r["id"], r.get("cabinet"), r.get("session"), r.get("match"),
+                                json.dumps(r.get("scores")), json.dumps(r.get("winners")), r.get("ts")))
+        with self.lock:
+            if batch_key and self.conn.execute("SELECT 1 FROM batches WHERE key = ?",
+                                               (batch_key,)).fetchone():
+                return 0, len(records)
+            before = self.conn.total_changes
+            with self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO rounds VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", rounds)
+                self.conn.executemany("INSERT OR IGNORE INTO matches VALUES (?,?,?,?,?,?,?)", matches)
+                accepted = self.conn.total_changes - before
+                if batch_key:
+                    self.conn.execute("INSERT OR IGNORE INTO batches VALUES (?,?,?,?)",
+                                      (batch_key, payload.get("cabinet"), len(records), time.time()))
+        return accepted, len(records) - accepted
+
+    def stats(self):
+        with self.lock:
+            rounds = self.conn.execute("SELECT COUNT(*) FROM rounds").fetchone()[0]
+            matches = self.conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+            cabinets = self.conn.execute(
+                "SELECT cabinet, COUNT(*), AVG(reaction_time) FROM rounds "
+                "WHERE status = 'winner' GROUP BY cabinet ORDER BY cabinet").fetchall()
+        return {"rounds": rounds, "matches": matches,
+                "cabinets": [{"cabinet": c, "wins": n, "mean_winning_time": t} for c, n, t in cabinets]}
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    store = None  # set by make_server
+
+    def _reply(self, code, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/ingest":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError("bad Content-Length")
+            if length > MAX_WIRE_BODY:
+                self.close_connection = True  # the body is left unread
+                self._reply(413, {"error": "batch too large"})
+                return
+            body = self.rfile.read(length)
+            if self.headers.get("Content-Encoding") == "gzip":
+                # bounded, so a small gzip bomb can't expand past MAX_BODY
+                inflater = zlib.decompressobj(wbits=31)
+                body = inflater.decompress(body, MAX_BODY + 1)
+                if len(body) <= MAX_BODY and not inflater.eof:
+                    raise ValueError("truncated gzip body")
+            if len(body) > MAX_BODY:
+                self._reply(413, {"error": "batch too large"})
+                return
+            payload = json.loads(body)
+            if not isinstance(payload, dict):
+                raise ValueError("batch must be a JSON object")
+            key = self.headers.get("Idempotency-Key") or payload.get("batch")
+            accepted, duplicates = self.store.ingest(key, payload)
+        except (ValueError, KeyError, OSError, zlib.error) as e:
+            self._reply(400, {"error": str(e)})
+            return
+        self._reply(200, {"accepted": accepted, "duplicates": duplicates})
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._reply(200, self.store.stats())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(db_path, host="127.0.0.1", port=9480):
+    handler = type("BoundIngestHandler", (IngestHandler,), {"store": ResultStore(db_path)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def post_batch(url, key, records, cabinet="bench"):
+    body = gzip.compress(json.dumps({"batch": key, "cabinet": cabinet, "records": records}).encode("utf-8"))
+    request = urllib.request.Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json", "Content-Encoding": "gzip", "Idempotency-Key": key})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def bench(total, batch_size=500):
+    """Ingest `total` synthetic rounds over loopback, then replay some batches."""
+    db_path = os.path.join(tempfile.mkdtemp(prefix="aggregator-bench-"), "results.db")
+    server = make_server(db_path, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/ingest"
+    batches = []
+    for b in range(0, total, batch_size):
+        records = [{"id": f"bench:s:{i}", "kind": "round", "cabinet": "bench", "session": "s",
+                    "match": i // 20, "round": i % 20 + 1, "status": "winner", "players": [i % 2],
+                    "reaction_time": 0.2 + (i % 100) / 1000, "trap": False,
+                    "scores": [1, 0], "times": [0.2, 0.25], "ts": time.time()}
+                   for i in range(b, min(total, b + batch_size))]
+        batches.append((f"bench-b{b // batch_size}", records))
+    start = time.perf_counter()
+    accepted = 0
+    for key, records in batches:
+        accepted += post_batch(url, key, records)["accepted"]
+    elapsed = time.perf_counter() - start
+    # retried batches (same key) and re-sent records (new key) must not double count
+    retried = sum(post_batch(url, key, records)["duplicates"] for key, records in batches[:5])
+    resent = sum(post_batch(url, key + "-again", records)["duplicates"] for key, records in batches[:5])
+    rounds = server.RequestHandlerClass.store.stats()["rounds"]
+    server.shutdown()
+    print(f"ingested {accepted} records in {elapsed:.2f}s ({accepted / elapsed:,.0f} records/s)")
+    print(f"retried batches: {retried} duplicates, re-sent records: {resent} duplicates, "
+          f"stored rounds: {rounds}")
+    return rounds == total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collect round results from Reaction Duel cabinets.")
+    parser.add_argument("--db", default="results.db")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="interface to listen on; 0.0.0.0 accepts other hosts")
+    parser.add_argument("--port", type=int, default=9480)
+    parser.add_argument("--bench", type=int, metavar="RECORDS",
+                        help="run a loopback ingest benchmark instead of serving")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        sys.exit(0 if bench(args.bench) else 1)
+    server = make_server(args.db, args.host, args.port)
+    print(f"aggregator: http://{args.host}:{server.server_address[1]}/ingest -> {args.db}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Rendering microbenchmarks for Reaction Duel.
+
+Times the drawing primitives and composed frames headlessly (SDL dummy video
+driver) at several window sizes and reports microseconds per call with their
+spread across repeats:
+
+    python bench_render.py --save bench_baseline.json     # record a baseline
+    python bench_render.py --compare bench_baseline.json  # after a change
+
+--compare exits non-zero when a case's median got slower than the baseline by
+more than --threshold and by more than the noise (both runs' stdev), so a
+rendering change can show its speedup and a regression can't slip through.
+Only compare baselines from the same machine; separate runs of the same code
+differ by up to ~20% on a busy or single-core host, hence the default.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import reaction_duel as game
+
+
+RESOLUTIONS = {
+    "800x400": (800, 400),
+    "1024x600": (1024, 600),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+
+class FrameDone(Exception):
+    pass
+
+
+def set_size(size):
+    game.display.resize(size)
+
+
+def one_menu_frame():
+    """Run show_menu until it asks for input, i.e. exactly one frame."""
+    real_get = pygame.event.get
+
+    def stop(*args, **kwargs):
+        raise FrameDone()
+
+    pygame.event.get = stop
+    try:
+        game.show_menu()
+    except FrameDone:
+        pass
+    finally:
+        pygame.event.get = real_get
+
+
+def cases():
+    """(name, setup, call) for every benchmark; setup runs once per size."""
+    button = game.Button(0, 0, 280, 52, "Start Game", game.ACCENT_GREEN, (20, 160, 110))
+    counter = [0]
+
+    def uncached_text(size):
+        def call():
+            counter[0] += 1
+            game.draw_text(f"Round {counter[0]}", game.ACCENT_PURPLE, -140, size)
+        return call
+
+    def go_reveal():
+        frame, key = game.hud_go_frame(game.GO_SAFE)
+        game.renderer_backend.present_frame(key, frame)
+
+    def pause_setup():
+        game.draw_gradient_background(game.WIN, game.DARK_BG, (25, 15, 35))
+        return game.WIN.copy()
+
+    pause_background = [None]
+
+    def pause_composite():
+        game.compose_pause(pause_background[0])
+        game.present()
+
+    def set_pause_background():
+        pause_background[0] = pause_setup()
+
+    return [
+        ("gradient", None,
+         lambda: game.draw_gradient_background(game.WIN, game.DARK_BG, (15, 20, 35))),
+        ("draw_text[tiny]", None, lambda: game.draw_text("Press SPACE for next round", game.TEXT_GRAY, 160, "tiny")),
+        ("draw_text[small]", None, lambda: game.draw_text("Wait for it...", game.ACCENT_YELLOW, -90, "small")),
+        ("draw_text[normal]", None, lambda: game.draw_text("Round 12", game.ACCENT_PURPLE, -140)),
+        ("draw_text[tiny,uncached]", None, uncached_text("tiny")),
+        ("draw_text[small,uncached]", None, uncached_text("small")),
+        ("draw_text[normal,uncached]", None, uncached_text("normal")),
+        ("Button.draw", None, lambda: button.draw(game.WIN)),
+        ("show_menu frame", None, one_menu_frame),
+        ("GO reveal", None, go_reveal),
+        ("pause composite", set_pause_background, pause_composite),
+    ]
+
+
+def time_case(call, repeats, min_time):
+    """Return per-repeat microseconds per call; each repeat runs >= min_time."""
+    call()  # warm caches the way a running game has them
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed * 2 >= min_time else 10
+    samples = [elapsed / number * 1e6]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    return samples
+
+
+def run(resolutions, repeats, min_time, only=None):
+    results = {}
+    for label in resolutions:
+        set_size(RESOLUTIONS[label])
+        results[label] = {}
+        for name, setup, call in cases():
+            if only and not any(o in name for o in only):
+                continue
+            if setup is not None:
+                setup()
+            samples = time_case(call, repeats, min_time)
+            stats = {
+                "median_us": statistics.median(samples),
+                "mean_us": statistics.fmean(samples),
+                "stdev_us": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+                "min_us": min(samples),
+                "repeats": len(samples),
+            }
+            results[label][name] = stats
+            print(f"{label:>9}  {name:<28} {stats['median_us']:10.1f} us"
+                  f"  +/- {stats['stdev_us']:8.1f}  (min {stats['min_us']:.1f})", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print per-case speedups against a baseline; return the regressions."""
+    regressions = []
+    print(f"\n{'':>9}  {'case':<28} {'baseline':>10} {'now':>10}  change")
+    for label, cases_now in results.items():
+        for name, now in cases_now.items():
+            base = baseline.get("results", {}).get(label, {}).get(name)
+            if base is None:
+                continue
+            change = now["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+            noise = now["stdev_us"] + base["stdev_us"]
+            slower = now["median_us"] - base["median_us"]
+            flag = ""
+            if change > threshold and slower > noise:
+                flag = "  REGRESSION"
+                regressions.append(f"{label} {name}: {base['median_us']:.1f} -> {now['median_us']:.1f} us "
+                                   f"({change:+.0%})")
+            print(f"{label:>9}  {name:<28} {base['median_us']:10.1f} {now['median_us']:10.1f}  {change:+7.1%}{flag}")
+    return regressions
+
+
+def environment():
+    return {
+        "pygame": pygame.version.ver,
+        "sdl": ".".join(map(str, pygame.get_sdl_version())),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "node": platform.node(),
+        "video_driver": os.environ.get("SDL_VIDEODRIVER"),
+        "renderer": game.RENDER_BACKEND,
+        "when": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Reaction Duel rendering primitives.")
+    parser.add_argument("--resolution", action="append", choices=list(RESOLUTIONS),
+                        help="repeatable; default all")
+    parser.add_argument("--case", action="append", help="only cases containing this text (repeatable)")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per repeat")
+    parser.add_argument("--save", help="write results as a baseline JSON")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    # keep benchmark runs out of the cabinet's journal and log
+    workdir = tempfile.mkdtemp(prefix="reaction-bench-")
+    game.journal.path = os.path.join(workdir, "match_journal.jsonl")
+    game.log_store.open(os.path.join(workdir, "reaction_debug.log"))
+
+    results = run(args.resolution or list(RESOLUTIONS), args.repeats, args.min_time, args.case)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=1)
+        print(f"baseline written to {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nREGRESSIONS")
+            for r in regressions:
+                print(f"  - {r}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Full-frame procedural effects for Reaction Duel (gradients, pulses, fades).
+
+With NumPy installed the effects are computed as vectorized array operations
+written straight into the target surface through pygame.surfarray, reusing
+buffers allocated once per window size. Without NumPy the same calls fall
+back to plain pygame drawing so the game still runs on a bare install.
+"""
+from collections import OrderedDict
+
+import pygame
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+GRADIENT_CACHE = 8  # full-frame gradient surfaces kept per window size
+
+
+class Effects:
+    def __init__(self, size):
+        self.size = None
+        self.resize(size)
+
+    def resize(self, size):
+        """(Re)allocate buffers for a new window size. No-op if unchanged."""
+        size = (int(size[0]), int(size[1]))
+        if size == self.size:
+            return
+        self.size = size
+        self._gradients = OrderedDict()
+        self._fade = None
+        w, h = size
+        if numpy is not None:
+            # Distance of every pixel from the screen center, (w, h) like surfarray
+            xs = numpy.arange(w, dtype=numpy.float32) - (w - 1) / 2.0
+            ys = numpy.arange(h, dtype=numpy.float32) - (h - 1) / 2.0
+            self._dist = numpy.sqrt(xs[:, None] ** 2 + ys[None, :] ** 2)
+            self._alpha = numpy.empty((w, h), numpy.float32)
+            self._work = numpy.empty((w, h), numpy.float32)
+            self._frame = numpy.empty((w, h, 3), numpy.uint8)
+
+    def _new_surface(self):
+        surf = pygame.Surface(self.size)
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            surf = surf.convert()
+        return surf
+
+    def gradient_surface(self, color1, color2):
+        """Return a cached full-frame vertical gradient surface."""
+        key = (tuple(color1), tuple(color2))
+        surf = self._gradients.get(key)
+        if surf is not None:
+            self._gradients.move_to_end(key)
+            return surf
+        w, h = self.size
+        if numpy is not None:
+            blend = numpy.linspace(0.0, 1.0, h, endpoint=False, dtype=numpy.float32)[:, None]
+            c1 = numpy.array(color1[:3], numpy.float32)
+            c2 = numpy.array(color2[:3], numpy.float32)
+            column = (c1 * (1.0 - blend) + c2 * blend).astype(numpy.uint8)  # (h, 3)
+            self._frame[...] = column[None, :, :]
+            surf = self._new_surface()
+            pygame.surfarray.blit_array(surf, self._frame)
+        else:
+            # One pixel wide column, stretched across in C
+            column = pygame.Surface((1, h))
+            for y in range(h):
+                blend = y / h
+                column.set_at((0, y), tuple(int(color1[i] * (1 - blend) + color2[i] * blend) for i in range(3)))
+            surf = self._new_surface()
+            pygame.transform.scale(column, self.size, surf)
+        self._gradients[key] = surf
+        if len(self._gradients) > GRADIENT_CACHE:
+            self._gradients.popitem(last=False)
+        return surf
+
+    def gradient(self, surface, color1, color2):
+        surface.blit(self.gradient_surface(color1, color2), (0, 0))
+
+    def radial_pulse(self, surface, color, radius, width, strength=1.0):
+        """Blend a soft ring of `color` centered on the surface into it.
+
+        Only the ring's bounding box is touched, and all math runs in the
+        preallocated float buffers, so a frame allocates no full-size arrays.
+        """
+        if radius <= 0 or width <= 0:
+            return
+        if numpy is None or surface.get_size() != self.size or surface.get_bitsize() < 24:
+            pygame.draw.circle(surface, color, (self.size[0] // 2, self.size[1] // 2),
+                               int(radius), max(1, int(width)))
+            return
+        w, h = self.size
+        outer = radius + width
+        x0, x1 = max(0, int(w / 2 - outer)), min(w, int(w / 2 + outer) + 1)
+        y0, y1 = max(0, int(h / 2 - outer)), min(h, int(h / 2 + outer) + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        alpha = self._alpha[x0:x1, y0:y1]
+        work = self._work[x0:x1, y0:y1]
+        # alpha = strength * max(0, 1 - |dist - radius| / width)
+        numpy.subtract(self._dist[x0:x1, y0:y1], radius, out=alpha)
+        numpy.abs(alpha, out=alpha)
+        numpy.multiply(alpha, -1.0 / width, out=alpha)
+        numpy.add(alpha, 1.0, out=alpha)
+        numpy.clip(alpha, 0.0, 1.0, out=alpha)
+        if strength != 1.0:
+            numpy.multiply(alpha, strength, out=alpha)
+        pixels = pygame.surfarray.pixels3d(surface)
+        try:
+            region = pixels[x0:x1, y0:y1]
+            for c in range(3):
+                channel = region[..., c]
+                # channel += (color - channel) * alpha
+                numpy.subtract(float(color[c]), channel, out=work)
+                numpy.multiply(work, alpha, out=work)
+                numpy.add(work, channel, out=work)
+                channel[...] = work
+        finally:
+            del pixels  # unlock the surface
+
+    def fade(self, surface, color, alpha):
+        """Cover the surface with `color` at 0-255 alpha (surface alpha, no per-pixel)."""
+        if self._fade is None:
+            self._fade = self._new_surface()
+            self._fade_color = None
+        if self._fade_color != tuple(color):
+            self._fade.fill(color)
+            self._fade_color = tuple(color)
+        self._fade.set_alpha(max(0, min(255, int(alpha))))
+        surface.blit(self._fade, (0, 0))
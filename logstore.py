@@ -0,0 +1,316 @@
+"""Rotating, compressed storage for reaction_debug.log, plus a tail/search CLI.
+
+The game appends through one open LogStore handle. The active segment is
+closed and renamed once it passes max_bytes or max_age seconds; a background
+thread gzips closed segments and deletes the oldest once there are more than
+`keep` of them or they add up to more than max_total bytes. So the cost of a
+write doesn't depend on how long the cabinet has been up, and disk use stays
+flat.
+
+    python logstore.py tail -n 100              # last lines across segments
+    python logstore.py tail -f                  # follow the active segment
+    python logstore.py search "false start" --since 2026-10-19T18:00
+
+Segments are named <stem>.<YYYYmmdd-HHMMSS-ffffff>.log[.gz] after the time
+they were opened, so --since/--until skip whole segments without opening
+them. No pygame import here.
+"""
+import argparse
+import collections
+import datetime
+import glob
+import gzip
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+
+SEGMENT_BYTES = 1024 * 1024  # rotate the active segment past this size
+SEGMENT_SECONDS = 24 * 3600  # ...or once it is this old
+KEEP_SEGMENTS = 30  # closed segments kept
+MAX_TOTAL_BYTES = 32 * 1024 * 1024  # closed segments, after compression
+STAMP_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+
+class LogStore:
+    def __init__(self, path, max_bytes=SEGMENT_BYTES, max_age=SEGMENT_SECONDS,
+                 keep=KEEP_SEGMENTS, max_total=MAX_TOTAL_BYTES):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        self.max_total = max_total
+        self.lock = threading.Lock()
+        self._file = None
+        self._jobs = None
+        self._thread = None
+        self.open(path)
+
+    def open(self, path):
+        """(Re)point the store at path, closing any current segment."""
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.path = path
+            self.stem = os.path.splitext(path)[0]
+            self._open_active()
+        # segments left uncompressed by a crash or an older version
+        if any(not p.endswith(".gz") for p in closed_segments(self.path)):
+            self._submit(None)
+
+    def _open_active(self):
+        try:
+            # binary, so size and max_bytes count UTF-8 bytes, like tell()
+            self._file = open(self.path, "ab")
+        except OSError:
+            self._file = None
+            return
+        self.size = self._file.tell()
+        self.started = time.time()
+        if self.size:
+            # carry on an existing segment from the time of its first line
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                started = line_time(f.readline())
+            if started is not None:
+                self.started = started
+
+    def write(self, line):
+        """Append one line (no trailing newline); rotates when due."""
+        data = (line + "\n").encode("utf-8")
+        with self.lock:
+            if self._file is None:
+                return
+            if self.size and (self.size + len(data) > self.max_bytes or
+                              time.time() - self.started > self.max_age):
+                self._rotate()
+                if self._file is None:
+                    return
+            self._file.write(data)
+            self._file.flush()
+            self.size += len(data)
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        stamp = datetime.datetime.fromtimestamp(self.started).strftime(STAMP_FORMAT)
+        closed = f"{self.stem}.{stamp}.log"
+        try:
+            os.replace(self.path, closed)
+        except OSError:
+            closed = None
+        self._open_active()
+        if closed is not None:
+            self._submit(closed)
+
+    def _submit(self, closed):
+        if self._thread is None:
+            self._jobs = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name="log-compress", daemon=True)
+            self._thread.start()
+        self._jobs.put(closed)
+
+    def _run(self):
+        while True:
+            closed = self._jobs.get()
+            if closed is False:
+                return
+            try:
+                for path in closed_segments(self.path):
+                    if not path.endswith(".gz"):
+                        compress(path)
+                self.prune()
+            except Exception as e:
+                sys.stderr.write(f"logstore: {e}\n")
+
+    def prune(self):
+        """Delete the oldest closed segments past the count/size caps."""
+        segments = closed_segments(self.path)
+        sizes = {}
+        for path in segments:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                sizes[path] = 0
+        total = sum(sizes.values())
+        while segments and (len(segments) > self.keep or total > self.max_total):
+            oldest = segments.pop(0)
+            total -= sizes[oldest]
+            try:
+                os.remove(oldest)
+            except OSError:
+                pass
+
+    def close(self, timeout=5.0):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self._thread is not None:
+            self._jobs.put(False)
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def compress(path):
+    """gzip a closed segment next to itself, then remove the original."""
+    tmp = path + ".gz.tmp"
+    with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+        while True:
+            chunk = src.read(1 << 16)
+            if not chunk:
+                break
+            dst.write(chunk)
+    os.replace(tmp, path + ".gz")
+    os.remove(path)
+
+
+def closed_segments(path):
+    """Closed segments for an active log path, oldest first."""
+    stem = os.path.splitext(path)[0]
+    found = glob.glob(glob.escape(stem) + ".*.log") + glob.glob(glob.escape(stem) + ".*.log.gz")
+    return sorted(found, key=segment_start)
+
+
+def segment_start(path):
+    """Opening time of a closed segment from its name, as epoch seconds."""
+    stamp = os.path.basename(path).split(".")[-3 if path.endswith(".gz") else -2]
+    try:
+        return datetime.datetime.strptime(stamp, STAMP_FORMAT).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def read_segment(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    try:
+        with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+            return f.read().splitlines()
+    except OSError:
+        return []  # pruned or still being written by the compressor
+
+
+def segments_between(path, since=None, until=None):
+    """Closed segments plus the active one that can hold lines in [since, until]."""
+    closed = closed_segments(path)
+    starts = [segment_start(p) for p in closed]
+    chosen = []
+    for i, p in enumerate(closed):
+        # a segment ends where the next one starts
+        end = starts[i + 1] if i + 1 < len(closed) else float("inf")
+        if since is not None and end < since:
+            continue
+        if until is not None and starts[i] > until:
+            continue
+        chosen.append(p)
+    if os.path.exists(path):
+        chosen.append(path)
+    return chosen
+
+
+def line_time(line):
+    try:
+        return float(line.split(" ", 1)[0])
+    except ValueError:
+        return None
+
+
+def tail(path, n=50):
+    """Last n lines across segments, reading the newest segments first."""
+    lines = collections.deque(maxlen=n)
+    for segment in reversed(segments_between(path)):
+        for line in reversed(read_segment(segment)):
+            lines.appendleft(line)
+            if len(lines) == n:
+                return list(lines)
+    return list(lines)
+
+
+def follow(path, out=sys.stdout, poll=0.25):
+    """Print lines appended to the active segment, across rotations."""
+    f = open(path, "r", encoding="utf-8", errors="replace")
+    f.seek(0, os.SEEK_END)
+    inode = os.fstat(f.fileno()).st_ino
+    try:
+        while True:
+            line = f.readline()
+            if line:
+                out.write(line)
+                out.flush()
+                continue
+            time.sleep(poll)
+            try:
+                if os.stat(path).st_ino != inode:
+                    f.close()
+                    f = open(path, "r", encoding="utf-8", errors="replace")
+                    inode = os.fstat(f.fileno()).st_ino
+            except OSError:
+                pass  # between the rename and the new segment
+    except KeyboardInterrupt:
+        pass
+    finally:
+        f.close()
+
+
+def search(path, pattern, since=None, until=None, regex=False, ignore_case=False, limit=None):
+    """Yield matching lines, oldest first, from the segments in range."""
+    flags = re.IGNORECASE if ignore_case else 0
+    matcher = re.compile(pattern if regex else re.escape(pattern), flags).search
+    found = 0
+    for segment in segments_between(path, since, until):
+        for line in read_segment(segment):
+            if not matcher(line):
+                continue
+            if since is not None or until is not None:
+                t = line_time(line)
+                if t is not None and ((since is not None and t < since) or
+                                      (until is not None and t > until)):
+                    continue
+            yield line
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+
+def parse_time(text):
+    """Epoch seconds or an ISO date/time (local)."""
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.datetime.fromisoformat(text).timestamp()
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reaction_debug.log")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tail or search Reaction Duel debug log segments.")
+    parser.add_argument("--log", default=DEFAULT_PATH, help="active log path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    tail_cmd = commands.add_parser("tail")
+    tail_cmd.add_argument("-n", type=int, default=50)
+    tail_cmd.add_argument("-f", "--follow", action="store_true")
+    search_cmd = commands.add_parser("search")
+    search_cmd.add_argument("pattern")
+    search_cmd.add_argument("--regex", action="store_true")
+    search_cmd.add_argument("-i", "--ignore-case", action="store_true")
+    search_cmd.add_argument("--since", type=parse_time)
+    search_cmd.add_argument("--until", type=parse_time)
+    search_cmd.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "tail":
+        for line in tail(args.log, args.n):
+            print(line)
+        if args.follow:
+            follow(args.log)
+    else:
+        for line in search(args.log, args.pattern, args.since, args.until,
+                           args.regex, args.ignore_case, args.limit):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,33 @@ import random
 import time as time_module  # Rename to avoid conflicts
 import sys
 import os
+import math
+import json
+import atexit
+import gc
+import threading
+import cProfile
+import pstats
+import bisect
+import asyncio
+import collections
+import socket
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import ctypes
+from array import array
 from ctypes import wintypes
 
+from adjudication import (DEFAULT_RULES, NS_PER_SECOND, STATUS_CODES, adjudicate_ns, apply_round,
+                          match_winners)
+from effects import Effects
+from logstore import LogStore
+
+
+# Small mixer buffer for the optional audio GO cue; the mixer is reopened
+# with these by init_audio_cues, only when --audio asks for it
+AUDIO_FREQUENCY = 44100
+AUDIO_BUFFER = 256  # samples; ~6ms at 44.1kHz
+
 
 # Initialize Pygame
 pygame.init()
@@ -35,17 +59,29 @@ debug_messages = []  # recent messages for on-screen overlay
 # Keep aggressive polling on by default to reduce input lag
 AGGRESSIVE_POLLING = True
 AGGRESSIVE_WINDOW = 0.8  # seconds (increased for better late press detection)
-TICK_RATE = 480  # Increased polling rate
-CHECK_INTERVAL = 0.002  # 2ms check interval for more frequent sampling
+# TICK_RATE, CHECK_INTERVAL_NS and POLL_SLEEP are tuned by clock_selftest()
+# at startup (see CLOCK); these are only the fallbacks if it can't run.
+TICK_RATE = 480
+CHECK_INTERVAL_NS = 2_000_000
+POLL_SLEEP = 0.001
+# Once a round is decided the window stays open this long (or until everyone
+# has pressed) so the other players' times reach the stats; they never change
+# the result
+LATE_PRESS_GRACE = 0.3  # seconds
+
+
+# One open handle; segments rotate by size/age and are gzipped and pruned in
+# the background (see logstore.py, which also has the tail/search CLI)
+log_store = LogStore(LOG_PATH)
+atexit.register(log_store.close)
 
 
 def debug_log(msg: str):
-    ts = time_module.time()
-    line = f"{ts:.6f} {msg}"
+    ts = time_module.time_ns()
+    line = f"{ts // 1000 / 1e6:.6f} {msg}"
     # write to file
     try:
-        with open(LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
+        log_store.write(line)
     except Exception:
         pass
     # print to console when DEBUG
@@ -61,16 +97,16 @@ def draw_debug_overlay():
     if not DEBUG:
         return
     # draw semi-transparent background
-    overlay = pygame.Surface((WIDTH, 140), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 150))
-    WIN.blit(overlay, (10, 10))
-    for i, line in enumerate(debug_messages):
+    WIN.blit(atlas.layer("debug", (WIDTH, 160), build_debug_layer), (10, 10))
+    if clock_report:
+        WIN.blit(atlas.text(TINY, clock_report, ACCENT_CYAN), (20, 20))
+    for i, line in enumerate(debug_messages, start=1):
         # show only time+msg (truncate the timestamp if needed)
         try:
             _, rest = line.split(' ', 1)
         except Exception:
             rest = line
-        txt = TINY.render(rest, True, WHITE)
+        txt = atlas.text(TINY, rest, WHITE)
         WIN.blit(txt, (20, 20 + i * 20))
 
 
@@ -79,13 +115,131 @@ WIDTH, HEIGHT = 1024, 600  # Increased default size for better visibility
 MIN_WIDTH, MIN_HEIGHT = 800, 400  # Minimum window dimensions
 
 
+# Render backend. "surface" (default) draws straight into the display surface
+# and flips it. "texture" (--renderer=texture) draws into an offscreen WIN and
+# presents it through an SDL2 Renderer; prerendered frames such as GO are
+# uploaded once as textures so showing them is a single texture copy. The
+# texture backend owns its own SDL window, so the pygame.display window is
+# never created in that mode.
+RENDER_BACKEND = "texture" if "--renderer=texture" in sys.argv else "surface"
+
+
+class SurfaceBackend:
+    name = "surface"
+
+    def __init__(self, size):
+        self.surface = pygame.display.set_mode(size,
+                                               pygame.RESIZABLE |
+                                               pygame.DOUBLEBUF |
+                                               pygame.HWSURFACE)
+        pygame.display.set_caption("Reaction Duel")
+
+    def present(self, surface):
+        pygame.display.flip()
+
+    def prepare_frame(self, key, frame):
+        pass
+
+    def present_frame(self, key, frame):
+        """Show a prerendered full-screen frame."""
+        self.surface.blit(frame, (0, 0))
+        pygame.display.flip()
+
+    def resize(self, size, flags=pygame.RESIZABLE):
+        self.surface = pygame.display.set_mode(size, flags)
+        return self.surface
+
+    def sync(self, size):
+        # SDL resizes the display surface itself
+        return pygame.display.get_surface() or self.surface
+
+    def window_size(self):
+        try:
+            return pygame.display.get_window_size()
+        except Exception:
+            surf = pygame.display.get_surface()
+            return surf.get_size() if surf else None
+
+
+class TextureBackend:
+    name = "texture"
+    MAX_TEXTURES = 16  # cached prerendered frames
+
+    def __init__(self, size):
+        from pygame._sdl2 import video
+        self.video = video
+        self.window = video.Window("Reaction Duel", size, resizable=True)
+        self.renderer = video.Renderer(self.window, accelerated=-1)
+        self.textures = {}
+        self._make_surface(size)
+
+    def _make_surface(self, size):
+        self.surface = pygame.Surface(size)
+        self.stream = self.video.Texture(self.renderer, size, streaming=True)
+        self.textures.clear()
+
+    def present(self, surface):
+        self.stream.update(surface)
+        self.renderer.clear()
+        self.stream.draw()
+        self.renderer.present()
+
+    def prepare_frame(self, key, frame):
+        """Upload a prerendered frame ahead of time."""
+        if key not in self.textures:
+            if len(self.textures) >= self.MAX_TEXTURES:
+                self.textures.pop(next(iter(self.textures)))
+            self.textures[key] = self.video.Texture.from_surface(self.renderer, frame)
+        return self.textures[key]
+
+    def present_frame(self, key, frame):
+        texture = self.prepare_frame(key, frame)
+        self.renderer.clear()
+        texture.draw()
+        self.renderer.present()
+        # keep WIN in step (pause menu copies it) once the frame is already up
+        self.surface.blit(frame, (0, 0))
+
+    def resize(self, size, flags=pygame.RESIZABLE):
+        if flags & pygame.FULLSCREEN:
+            self.window.set_fullscreen(desktop=True)
+        else:
+            self.window.set_windowed()
+            self.window.size = size
+        self._make_surface(size)
+        return self.surface
+
+    def sync(self, size):
+        if self.surface.get_size() != tuple(size):
+            self._make_surface(size)
+        return self.surface
+
+    def window_size(self):
+        return self.window.size
+
+
 # Center the window on startup
 os.environ['SDL_VIDEO_CENTERED'] = '1'
-WIN = pygame.display.set_mode((WIDTH, HEIGHT),
-                            pygame.RESIZABLE |
-                            pygame.DOUBLEBUF |
-                            pygame.HWSURFACE)
-pygame.display.set_caption("Reaction Duel")
+if RENDER_BACKEND == "texture":
+    try:
+        renderer_backend = TextureBackend((WIDTH, HEIGHT))
+    except Exception as e:
+        debug_log(f"texture renderer unavailable ({e}); using surface backend")
+        RENDER_BACKEND = "surface"
+        renderer_backend = SurfaceBackend((WIDTH, HEIGHT))
+else:
+    renderer_backend = SurfaceBackend((WIDTH, HEIGHT))
+WIN = renderer_backend.surface
+
+
+def present():
+    """Show WIN on screen (replaces direct pygame.display.flip() calls)."""
+    renderer_backend.present(WIN)
+    if recorder is not None:
+        recorder.capture(WIN, now_ns())
+
+
+recorder = None  # FrameRecorder while --record is on
 
 
 # Fonts and colors - Modern sleek design
@@ -118,7 +272,149 @@ YELLOW = ACCENT_YELLOW
 ORANGE = ACCENT_ORANGE
 
 
+###############
+# INPUT DEVICES
+###############
+# A player binding is either a keyboard key code (int) or a joystick/gamepad
+# button ("joy", device guid, button). Keyboard bindings stay plain ints so
+# key codes keep working everywhere they did before. InputMux turns every
+# binding into a (device, button) route, where device is KEYBOARD or a
+# joystick instance id, so finding the player for a press is one dict lookup
+# however many players there are. Joystick bindings are stored by GUID and
+# re-routed when a pad is unplugged and comes back with a new instance id.
+# Each source has its own timing path: KEYDOWN/JOYBUTTONDOWN events are
+# stamped when dequeued, and held keys/buttons are caught by polling
+# key.get_pressed() and Joystick.get_button() respectively. Devices can be
+# simulated (attach() with no Joystick, then post JOYBUTTONDOWN events),
+# which is how this is tested on headless machines.
+KEYBOARD = -1  # device id of the keyboard in (device, button) routes
+SOURCE_NAMES = (None, "keydown", "poll", "joybutton", "joypoll")
+
+
+def binding_name(binding):
+    if isinstance(binding, int):
+        return pygame.key.name(binding).upper()
+    _, guid, button = binding
+    return f"{input_mux.names.get(guid, 'PAD')[:12]} B{button}"
+
+
+def binding_id(binding):
+    """Stable string form of a binding for JSON files."""
+    if isinstance(binding, int):
+        return str(binding)
+    return f"joy:{binding[1]}:{binding[2]}"
+
+
+def parse_binding_id(text):
+    if text.startswith("joy:"):
+        _, guid, button = text.split(":")
+        return ("joy", guid, int(button))
+    return int(text)
+
+
+class InputMux:
+    def __init__(self):
+        self.joysticks = {}  # instance id -> Joystick (None for simulated devices)
+        self.guids = {}  # instance id -> guid
+        self.names = {}  # guid -> device name
+        self.route = {}  # (device, button) -> player index
+        self.bindings = None  # bindings the routes were built for
+        self.dirty = True
+
+    def attach(self, instance_id, guid, name, joystick=None):
+        self.joysticks[instance_id] = joystick
+        self.guids[instance_id] = guid
+        self.names[guid] = name
+        self.dirty = True
+        debug_log(f"input: attached {name} ({guid}) as device {instance_id}")
+
+    def detach(self, instance_id):
+        if self.guids.pop(instance_id, None) is not None:
+            self.joysticks.pop(instance_id, None)
+            self.dirty = True
+            debug_log(f"input: device {instance_id} removed")
+
+    def scan(self):
+        """Open every joystick SDL currently knows about."""
+        try:
+            for index in range(pygame.joystick.get_count()):
+                self.open(index)
+        except Exception as e:
+            debug_log(f"input scan failed: {e}")
+
+    def open(self, index):
+        joystick = pygame.joystick.Joystick(index)
+        joystick.init()
+        self.attach(joystick.get_instance_id(), joystick.get_guid(), joystick.get_name(), joystick)
+
+    def device_event(self, event):
+        """Handle hot-plug events; returns True if the event was one."""
+        if event.type == pygame.JOYDEVICEADDED:
+            try:
+                self.open(event.device_index)
+            except Exception as e:
+                debug_log(f"input: could not open joystick {event.device_index}: {e}")
+            return True
+        if event.type == pygame.JOYDEVICEREMOVED:
+            self.detach(event.instance_id)
+            return True
+        return False
+
+    def sync(self, bindings):
+        """Rebuild routes if the bindings or the attached devices changed."""
+        if not self.dirty and bindings == self.bindings:
+            return
+        self.bindings = list(bindings)
+        self.dirty = False
+        route = {}
+        by_guid = {}
+        for instance_id, guid in self.guids.items():
+            by_guid.setdefault(guid, []).append(instance_id)
+        for idx, binding in enumerate(self.bindings):
+            if isinstance(binding, int):
+                route[(KEYBOARD, binding)] = idx
+            else:
+                for instance_id in by_guid.get(binding[1], ()):
+                    route[(instance_id, binding[2])] = idx
+        self.route = route
+
+    def player_for(self, event):
+        """Player index for a KEYDOWN/JOYBUTTONDOWN event, else None."""
+        if event.type == pygame.KEYDOWN:
+            return self.route.get((KEYBOARD, event.key))
+        if event.type == pygame.JOYBUTTONDOWN:
+            return self.route.get((event.instance_id, event.button))
+        return None
+
+    def binding_for(self, event):
+        """The binding a KEYDOWN/JOYBUTTONDOWN event would need, else None."""
+        if event.type == pygame.KEYDOWN:
+            return event.key
+        if event.type == pygame.JOYBUTTONDOWN:
+            guid = self.guids.get(event.instance_id, str(event.instance_id))
+            return ("joy", guid, event.button)
+        return None
+
+    def pollers(self):
+        """(keyboard [(player, key)], joystick [(player, Joystick, button)]) for polling."""
+        keys = []
+        buttons = []
+        for (device, button), idx in self.route.items():
+            if device == KEYBOARD:
+                keys.append((idx, button))
+            elif self.joysticks.get(device) is not None:
+                buttons.append((idx, self.joysticks[device], button))
+        return keys, buttons
+
+
+input_mux = InputMux()
+input_mux.scan()
+
+
 # Game settings
+MAX_PLAYERS = 32
+
+
 class GameSettings:
     def __init__(self):
         self.points_to_win = 10
@@ -134,115 +430,343 @@ class GameSettings:
             pygame.K_c,    # Player 7: C
             pygame.K_k     # Player 8: K
         ]
+        # Players 9-32: the rest of the letters, then digits
+        self.default_keys += [getattr(pygame, f"K_{c}") for c in "bdefghijnorstuvwxy123456"]
+        # Bindings: key codes or joystick buttons (see INPUT DEVICES)
         self.player_keys = self.default_keys[:2]  # Start with 2 players
-        self.player_key_names = [pygame.key.name(key).upper() for key in self.player_keys]
         self.fullscreen = False
         self.paused = False
         self.windowed_size = (WIDTH, HEIGHT)
+
+    @property
+    def player_key_names(self):
+        return [binding_name(b) for b in self.player_keys]
        
     def add_player(self):
-        if self.num_players < 8:
+        if self.num_players < MAX_PLAYERS:
             self.num_players += 1
             self.player_keys.append(self.default_keys[self.num_players - 1])
-            self.player_key_names.append(pygame.key.name(self.default_keys[self.num_players - 1]).upper())
            
     def remove_player(self):
         if self.num_players > 2:
             self.num_players -= 1
             self.player_keys.pop()
-            self.player_key_names.pop()
            
     def toggle_fullscreen(self):
-        global WIDTH, HEIGHT, WIN
-        # Simpler, more reliable fullscreen toggle using SDL fullscreen/scaling.
-        info = pygame.display.Info()
-        if not self.fullscreen:
-            # Prefer SDL FULLSCREEN|SCALED so the window fills the screen and
-            # scaling preserves aspect ratio. If that fails, fall back to a
-            # borderless NOFRAME window sized to the display.
-            self.windowed_size = (WIDTH, HEIGHT)
-            screen_w, screen_h = info.current_w, info.current_h
-            try:
-                WIN = pygame.display.set_mode((screen_w, screen_h), pygame.FULLSCREEN | pygame.SCALED)
-                WIDTH, HEIGHT = screen_w, screen_h
-                self.fullscreen = True
-            except Exception:
-                try:
-                    WIN = pygame.display.set_mode((screen_w, screen_h), pygame.NOFRAME)
-                    # Try to position at 0,0 when possible
-                    if os.name == 'nt' and USE_WIN32:
-                        try:
-                            hwnd = pygame.display.get_wm_info().get('window')
-                            if hwnd:
-                                user32 = ctypes.windll.user32
-                                SWP_NOZORDER = 0x0004
-                                user32.SetWindowPos(hwnd, 0, 0, 0, screen_w, screen_h, SWP_NOZORDER)
-                        except Exception as e:
-                            debug_log(f"toggle_fullscreen SetWindowPos failed: {e}")
-                    WIDTH, HEIGHT = screen_w, screen_h
-                    self.fullscreen = True
-                except Exception:
-                    debug_log("toggle_fullscreen: failed to enter fullscreen")
-        else:
-            # Exit fullscreen and restore previous window size
-            WIDTH, HEIGHT = getattr(self, 'windowed_size', (1024, 600))
-            WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-            pygame.display.set_caption("Reaction Duel")
-            self.fullscreen = False
-        # Allow the system to process the mode change
-        pygame.event.pump()
-        pygame.display.flip()
-        debug_log(f"toggle_fullscreen: fullscreen={self.fullscreen}, WIDTH={WIDTH}, HEIGHT={HEIGHT}")
-        return WIN
-   
+        """Switch between fullscreen and the last windowed size (see DISPLAY MODES)."""
+        return display.toggle_fullscreen()
+
     def maximize_window(self):
-        """Maximize the window (non-fullscreen) using Windows API when available.
-        This uses ShowWindow(SW_MAXIMIZE) to give a native maximize behavior on Windows.
-        """
-        global WIDTH, HEIGHT, WIN
+        """Maximize the window (non-fullscreen); see DISPLAY MODES."""
+        return display.maximize()
+
+
+settings = GameSettings()
+
+
+###############
+# DISPLAY MODES
+###############
+# Every window size or mode change goes through one DisplayManager. What the
+# platform offers (desktop size, fullscreen modes, a handle on the SDL window
+# for in-place fullscreen/maximize/resize, native Win32 maximize) is probed
+# once at startup. A switch then takes the cheapest path it has: changing the
+# existing SDL window in place keeps the display surface (and the texture
+# renderer) alive, so set_mode, which recreates them, is only the fallback.
+# The outgoing frame is scaled onto the new surface and shown at once so the
+# switch never sits on a black frame, and size-dependent caches registered
+# with on_resize() hear about each real size change exactly once.
+class DisplayManager:
+    def __init__(self):
+        self.caps = {}
+        self.window = None  # pygame._sdl2 Window behind the display, if any
+        self.listeners = []
+        self.size = (WIDTH, HEIGHT)
+
+    def probe(self):
+        """Find out once what this platform can do; cached in self.caps."""
+        start = time_module.perf_counter_ns()
+        caps = {"driver": pygame.display.get_driver(), "backend": renderer_backend.name}
         try:
+            caps["desktop"] = tuple(pygame.display.get_desktop_sizes()[0])
+        except Exception:
             info = pygame.display.Info()
-            # Try Windows-specific maximize via user32
-            if os.name == 'nt':
-                hwnd = pygame.display.get_wm_info().get('window')
-                if hwnd and USE_WIN32:
-                    user32 = ctypes.windll.user32
-                    SW_MAXIMIZE = 3
-                    # Use native maximize without recreating the SDL window. Recreating
-                    # the window after ShowWindow can cause it to reappear at the
-                    # default position (top-left) which was causing the reported issue.
-                    user32.ShowWindow(hwnd, SW_MAXIMIZE)
-                    # Allow the system to process the resize
-                    pygame.event.pump()
-                    # Update our stored size to match the new window size without
-                    # calling set_mode again (avoids moving the window)
-                    try:
-                        WIDTH, HEIGHT = pygame.display.get_window_size()
-                    except Exception:
-                        WIDTH, HEIGHT = info.current_w, info.current_h
-                    # Don't recreate the window surface here; just flip to ensure
-                    # the content is updated in the maximized window.
-                    try:
-                        pygame.display.flip()
-                    except Exception:
-                        pass
-                    debug_log(f"maximize_window: maximized WIDTH={WIDTH}, HEIGHT={HEIGHT}")
-                    return WIN
-        except Exception as e:
-            debug_log(f"maximize_window failed: {e}")
-        # Fallback: resize to display size (may include taskbar)
+            caps["desktop"] = (info.current_w, info.current_h)
         try:
-            WIDTH, HEIGHT = info.current_w, info.current_h
-            # Fallback: recreate window at display size if native maximize failed
-            WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-            pygame.event.pump()
-            debug_log(f"maximize_window fallback: WIDTH={WIDTH}, HEIGHT={HEIGHT}")
-        except Exception as e:
-            debug_log(f"maximize_window fallback failed: {e}")
-        return WIN
+            modes = pygame.display.list_modes()
+            caps["fullscreen_modes"] = "any" if modes == -1 else [tuple(m) for m in modes[:8]]
+        except Exception:
+            caps["fullscreen_modes"] = []
+        if RENDER_BACKEND == "texture":
+            self.window = renderer_backend.window
+        else:
+            try:
+                from pygame._sdl2 import video
+                self.window = video.Window.from_display_module()
+            except Exception as e:
+                debug_log(f"display: no SDL window handle ({e}); switches use set_mode")
+                self.window = None
+        if self.window is not None:
+            try:
+                # SDL enforces the minimum itself; resizes need no set_mode
+                self.window.minimum_size = (MIN_WIDTH, MIN_HEIGHT)
+            except Exception:
+                pass
+        caps["in_place"] = self.window is not None
+        caps["win32_maximize"] = False
+        if os.name == 'nt' and USE_WIN32:
+            try:
+                caps["win32_maximize"] = bool(pygame.display.get_wm_info().get('window'))
+            except Exception:
+                pass
+        self.caps = caps
+        debug_log(f"display: probed {caps} in {(time_module.perf_counter_ns() - start) / 1e6:.1f}ms")
+        return caps
+
+    def on_resize(self, listener):
+        """Call listener(size) once whenever the drawable size changes."""
+        self.listeners.append(listener)
+
+    def adopt(self, surface, size=None):
+        """Make surface the drawable; notifies listeners if the size changed."""
+        global WIN, WIDTH, HEIGHT
+        WIN = surface
+        size = tuple(size or surface.get_size())
+        WIDTH, HEIGHT = size
+        if size == self.size:
+            return False
+        self.size = size
+        for listener in self.listeners:
+            try:
+                listener(size)
+            except Exception as e:
+                debug_log(f"display: resize listener failed: {e}")
+        return True
+
+    def _switch(self, kind, attempts):
+        """Run (path name, fn) attempts until one returns the new surface.
+        Returns None if every path failed."""
+        start = time_module.perf_counter_ns()
+        old_size = (WIDTH, HEIGHT)
+        previous = WIN.copy()
+        for path, attempt in attempts:
+            try:
+                surface = attempt()
+            except Exception as e:
+                debug_log(f"display: {kind} via {path} failed: {e}")
+                continue
+            if surface is None:
+                continue
+            switched = time_module.perf_counter_ns()
+            self.adopt(surface)
+            # Put the outgoing frame up at the new size right away
+            WIN.blit(pygame.transform.scale(previous, (WIDTH, HEIGHT)), (0, 0))
+            present()
+            done = time_module.perf_counter_ns()
+            debug_log(f"display: {kind} via {path} {old_size[0]}x{old_size[1]} -> {WIDTH}x{HEIGHT} "
+                      f"switch {(switched - start) / 1e6:.1f}ms, first frame {(done - switched) / 1e6:.1f}ms")
+            return WIN
+        debug_log(f"display: {kind} failed on every path")
+        return None
+
+    def _in_place(self, change, must_resize=False):
+        def attempt():
+            if self.window is None:
+                return None
+            before = tuple(self.window.size)
+            change(self.window)
+            pygame.event.pump()  # lets SDL resize the display surface
+            size = tuple(self.window.size)
+            if must_resize and size == before:
+                # maximize is asynchronous on X11/Wayland; not done yet
+                # counts as not switched so the next path runs
+                return None
+            return renderer_backend.sync(size)
+        return attempt
 
+    def toggle_fullscreen(self):
+        """Switch modes; settings.fullscreen only changes if a path worked."""
+        if not settings.fullscreen:
+            previous = settings.windowed_size
+            settings.windowed_size = (WIDTH, HEIGHT)
+            desktop = self.caps.get("desktop", (WIDTH, HEIGHT))
+            surface = self._switch("fullscreen", [
+                ("window", self._in_place(lambda w: w.set_fullscreen(desktop=True))),
+                ("set_mode", lambda: renderer_backend.resize(desktop, pygame.FULLSCREEN | pygame.SCALED)),
+                ("noframe", lambda: self._noframe(desktop)),
+            ])
+            if surface is None:
+                settings.windowed_size = previous
+                return WIN
+            settings.fullscreen = True
+            return surface
+        size = settings.windowed_size
+
+        def restore(window):
+            window.set_windowed()
+            window.size = size
+        surface = self._switch("windowed", [
+            ("window", self._in_place(restore)),
+            ("set_mode", lambda: renderer_backend.resize(size, pygame.RESIZABLE)),
+        ])
+        if surface is None:
+            return WIN
+        settings.fullscreen = False
+        pygame.display.set_caption("Reaction Duel")
+        return surface
+
+    def _noframe(self, size):
+        surface = renderer_backend.resize(size, pygame.NOFRAME)
+        if self.caps.get("win32_maximize"):
+            try:
+                hwnd = pygame.display.get_wm_info().get('window')
+                SWP_NOZORDER = 0x0004
+                ctypes.windll.user32.SetWindowPos(hwnd, 0, 0, 0, size[0], size[1], SWP_NOZORDER)
+            except Exception as e:
+                debug_log(f"display: SetWindowPos failed: {e}")
+        return surface
+
+    def _win32_maximize(self):
+        if not self.caps.get("win32_maximize"):
+            return None
+        # Native maximize keeps the window where it is; recreating it after
+        # ShowWindow used to make it reappear at the default position
+        SW_MAXIMIZE = 3
+        ctypes.windll.user32.ShowWindow(pygame.display.get_wm_info().get('window'), SW_MAXIMIZE)
+        pygame.event.pump()
+        return renderer_backend.sync(tuple(renderer_backend.window_size()))
+
+    def maximize(self):
+        desktop = self.caps.get("desktop", (WIDTH, HEIGHT))
+        return self._switch("maximize", [
+            ("win32", self._win32_maximize),
+            ("window", self._in_place(lambda w: w.maximize(), must_resize=True)),
+            ("set_mode", lambda: renderer_backend.resize(desktop, pygame.RESIZABLE)),
+        ]) or WIN
+
+    def resize(self, size):
+        """Windowed resize to size (tools and benchmarks)."""
+        size = (max(size[0], MIN_WIDTH), max(size[1], MIN_HEIGHT))
+
+        def change(window):
+            window.size = size
+        return self._switch("resize", [
+            ("window", self._in_place(change)),
+            ("set_mode", lambda: renderer_backend.resize(size, pygame.RESIZABLE)),
+        ]) or WIN
+
+    def window_resized(self, size):
+        """The user or the OS resized the window; adopt the new size."""
+        size = (max(size[0], MIN_WIDTH), max(size[1], MIN_HEIGHT))
+        if self.window is not None or RENDER_BACKEND == "texture":
+            # SDL already resized the display surface; no set_mode needed
+            surface = renderer_backend.sync(size)
+        else:
+            surface = renderer_backend.resize(size, pygame.RESIZABLE)
+        return self.adopt(surface, size)
 
-settings = GameSettings()
+
+display = DisplayManager()
+display.probe()
+
+
+###############
+# SURFACE ATLAS
+###############
+# Static UI pieces (rendered text, buttons, translucent overlays) are built
+# once, converted to the display's pixel format and blitted from cache.
+# Blitting an unconverted per-pixel-alpha surface is the slowest path pygame
+# has; a converted one is a straight copy or a fast alpha blend. Text is kept
+# in an LRU by (font, text, color); anything sized to the window is keyed by
+# the window size and dropped when the size changes, so only what changed is
+# rebuilt. Without a display surface (texture backend) nothing is converted
+# and surfaces are used as created.
+ATLAS_TEXT_CACHE = 256  # rendered strings kept
+
+
+class SurfaceAtlas:
+    def __init__(self):
+        self.texts = collections.OrderedDict()
+        self.buttons = collections.OrderedDict()
+        self.layers = {}  # name -> (size, surface)
+
+    def convert(self, surface, alpha=False):
+        if pygame.display.get_surface() is None:
+            return surface
+        try:
+            return surface.convert_alpha() if alpha else surface.convert()
+        except pygame.error:
+            return surface
+
+    def text(self, font, text, color):
+        key = (font, text, tuple(color))
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.texts.move_to_end(key)
+            return surface
+        surface = self.convert(font.render(text, True, color), alpha=True)
+        self.texts[key] = surface
+        if len(self.texts) > ATLAS_TEXT_CACHE:
+            self.texts.popitem(last=False)
+        return surface
+
+    def button(self, size, text, color):
+        """Button face with its translucent drop shadow, 3px taller than size."""
+        key = (size, text, tuple(color))
+        surface = self.buttons.get(key)
+        if surface is not None:
+            self.buttons.move_to_end(key)
+            return surface
+        w, h = size
+        surface = pygame.Surface((w, h + 3), pygame.SRCALPHA)
+        pygame.draw.rect(surface, (0, 0, 0, 60), (0, 3, w, h), border_radius=12)
+        pygame.draw.rect(surface, color, (0, 0, w, h), border_radius=12)
+        # Subtle border for depth
+        border_color = tuple(min(255, c + 30) for c in color)
+        pygame.draw.rect(surface, border_color, (0, 0, w, h), 2, border_radius=12)
+        label = SMALL.render(text, True, WHITE)
+        surface.blit(label, label.get_rect(center=(w // 2, h // 2)))
+        surface = self.convert(surface, alpha=True)
+        self.buttons[key] = surface
+        if len(self.buttons) > ATLAS_TEXT_CACHE:
+            self.buttons.popitem(last=False)
+        return surface
+
+    def layer(self, name, size, build):
+        """Window-sized surface built by build(size); rebuilt only on a new size."""
+        cached = self.layers.get(name)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        surface = build(size)
+        self.layers[name] = (size, surface)
+        return surface
+
+    def drop_layers(self, size=None):
+        """Forget window-sized layers (the window changed size)."""
+        self.layers.clear()
+
+
+atlas = SurfaceAtlas()
+display.on_resize(atlas.drop_layers)
+
+
+def build_pause_layer(size):
+    """Dimmed overlay with the pause menu text, composited once per size."""
+    w, h = size
+    layer = pygame.Surface(size, pygame.SRCALPHA)
+    layer.fill((15, 20, 30, 200))  # Deep semi-transparent overlay
+    for text, color, y_offset, font in (("PAUSED", ACCENT_CYAN, -60, FONT),
+                                        ("Press ESC to Resume", ACCENT_GREEN, 20, SMALL),
+                                        ("Press M for Menu", TEXT_GRAY, 60, SMALL)):
+        label = font.render(text, True, color)
+        layer.blit(label, label.get_rect(center=(w // 2, h // 2 + y_offset)))
+    return atlas.convert(layer, alpha=True)
+
+
+def build_debug_layer(size):
+    layer = pygame.Surface(size, pygame.SRCALPHA)
+    layer.fill((0, 0, 0, 150))
+    return atlas.convert(layer, alpha=True)
 
 
 # Button class for menu
@@ -258,23 +782,9 @@ class Button:
 
     def draw(self, surface):
         try:
-            # Modern card-style button with shadow
-            shadow_rect = self.rect.copy()
-            shadow_rect.y += 3
-            pygame.draw.rect(surface, (0, 0, 0, 60), shadow_rect, border_radius=12)
-           
-            # Draw button with modern styling
-            pygame.draw.rect(surface, self.current_color, self.rect, border_radius=12)
-           
-            # Subtle border for depth
-            border_color = tuple(min(255, c + 30) for c in self.current_color)
-            pygame.draw.rect(surface, border_color, self.rect, 2, border_radius=12)
-
-
-            # Draw centered text with slight boldness
-            text_surface = SMALL.render(self.text, True, WHITE)
-            text_rect = text_surface.get_rect(center=self.rect.center)
-            surface.blit(text_surface, text_rect)
+            # Modern card-style button with shadow, composited once in the atlas
+            face = atlas.button(self.rect.size, self.text, self.current_color)
+            surface.blit(face, self.rect.topleft)
         except Exception as e:
             debug_log(f"Button draw error: {e}")
 
@@ -329,22 +839,454 @@ class Button:
 clock = pygame.time.Clock()
 
 
+###############
+# CLOCK
+###############
+# All round timing runs on one integer nanosecond monotonic clock, now_ns().
+# clock_selftest() measures at startup how fine that clock is, what a read
+# costs and how precisely sleep() and Clock.tick() actually wake up on this
+# machine, then picks the polling interval, the per-loop sleep and the tick
+# rate from those numbers instead of hand-picked constants. On a coarse timer
+# (e.g. the 15.6ms default on Windows) sleeping would overshoot, so the loop
+# yields instead.
+now_ns = time_module.perf_counter_ns
+CLOCK_SELFTEST_SAMPLES = 15
+MAX_TICK_RATE = 1000
+clock_report = ""  # one-line summary for the debug overlay
+sleep_granularity_ns = 1_000_000  # measured wake-up time of sleep(0.001)
+
+
+def clock_selftest(samples=CLOCK_SELFTEST_SAMPLES):
+    """Measure the clock, sleep and tick and tune the polling globals."""
+    global TICK_RATE, CHECK_INTERVAL_NS, POLL_SLEEP, clock_report, sleep_granularity_ns
+    try:
+        reads = 10000
+        t0 = now_ns()
+        for _ in range(reads):
+            now_ns()
+        read_cost = (now_ns() - t0) / reads
+        # smallest step the clock actually advances by
+        resolution = None
+        for _ in range(200):
+            a = b = now_ns()
+            while b == a:
+                b = now_ns()
+            if resolution is None or b - a < resolution:
+                resolution = b - a
+        sleeps = []
+        for _ in range(samples):
+            a = now_ns()
+            time_module.sleep(0.001)
+            sleeps.append(now_ns() - a)
+        tick_clock = pygame.time.Clock()
+        tick_clock.tick()
+        ticks = []
+        for _ in range(samples):
+            a = now_ns()
+            tick_clock.tick(MAX_TICK_RATE)
+            ticks.append(now_ns() - a)
+        sleeps.sort()
+        ticks.sort()
+        sleep_ns = sleeps[len(sleeps) // 2]
+        tick_ns = ticks[len(ticks) // 2]
+
+        sleep_granularity_ns = sleep_ns
+        if sleep_ns <= 2_000_000:
+            # sleep is trustworthy: poll at the rate it really wakes up at
+            POLL_SLEEP = 0.001
+            CHECK_INTERVAL_NS = max(500_000, sleep_ns)
+        else:
+            # coarse timer: yield the CPU each loop rather than oversleep
+            POLL_SLEEP = 0
+            CHECK_INTERVAL_NS = 500_000
+        TICK_RATE = max(60, min(MAX_TICK_RATE, NS_PER_SECOND // max(1, tick_ns)))
+        clock_report = (f"clock res {resolution}ns read {read_cost:.0f}ns "
+                        f"sleep(1ms) {sleep_ns / 1e6:.2f}ms tick {tick_ns / 1e6:.2f}ms "
+                        f"-> poll {CHECK_INTERVAL_NS / 1e6:.2f}ms sleep {POLL_SLEEP * 1000:g}ms "
+                        f"tick {TICK_RATE}Hz")
+        debug_log(clock_report)
+    except Exception as e:
+        debug_log(f"clock_selftest failed: {e}")
+
+
+def sleep_until(deadline):
+    """Sleep until now_ns() reaches deadline, spinning out the final stretch."""
+    while True:
+        left = deadline - now_ns()
+        if left <= 0:
+            return
+        if left > 2 * sleep_granularity_ns:
+            time_module.sleep((left - 2 * sleep_granularity_ns) / NS_PER_SECOND)
+        else:
+            time_module.sleep(0)
+
+
+###############
+# EVENT BUS
+###############
+# Features that want to follow the game (stats, metrics, export, spectator
+# feed, logging) subscribe here instead of being wired into main() or the
+# reaction loop. emit() takes the event class and its fields and returns
+# before building anything when nobody listens, so an unused event costs one
+# set lookup; hot paths can skip even the call with `if X in events.wanted`.
+# Light subscribers run inline and must stay cheap. Heavy ones run on a
+# worker thread, and while the timed window is open (hold/release, driven by
+# the critical window) their events are only queued, so nothing they do can
+# compete with input detection.
+class GameEvent:
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class RoundStarted(GameEvent):
+    __slots__ = ("round_num", "scores")
+
+    def __init__(self, round_num, scores):
+        self.round_num = round_num
+        self.scores = scores
+
+
+class GoShown(GameEvent):
+    __slots__ = ("round_num", "go_color", "trap", "shown_ns")
+
+    def __init__(self, round_num, go_color, trap, shown_ns):
+        self.round_num = round_num
+        self.go_color = go_color
+        self.trap = trap
+        self.shown_ns = shown_ns  # now_ns() when the GO frame was presented
+
+
+class KeyPressed(GameEvent):
+    __slots__ = ("round_num", "player", "time", "source")
+
+    def __init__(self, round_num, player, time, source):
+        self.round_num = round_num
+        self.player = player
+        self.time = time  # seconds after GO, input lag compensated
+        self.source = source  # one of SOURCE_NAMES
+
+
+class RoundResolved(GameEvent):
+    __slots__ = ("round_num", "status", "players", "reaction_time", "go_color",
+                 "scores", "player_times", "schedule")
+
+    def __init__(self, round_num, status, players, reaction_time, go_color, scores,
+                 player_times, schedule):
+        self.round_num = round_num
+        self.status = status
+        self.players = players
+        self.reaction_time = reaction_time
+        self.go_color = go_color  # None for a false start
+        self.scores = scores
+        self.player_times = player_times
+        self.schedule = schedule
+
+
+class MatchEnded(GameEvent):
+    __slots__ = ("scores", "winners")
+
+    def __init__(self, scores, winners):
+        self.scores = scores
+        self.winners = winners
+
+
+class EventBus:
+    def __init__(self):
+        self.wanted = set()  # event classes with at least one subscriber
+        self._light = {}
+        self._heavy = {}
+        self._held = None  # heavy deliveries queued during the timed window
+        self._queue = None
+        self._thread = None
+
+    def subscribe(self, event_type, handler, heavy=False):
+        handlers = self._heavy if heavy else self._light
+        handlers.setdefault(event_type, []).append(handler)
+        self.wanted.add(event_type)
+        if heavy and self._thread is None:
+            import queue
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._worker, name="event-bus", daemon=True)
+            self._thread.start()
+
+    def unsubscribe(self, event_type, handler):
+        for handlers in (self._light, self._heavy):
+            if handler in handlers.get(event_type, ()):
+                handlers[event_type].remove(handler)
+        if not self._light.get(event_type) and not self._heavy.get(event_type):
+            self.wanted.discard(event_type)
+
+    def emit(self, event_type, *fields):
+        if event_type not in self.wanted:
+            return None
+        event = event_type(*fields)
+        for handler in self._light.get(event_type, ()):
+            try:
+                handler(event)
+            except Exception as e:
+                debug_log(f"event handler {getattr(handler, '__name__', handler)} failed: {e}")
+        heavy = self._heavy.get(event_type)
+        if heavy:
+            if self._held is not None:
+                self._held.append((heavy, event))
+            else:
+                self._queue.put([(heavy, event)])
+        return event
+
+    def hold(self):
+        """Queue heavy deliveries until release() (start of the timed window)."""
+        if self._held is None:
+            self._held = []
+
+    def release(self):
+        held, self._held = self._held, None
+        if held:
+            self._queue.put(held)
+
+    def drain(self, timeout=2.0):
+        """Wait for the worker to deliver everything queued so far."""
+        self.release()
+        if self._queue is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _worker(self):
+        while True:
+            batch = self._queue.get()
+            if isinstance(batch, threading.Event):
+                batch.set()
+                continue
+            for handlers, event in batch:
+                for handler in handlers:
+                    try:
+                        handler(event)
+                    except Exception as e:
+                        debug_log(f"event handler {getattr(handler, '__name__', handler)} failed: {e}")
+
+
+events = EventBus()
+atexit.register(events.drain)
+
+
+def event_bus_benchmark(n=200000):
+    """Print the per-emit cost of the bus in its different states."""
+    bus = EventBus()
+    args = (1, 0, 0.2, "keydown")
+
+    def timed(fn):
+        start = now_ns()
+        fn()
+        return (now_ns() - start) / n
+
+    def run_emit():
+        emit = bus.emit
+        for _ in range(n):
+            emit(KeyPressed, *args)
+
+    def run_guarded():
+        wanted = bus.wanted
+        emit = bus.emit
+        for _ in range(n):
+            if KeyPressed in wanted:
+                emit(KeyPressed, *args)
+
+    def run_baseline():
+        for _ in range(n):
+            pass
+
+    baseline = timed(run_baseline)
+    results = [("loop overhead", baseline),
+               ("no subscribers, emit()", timed(run_emit) - baseline),
+               ("no subscribers, guarded", timed(run_guarded) - baseline)]
+    bus.subscribe(KeyPressed, lambda event: None)
+    results.append(("1 light subscriber", timed(run_emit) - baseline))
+    bus.unsubscribe(KeyPressed, bus._light[KeyPressed][0])
+    bus.subscribe(KeyPressed, lambda event: None, heavy=True)
+    bus.hold()
+    results.append(("1 heavy subscriber, held", timed(run_emit) - baseline))
+    bus.release()
+    results.append(("1 heavy subscriber, live", timed(run_emit) - baseline))
+    bus.drain(timeout=30)
+    for name, ns in results:
+        print(f"{name:28s} {ns:8.1f} ns/event")
+    return results
+
+
+###############
+# REACTION STATS
+###############
+# Per-player streaming sketches of reaction times. Each sketch is a fixed set
+# of log-spaced buckets (HDR-histogram style), so memory stays constant and a
+# record is O(1) no matter how long the session runs. Session sketches are
+# merged into STATS_PATH on exit so the all-time figures span sessions.
+STATS_PATH = os.path.join(os.path.dirname(__file__), "reaction_stats.json")
+
+
+class ReactionSketch:
+    MIN_TIME = 0.001  # 1ms; anything faster is clamped into the first bucket
+    MAX_TIME = 10.0   # anything slower is clamped into the last bucket
+    PRECISION = 0.01  # ~1% relative error per bucket
+    _LOG_GAMMA = math.log1p(PRECISION)
+    BUCKETS = int(math.ceil(math.log(MAX_TIME / MIN_TIME) / _LOG_GAMMA)) + 1
+
+    def __init__(self):
+        self.counts = array('I', [0]) * self.BUCKETS
+        self.count = 0
+        self.best = None
+
+    def record(self, t):
+        if t is None:
+            return
+        if t <= self.MIN_TIME:
+            idx = 0
+        else:
+            idx = min(self.BUCKETS - 1, int(math.log(t / self.MIN_TIME) / self._LOG_GAMMA))
+        self.counts[idx] += 1
+        self.count += 1
+        if self.best is None or t < self.best:
+            self.best = t
+
+    def quantile(self, q):
+        """Return the approximate q-quantile (0..1) or None when empty."""
+        if self.count == 0:
+            return None
+        rank = max(1, int(math.ceil(q * self.count)))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                # midpoint of the bucket in log space
+                return self.MIN_TIME * math.exp((idx + 0.5) * self._LOG_GAMMA)
+        return self.MAX_TIME
+
+    def merge(self, other):
+        for idx, c in enumerate(other.counts):
+            if c:
+                self.counts[idx] += c
+        self.count += other.count
+        if other.best is not None and (self.best is None or other.best < self.best):
+            self.best = other.best
+        return self
+
+    def to_dict(self):
+        # Sparse encoding; most buckets are empty
+        return {
+            "count": self.count,
+            "best": self.best,
+            "buckets": {str(i): c for i, c in enumerate(self.counts) if c},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls()
+        for idx, c in data.get("buckets", {}).items():
+            idx = int(idx)
+            if 0 <= idx < cls.BUCKETS:
+                sketch.counts[idx] += int(c)
+        sketch.count = int(data.get("count", sum(sketch.counts)))
+        sketch.best = data.get("best")
+        return sketch
+
+
+# session_sketches[i] holds every recorded time for player slot i this session
+session_sketches = []
+
+
+def record_reaction_times(player_times):
+    """Feed every player's time from a finished round into their sketch."""
+    while len(session_sketches) < len(player_times):
+        session_sketches.append(ReactionSketch())
+    for i, t in enumerate(player_times):
+        if t is not None:
+            session_sketches[i].record(t)
+
+
+def format_sketch_summary(num_players):
+    """Return short per-player 'p50/p90/best' strings (milliseconds)."""
+    parts = []
+    for i in range(num_players):
+        if i >= len(session_sketches) or session_sketches[i].count == 0:
+            continue
+        sk = session_sketches[i]
+        p50 = sk.quantile(0.5) * 1000
+        p90 = sk.quantile(0.9) * 1000
+        best = sk.best * 1000
+        parts.append(f"P{i+1} {p50:.0f}/{p90:.0f}/{best:.0f}")
+    return parts
+
+
+def draw_sketch_summary(num_players, y_offset):
+    """Draw the consistency view (p50/p90/best per player) centered at y_offset."""
+    parts = format_sketch_summary(num_players)
+    if not parts:
+        return
+    draw_text("p50 / p90 / best (ms)", TEXT_GRAY, y_offset, "tiny")
+    for row in range(0, len(parts), 4):
+        y_offset += 22
+        draw_text("   ".join(parts[row:row + 4]), TEXT_GRAY, y_offset, "tiny")
+
+
+def save_session_sketches():
+    """Merge this session's sketches into the on-disk all-time sketches."""
+    if not any(sk.count for sk in session_sketches):
+        return
+    try:
+        stored = {}
+        if os.path.exists(STATS_PATH):
+            with open(STATS_PATH, "r", encoding="utf-8") as f:
+                stored = json.load(f).get("players", {})
+        for i, sk in enumerate(session_sketches):
+            if sk.count == 0:
+                continue
+            key = str(i + 1)
+            merged = ReactionSketch.from_dict(stored[key]) if key in stored else ReactionSketch()
+            stored[key] = merged.merge(sk).to_dict()
+        tmp_path = STATS_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "players": stored}, f)
+        os.replace(tmp_path, STATS_PATH)
+        # avoid double-merging if called again before exit
+        session_sketches.clear()
+    except Exception as e:
+        debug_log(f"save_session_sketches failed: {e}")
+
+
+atexit.register(save_session_sketches)
+
+
+def _stats_round(event):
+    # Only GREEN rounds are real reaction times; trap presses are mistakes
+    if event.go_color == ACCENT_GREEN:
+        record_reaction_times(event.player_times)
+
+
+events.subscribe(RoundResolved, _stats_round)
+
+
+# Full-frame effects (effects.py); buffers follow the window size
+EFFECTS_ANIMATED = False  # --effects: countdown pulse while waiting, flash on faults
+PULSE_PERIOD = 0.9  # seconds per countdown pulse
+fx = Effects((WIDTH, HEIGHT))
+display.on_resize(fx.resize)
+
+
 def draw_gradient_background(surface, color1, color2):
     """Draw a smooth vertical gradient background."""
-    for y in range(HEIGHT):
-        blend = y / HEIGHT
-        r = int(color1[0] * (1 - blend) + color2[0] * blend)
-        g = int(color1[1] * (1 - blend) + color2[1] * blend)
-        b = int(color1[2] * (1 - blend) + color2[2] * blend)
-        pygame.draw.line(surface, (r, g, b), (0, y), (WIDTH, y))
+    # Built once per color pair and window size, then a single blit
+    fx.resize((WIDTH, HEIGHT))
+    fx.gradient(surface, color1, color2)
 
 
-def draw_text(text, color, y_offset=0, size="normal"):
+def draw_text(text, color, y_offset=0, size="normal", surface=None):
     font = TINY if size == "tiny" else (SMALL if size == "small" else FONT)
-    text_surface = font.render(text, True, color, None)
-    text_surface.set_alpha(255)
+    text_surface = atlas.text(font, text, color)
     text_rect = text_surface.get_rect(center=(WIDTH//2, HEIGHT//2 + y_offset))
-    WIN.blit(text_surface, text_rect)
+    (surface or WIN).blit(text_surface, text_rect)
 
 
 def show_rules():
@@ -361,7 +1303,7 @@ def show_rules():
     for i, rule in enumerate(rules):
         draw_text(rule, TEXT_GRAY, -100 + (i * 38), "small")
     draw_text("Press ENTER to return", ACCENT_PURPLE, 180, "small")
-    pygame.display.flip()
+    present()
    
     waiting = True
     while waiting:
@@ -403,12 +1345,14 @@ def show_controls():
         "SPACE - Continue/Next Round",
         "During Menu:",
         "Left Click - Select Options",
-        "Up/Down - Adjust Values"
+        "Up/Down - Adjust Values",
+        "5 - Calibrate Keyboard Lag",
+        "6 - Session Reaction Graph"
     ]
     for i, control in enumerate(controls):
-        draw_text(control, TEXT_GRAY, -100 + (i * 38), "small")
+        draw_text(control, TEXT_GRAY, -120 + (i * 38), "small")
     draw_text("Press ENTER to return", ACCENT_PURPLE, 180, "small")
-    pygame.display.flip()
+    present()
    
     waiting = True
     while waiting:
@@ -425,6 +1369,8 @@ def show_menu():
     global WIN, WIDTH, HEIGHT
     menu_state = "main"
     buttons = []
+    # one backwards read of the journal tail; no replay
+    resumable = journal.resumable()
    
     def create_main_buttons():
         button_w, button_h = 280, 52  # Modern proportions
@@ -464,8 +1410,14 @@ def show_menu():
             buttons = create_main_buttons()
             # Title with modern styling
             draw_text("REACTION DUEL", ACCENT_CYAN, -260)
-            current_keys = " | ".join([f"P{i+1}: {key}" for i, key in enumerate(settings.player_key_names)])
+            names = settings.player_key_names
+            current_keys = " | ".join([f"P{i+1}: {key}" for i, key in enumerate(names[:8])])
+            if len(names) > 8:
+                current_keys += f" | +{len(names) - 8} more"
             draw_text(current_keys, TEXT_GRAY, -210, "tiny")
+            if resumable is not None:
+                draw_text(f"Press R to resume unfinished match: round {resumable['round']}, "
+                          f"score {'-'.join(map(str, resumable['scores']))}", ACCENT_GREEN, 270, "tiny")
            
             # Draw all buttons
             for button in buttons:
@@ -473,7 +1425,7 @@ def show_menu():
                
             # draw debug overlay if enabled
             draw_debug_overlay()
-            pygame.display.flip()
+            present()
 
 
             for event in pygame.event.get():
@@ -488,6 +1440,9 @@ def show_menu():
                     # Fullscreen removed: ignore F11
                     if event.key == pygame.K_F11:
                         pass
+                    elif event.key == pygame.K_F9:
+                        # Hidden: toggle per-phase profiling
+                        toggle_profiling()
                     elif event.key == pygame.K_1:
                         menu_state = "points"
                     elif event.key == pygame.K_2:
@@ -496,6 +1451,12 @@ def show_menu():
                         menu_state = "keys"
                     elif event.key == pygame.K_4:
                         show_rules()
+                    elif event.key == pygame.K_5:
+                        show_calibration()
+                    elif event.key == pygame.K_6:
+                        show_session_graph()
+                    elif event.key == pygame.K_r and resumable is not None:
+                        return "resume"
                     elif event.key == pygame.K_SPACE:
                         return True
                     elif event.key == pygame.K_ESCAPE:
@@ -552,7 +1513,7 @@ def show_menu():
 
                     for btn in (value_button, confirm_button, cancel_button):
                         btn.draw(WIN)
-                    pygame.display.flip()
+                    present()
 
 
                     for event in pygame.event.get():
@@ -601,14 +1562,14 @@ def show_menu():
 
 
         elif menu_state == "players":
-            # Compact modal for editing number of players (2-8)
+            # Compact modal for editing number of players (2-MAX_PLAYERS)
             def edit_players():
                 current = str(settings.num_players)
                 while True:
                     sync_window_size()
                     draw_gradient_background(WIN, DARK_BG, (20, 25, 40))
                     draw_text("Number of Players", ACCENT_CYAN, -130)
-                    draw_text("(2-8 players)", TEXT_GRAY, -90, "tiny")
+                    draw_text(f"(2-{MAX_PLAYERS} players)", TEXT_GRAY, -90, "tiny")
 
 
                     # Value display (compact modern)
@@ -628,7 +1589,7 @@ def show_menu():
 
                     for btn in (value_button, inc_button, dec_button, done_button, cancel_button):
                         btn.draw(WIN)
-                    pygame.display.flip()
+                    present()
 
 
                     for event in pygame.event.get():
@@ -637,7 +1598,7 @@ def show_menu():
                         if event.type == pygame.KEYDOWN:
                             if event.key == pygame.K_RETURN:
                                 try:
-                                    v = max(2, min(8, int(current)))
+                                    v = max(2, min(MAX_PLAYERS, int(current)))
                                     return v
                                 except Exception:
                                     pass
@@ -645,21 +1606,24 @@ def show_menu():
                                 return None
                             elif event.key == pygame.K_UP:
                                 cur = int(current)
-                                if cur < 8:
+                                if cur < MAX_PLAYERS:
                                     current = str(cur + 1)
                             elif event.key == pygame.K_DOWN:
                                 cur = int(current)
                                 if cur > 2:
                                     current = str(cur - 1)
                             elif event.unicode.isnumeric():
-                                # single digit only
-                                current = event.unicode
+                                # up to two digits; start over once it can't fit
+                                if len(current) == 1 and int(current + event.unicode) <= MAX_PLAYERS:
+                                    current += event.unicode
+                                else:
+                                    current = event.unicode
                         elif event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN):
                             for btn in (inc_button, dec_button, done_button, cancel_button):
                                 res = btn.handle_event(event)
                                 if res == "inc":
                                     cur = int(current)
-                                    if cur < 8:
+                                    if cur < MAX_PLAYERS:
                                         current = str(cur + 1)
                                 elif res == "dec":
                                     cur = int(current)
@@ -667,7 +1631,7 @@ def show_menu():
                                         current = str(cur - 1)
                                 elif res == "done":
                                     try:
-                                        v = max(2, min(8, int(current)))
+                                        v = max(2, min(MAX_PLAYERS, int(current)))
                                         return v
                                     except Exception:
                                         pass
@@ -687,11 +1651,9 @@ def show_menu():
                     # add defaults
                     for i in range(old, new_num):
                         settings.player_keys.append(settings.default_keys[i])
-                        settings.player_key_names.append(pygame.key.name(settings.default_keys[i]).upper())
                 else:
                     # trim lists
                     settings.player_keys = settings.player_keys[:new_num]
-                    settings.player_key_names = settings.player_key_names[:new_num]
             menu_state = "main"
 
 
@@ -701,31 +1663,42 @@ def show_menu():
                 while True:
                     sync_window_size()
                     draw_gradient_background(WIN, DARK_BG, (20, 25, 40))
-                    button_w, button_h = 260, 46
                     center_x = WIDTH // 2
+                    # Past 8 players the rows shrink and wrap into columns
+                    num = settings.num_players
+                    row_h = 54 if num <= 8 else 40
+                    rows = num if num <= 8 else max(1, (HEIGHT - 220) // row_h)
+                    cols = (num + rows - 1) // rows
+                    button_w = min(260, (WIDTH - 40) // cols - 10)
+                    button_h = row_h - 8
                     # Dynamic spacing to prevent cutoff with many players
-                    start_y = max(HEIGHT // 2 - (settings.num_players * 26), 120)
+                    start_y = max(HEIGHT // 2 - (rows * row_h // 2), 120)
                     # Place header above the first button with safe margin
                     header_y = start_y - 60
                     draw_text("Player Keys", ACCENT_CYAN, header_y - (HEIGHT // 2))
+                    draw_text("Click a player, then press a key or a gamepad button", TEXT_GRAY,
+                              header_y - (HEIGHT // 2) + 34, "tiny")
 
 
                     buttons = []
                     player_colors = [ACCENT_BLUE, ACCENT_GREEN, ACCENT_PURPLE, ACCENT_ORANGE, ACCENT_CYAN, ACCENT_YELLOW, ACCENT_RED, (100, 200, 255)]
-                    for i in range(settings.num_players):
-                        y_pos = start_y + (i * 54)
-                        text = f"Player {i+1}: {settings.player_key_names[i]}"
+                    left = center_x - (cols * (button_w + 10) - 10) // 2
+                    names = settings.player_key_names
+                    for i in range(num):
+                        x_pos = left + (i // rows) * (button_w + 10)
+                        y_pos = start_y + (i % rows) * row_h
+                        text = f"Player {i+1}: {names[i]}" if cols == 1 else f"P{i+1}: {names[i]}"
                         color = player_colors[i % len(player_colors)]
                         hover = tuple(max(0, c - 30) for c in color)
-                        btn = Button(center_x - button_w//2, y_pos, button_w, button_h, text, color, hover, lambda i=i: i)
+                        btn = Button(x_pos, y_pos, button_w, button_h, text, color, hover, lambda i=i: i)
                         buttons.append(btn)
 
 
-                    done_btn = Button(center_x - 90, start_y + settings.num_players * 54 + 20, 180, 44, "Done", ACCENT_GREEN, (20, 160, 110), lambda: "done")
+                    done_btn = Button(center_x - 90, start_y + rows * row_h + 20, 180, 44, "Done", ACCENT_GREEN, (20, 160, 110), lambda: "done")
                     for btn in buttons:
                         btn.draw(WIN)
                     done_btn.draw(WIN)
-                    pygame.display.flip()
+                    present()
 
 
                     for event in pygame.event.get():
@@ -744,7 +1717,6 @@ def show_menu():
                                     assigned = capture_key_for_player(player_idx)
                                     if assigned is not None:
                                         settings.player_keys[player_idx] = assigned
-                                        settings.player_key_names[player_idx] = pygame.key.name(assigned).upper()
                             if done_btn.handle_event(event) == "done":
                                 return
 
@@ -759,24 +1731,27 @@ def show_menu():
                     sync_window_size()
                     if not prompt_shown:
                         draw_gradient_background(WIN, DARK_BG, (20, 25, 40))
-                        draw_text(f"Press new key for Player {player_idx + 1}", ACCENT_CYAN, -50, "small")
+                        draw_text(f"Press new key or gamepad button for Player {player_idx + 1}", ACCENT_CYAN, -50, "small")
                         draw_text("Press ESC to cancel", TEXT_GRAY, 10, "tiny")
-                        pygame.display.flip()
+                        present()
                         prompt_shown = True
 
 
                     for event in pygame.event.get():
                         if event.type == pygame.QUIT:
                             pygame.quit(); sys.exit()
-                        if event.type == pygame.KEYDOWN:
-                            if event.key == pygame.K_ESCAPE:
+                        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                            return None
+                        if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
+                            continue
+                        binding = input_mux.binding_for(event)
+                        if binding is not None:
+                            # Prevent duplicate assignment
+                            if binding in settings.player_keys:
+                                debug_log(f"{binding_name(binding)} already assigned")
                                 return None
-                            if event.key != pygame.K_RETURN:
-                                # Prevent duplicate assignment
-                                if event.key in settings.player_keys:
-                                    debug_log(f"Key {pygame.key.name(event.key)} already assigned")
-                                    return None
-                                return event.key
+                            return binding
+                        handle_window_events(event)
                     clock.tick(60)
 
 
@@ -787,60 +1762,669 @@ def show_menu():
         clock.tick(30)
 
 
-def wait_for_go(round_num, scores):
-    """Pre-round phase. Waits a randomized time, detects false starts.
-    Returns a tuple (result, key) where result is one of:
+###############
+# AUDIO CUES
+###############
+# Optional audio stimulus (--audio). A distinct tone for the green GO and for
+# each trap color is synthesized and preloaded at startup, and played right
+# before the GO flip. Press times are also reported against the sound's
+# onset: play call + output latency. AUDIO_OUTPUT_LATENCY should be measured
+# per cabinet (e.g. mic loopback); when None it is estimated from the mixer
+# buffer. Works with SDL_AUDIODRIVER=dummy or disk on headless machines.
+AUDIO_OUTPUT_LATENCY = None  # seconds from play() to sound at the speaker
+AUDIO_CUE_LENGTH = 0.12  # seconds
+AUDIO_GO_FREQ = 1320  # Hz, bright tone for the green GO
+AUDIO_TRAP_FREQS = [220, 277, 330, 392]  # Hz, one per TRAP_COLORS entry
+audio_cues = {}  # GO color code -> pygame.mixer.Sound; empty = cues off
+audio_latency = 0.0  # output latency in use, set by init_audio_cues
+audio_latency_estimated = False  # True when audio_latency is the buffer guess
+audio_play_time = None  # now_ns() when the last cue was started
+last_audio_times = []  # per-player press time measured from the audio onset
+
+
+def make_tone(freq, length=AUDIO_CUE_LENGTH, volume=0.5):
+    """Synthesize a sine tone with short fades as a mixer Sound."""
+    rate, size, channels = pygame.mixer.get_init()
+    count = int(rate * length)
+    fade = max(1, int(rate * 0.005))
+    peak = volume * ((1 << (abs(size) - 1)) - 1)
+    samples = array('h')
+    for n in range(count):
+        env = min(1.0, n / fade, (count - n) / fade)
+        value = int(peak * env * math.sin(2 * math.pi * freq * n / rate))
+        samples.extend([value] * channels)
+    return pygame.mixer.Sound(buffer=samples.tobytes())
+
+
+def init_audio_cues():
+    """Reopen the mixer with the small buffer and preload every GO cue. Returns success."""
+    global audio_latency, audio_latency_estimated
+    try:
+        # pygame.init() opened it with the default (large) buffer; make_tone
+        # also needs 16-bit samples
+        pygame.mixer.quit()
+        pygame.mixer.init(AUDIO_FREQUENCY, -16, 1, AUDIO_BUFFER)
+        rate = pygame.mixer.get_init()[0]
+        audio_cues[GO_SAFE] = make_tone(AUDIO_GO_FREQ)
+        for code in range(1, len(TRAP_COLORS) + 1):
+            freq = AUDIO_TRAP_FREQS[(code - 1) % len(AUDIO_TRAP_FREQS)]
+            audio_cues[code] = make_tone(freq)
+        if AUDIO_OUTPUT_LATENCY is not None:
+            audio_latency = AUDIO_OUTPUT_LATENCY
+            audio_latency_estimated = False
+        else:
+            # one buffer in the mixer plus one in the device, roughly
+            audio_latency = 2 * AUDIO_BUFFER / rate
+            audio_latency_estimated = True
+        how = "estimated from the buffer, not measured" if audio_latency_estimated else "measured"
+        debug_log(f"audio: {len(audio_cues)} cues loaded, driver={pygame.mixer.get_init()} "
+                  f"latency={audio_latency*1000:.1f}ms ({how})")
+        return True
+    except Exception as e:
+        debug_log(f"init_audio_cues failed: {e}")
+        audio_cues.clear()
+        return False
+
+
+def audio_reaction_times(player_ns, reaction_start):
+    """Press times (seconds) relative to when the cue reached the speaker."""
+    if audio_play_time is None:
+        return []
+    onset = audio_play_time + round(audio_latency * NS_PER_SECOND)
+    shift = reaction_start - onset
+    return [None if t is None else (t + shift) / NS_PER_SECOND for t in player_ns]
+
+
+###############
+# CRITICAL WINDOW
+###############
+# From just before GO is drawn until the round is adjudicated the cyclic GC
+# is frozen and disabled so a collection can't land in the middle of a close
+# race. enter/leave are idempotent; leave restores the previous GC state and
+# returns the net number of memory blocks allocated while the window was open
+# (sys.getallocatedblocks), a cheap regression signal for allocations.
+CRITICAL_WINDOW = True
+_critical_state = None  # (gc was enabled, allocated blocks at entry) while open
+
+
+def enter_critical_window():
+    global _critical_state
+    events.hold()
+    if not CRITICAL_WINDOW or _critical_state is not None:
+        return
+    was_enabled = gc.isenabled()
+    gc.disable()
+    gc.freeze()
+    _critical_state = (was_enabled, sys.getallocatedblocks())
+
+
+def leave_critical_window():
+    global _critical_state
+    events.release()
+    if _critical_state is None:
+        return 0
+    was_enabled, blocks = _critical_state
+    _critical_state = None
+    allocated = sys.getallocatedblocks() - blocks
+    gc.unfreeze()
+    if was_enabled:
+        gc.enable()
+    return allocated
+
+
+###############
+# ROUND SCHEDULE
+###############
+# Every round's wait time and GO color is drawn up front from a seeded RNG
+# when the match starts, so matches are reproducible (benchmarks, disputes,
+# identical schedules across league tables) and no RNG work happens in the
+# round loop. Set SCHEDULE_SEED to an int to replay a specific schedule; when
+# None a fresh seed is drawn per match and written to the debug log.
+SCHEDULE_SEED = None
+WAIT_RANGE = (1.0, 2.2)  # seconds players must hold off before GO
+TRAP_CHANCE = 0.2  # 80% green safe, 20% trap colors
+MAX_CONSECUTIVE_TRAPS = 2  # fairness: never more traps in a row than this
+# (background top, background bottom, text color, text) for each trap
+TRAP_COLORS = [
+    ((80, 10, 40), (120, 20, 60), ACCENT_RED, "GO!"),      # Red trap
+    ((80, 60, 10), (120, 100, 20), ACCENT_ORANGE, "GO!"),  # Orange trap
+    ((10, 10, 80), (20, 20, 120), ACCENT_BLUE, "GO!"),     # Blue trap
+    ((80, 10, 80), (120, 20, 120), ACCENT_PURPLE, "GO!"),  # Purple trap
+]
+GO_SAFE = 0  # color code for the green GO; trap n is code n (TRAP_COLORS[n-1])
+GO_HOLD = 0.08  # seconds GO stays up before reaction_phase starts timing
+
+
+class RoundSchedule:
+    """Precomputed per-round wait times and GO color codes for one match.
+
+    waits[i] / colors[i] describe round i+1. Rounds past the precomputed block
+    are generated on demand from the same RNG, so the sequence for a seed is
+    identical no matter how long the match runs.
+    """
+
+    def __init__(self, seed=None, rounds=32, wait_range=WAIT_RANGE,
+                 trap_chance=TRAP_CHANCE, max_consecutive_traps=MAX_CONSECUTIVE_TRAPS):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(4), "little")
+        self.seed = seed
+        self.wait_range = wait_range
+        self.trap_chance = trap_chance
+        self.max_consecutive_traps = max_consecutive_traps
+        self.waits = array('d')
+        self.colors = array('b')
+        self._rng = random.Random(seed)
+        self._trap_run = 0
+        self.extend(rounds)
+
+    def extend(self, count):
+        rng = self._rng
+        lo, hi = self.wait_range
+        for _ in range(count):
+            self.waits.append(rng.uniform(lo, hi))
+            # Always draw both values so the stream stays aligned whether or
+            # not the fairness constraint kicks in.
+            trap_roll = rng.random()
+            trap_pick = rng.randrange(len(TRAP_COLORS))
+            if trap_roll < self.trap_chance and self._trap_run < self.max_consecutive_traps:
+                self.colors.append(trap_pick + 1)
+                self._trap_run += 1
+            else:
+                self.colors.append(GO_SAFE)
+                self._trap_run = 0
+
+    def get(self, round_num):
+        """Return (wait_time, color_code) for a 1-based round number."""
+        idx = round_num - 1
+        if idx >= len(self.waits):
+            self.extend(idx - len(self.waits) + 16)
+        return self.waits[idx], self.colors[idx]
+
+
+go_frames = {}  # (color code, size) -> prerendered GO Surface
+
+
+def go_frame(color_code):
+    """Return the prerendered full-screen GO frame for a color code."""
+    key = (color_code, WIDTH, HEIGHT)
+    frame = go_frames.get(key)
+    if frame is None:
+        if len(go_frames) > len(TRAP_COLORS) + 1:
+            go_frames.clear()  # window size changed; old frames are stale
+        bg1, bg2, text_color, text = go_visuals(color_code)
+        frame = atlas.convert(pygame.Surface((WIDTH, HEIGHT)))
+        draw_gradient_background(frame, bg1, bg2)
+        draw_text(text, text_color, -50, surface=frame)
+        go_frames[key] = frame
+    return frame
+
+
+def go_visuals(color_code):
+    """Map a schedule color code to (bg1, bg2, text_color, text)."""
+    if color_code == GO_SAFE:
+        return ((10, 80, 40), (20, 120, 60), ACCENT_GREEN, "GO!")
+    return TRAP_COLORS[color_code - 1]
+
+
+def new_match_schedule(seed=None):
+    """Build the schedule for a new match sized for a typical match length."""
+    rounds = settings.points_to_win * settings.num_players * 2
+    schedule = RoundSchedule(SCHEDULE_SEED if seed is None else seed, rounds, WAIT_RANGE)
+    debug_log(f"match schedule seed={schedule.seed} rounds={rounds}")
+    return schedule
+
+
+# Schedule of the match in progress (set by main at match start)
+current_schedule = None
+
+
+###############
+# SCOREBOARD HUD
+###############
+# Per-player score, win streak and last reaction time along the bottom of the
+# wait and GO screens. Each player's cell is rendered once per change and
+# patched into a cached strip layer; the GO frame with the strip composited
+# in is built before the wait starts, so the reveal is still a single copy.
+SHOW_HUD = True
+HUD_CELL_W = 120  # narrowest cell before wrapping to another row
+HUD_MAX_CELL_W = 200
+HUD_MAX_HEIGHT = 0.3  # of the window; past this cells switch to the small font
+HUD_COLORS = [ACCENT_BLUE, ACCENT_GREEN, ACCENT_PURPLE, ACCENT_ORANGE,
+              ACCENT_CYAN, ACCENT_YELLOW, ACCENT_RED, (100, 200, 255)]
+HUD_FONT_SMALL = pygame.font.SysFont("segoe ui", 14)
+
+
+class Scoreboard:
+    def __init__(self):
+        self.round = 0
+        self.scores = []
+        self.streaks = []
+        self.last = []  # seconds, or None
+        self.marks = []  # "win", "fault", "early" or None for the last round
+        self.cells = {}  # player -> (state, surface)
+        self.layout = None
+        self.surface = None
+        self.version = 0  # bumped whenever the strip's pixels change
+
+    def reset(self, num_players):
+        self.scores = [0] * num_players
+        self.streaks = [0] * num_players
+        self.last = [None] * num_players
+        self.marks = [None] * num_players
+
+    def sync(self, scores):
+        """Take the authoritative scores from main()."""
+        if len(scores) != len(self.scores):
+            self.reset(len(scores))
+        self.scores = list(scores)
+
+    def round_started(self, event):
+        if event.round_num == 1 or event.round_num != self.round + 1 or len(event.scores) != len(self.scores):
+            self.reset(len(event.scores))
+        self.round = event.round_num - 1
+        self.scores = list(event.scores)
+
+    def round_resolved(self, event):
+        self.round = event.round_num
+        if len(event.scores) != len(self.scores):
+            self.reset(len(event.scores))
+        self.scores = list(event.scores)
+        self.marks = [None] * len(self.scores)
+        for i, t in enumerate(event.player_times or ()):
+            if i < len(self.last) and t is not None:
+                self.last[i] = t
+        players = event.players or ()
+        if event.status == "winner":
+            for i in range(len(self.streaks)):
+                self.streaks[i] = self.streaks[i] + 1 if i in players else 0
+            for p in players:
+                self.marks[p] = "win"
+        elif event.status in ("fault", "false_start"):
+            for p in players:
+                self.streaks[p] = 0
+                self.marks[p] = "fault" if event.status == "fault" else "early"
+
+    def _layout(self, size):
+        w, h = size
+        n = max(1, len(self.scores))
+        cols = min(n, max(1, (w - 20) // HUD_CELL_W))
+        rows = -(-n // cols)
+        font = TINY
+        cell_h = TINY.get_linesize() + 8
+        if rows * cell_h > h * HUD_MAX_HEIGHT:
+            font = HUD_FONT_SMALL
+            cell_h = HUD_FONT_SMALL.get_linesize() + 4
+        cell_w = min(HUD_MAX_CELL_W, (w - 20) // cols)
+        return (size, n, cols, rows, cell_w, cell_h, font)
+
+    def _cell(self, i, cell_w, cell_h, font):
+        score, streak, last, mark = self.scores[i], self.streaks[i], self.last[i], self.marks[i]
+        cell = pygame.Surface((cell_w - 4, cell_h - 2), pygame.SRCALPHA)
+        pygame.draw.rect(cell, (0, 0, 0, 110), cell.get_rect(), border_radius=6)
+        color = HUD_COLORS[i % len(HUD_COLORS)]
+        x = 6
+        for text, text_color in ((f"P{i+1}", color), (str(score), WHITE),
+                                 (f"x{streak}" if streak > 1 else "", ACCENT_YELLOW)):
+            if text:
+                label = font.render(text, True, text_color)
+                cell.blit(label, (x, (cell.get_height() - label.get_height()) // 2))
+                x += label.get_width() + 8
+        if mark == "early":
+            text = "early"
+        elif last is not None:
+            text = f"{last * 1000:.0f}ms"
+        else:
+            text = ""
+        if text:
+            text_color = {"win": ACCENT_GREEN, "fault": ACCENT_RED, "early": ACCENT_RED}.get(mark, TEXT_GRAY)
+            label = font.render(text, True, text_color)
+            right = cell.get_width() - 6 - label.get_width()
+            if right >= x:  # dropped when the cell is too narrow
+                cell.blit(label, (right, (cell.get_height() - label.get_height()) // 2))
+        return atlas.convert(cell, alpha=True)
+
+    def layer(self, size):
+        """Return (strip surface, top-left) for this window size, redrawing only changed cells."""
+        layout = self._layout(size)
+        _, n, cols, rows, cell_w, cell_h, font = layout
+        if layout != self.layout:
+            self.layout = layout
+            self.cells = {}
+            self.surface = atlas.convert(pygame.Surface((cols * cell_w, rows * cell_h), pygame.SRCALPHA), alpha=True)
+            self.version += 1
+        changed = False
+        for i in range(n):
+            state = (self.scores[i], self.streaks[i], self.last[i], self.marks[i]) if i < len(self.scores) else None
+            cached = self.cells.get(i)
+            if cached is not None and cached[0] == state:
+                continue
+            rect = pygame.Rect((i % cols) * cell_w, (i // cols) * cell_h, cell_w, cell_h)
+            self.surface.fill((0, 0, 0, 0), rect)
+            if state is not None:
+                cell = self._cell(i, cell_w, cell_h, font)
+                self.surface.blit(cell, (rect.x + 2, rect.y + 1))
+                self.cells[i] = (state, cell)
+            changed = True
+        if changed:
+            self.version += 1
+        w, h = size
+        return self.surface, ((w - self.surface.get_width()) // 2, h - self.surface.get_height() - 8)
+
+    def draw(self, surface):
+        if SHOW_HUD and self.scores:
+            strip, pos = self.layer(surface.get_size())
+            surface.blit(strip, pos)
+
+
+scoreboard = Scoreboard()
+events.subscribe(RoundStarted, scoreboard.round_started)
+events.subscribe(RoundResolved, scoreboard.round_resolved)
+
+hud_frames = {}  # GO frame with the scoreboard composited in, current version only
+
+
+def hud_go_frame(color_code):
+    """go_frame() plus the scoreboard; returns (frame, backend cache key)."""
+    frame = go_frame(color_code)
+    if not SHOW_HUD or not scoreboard.scores:
+        return frame, ("go", color_code, WIDTH, HEIGHT)
+    strip, pos = scoreboard.layer((WIDTH, HEIGHT))
+    key = ("go", color_code, WIDTH, HEIGHT, scoreboard.version)
+    composed = hud_frames.get(key)
+    if composed is None:
+        if len(hud_frames) > len(TRAP_COLORS):
+            hud_frames.clear()  # an older scoreboard
+        composed = frame.copy()
+        composed.blit(strip, pos)
+        hud_frames[key] = composed
+    return composed, key
+
+
+def drop_go_frames(size=None):
+    """Prerendered GO frames are window-sized; rebuilt at the new size on demand."""
+    go_frames.clear()
+    hud_frames.clear()
+
+
+display.on_resize(drop_go_frames)
+
+
+###############
+# INPUT CALIBRATION
+###############
+# Different keyboards/hubs add different latency. Calibration has one operator
+# tap each player key in turn along with a flashing metronome. This assumes the
+# operator taps every key with the same timing (same hand, same rhythm), so the
+# difference between keys' median offsets is the pipeline difference; any
+# habit of tapping one key late ends up in that key's offset too.
+# Human tap noise is tens of ms, far more than the few ms a key adds, so:
+# every key is measured in one run and offsets are only relative to keys of
+# the same run (a run that misses a key is discarded, never merged with an
+# older one); a run with a key whose jitter is above CALIBRATION_MAX_JITTER is
+# discarded; and an offset is only applied when the 95% confidence interval
+# of the difference is under half the offset itself. Applied offsets are
+# subtracted from press times before adjudication.
+CALIBRATION_PATH = os.path.join(os.path.dirname(__file__), "input_calibration.json")
+CALIBRATION_BEATS = 20  # taps measured per key
+CALIBRATION_WARMUP = 2  # leading beats ignored while the operator finds the rhythm
+CALIBRATION_INTERVAL = 0.6  # seconds between metronome beats
+CALIBRATION_MAX_ERROR = 0.25  # taps further than this from a beat are discarded
+CALIBRATION_MAX_JITTER = 0.030  # seconds; a noisier key discards the run
+COMPENSATE_INPUT_LAG = True  # apply stored offsets in reaction_phase
+
+
+def median_ci(jitter, samples):
+    """95% confidence half-width (seconds) of the median of samples taps."""
+    # the median's standard error is ~1.2533x the mean's for normal noise
+    return 1.96 * 1.2533 * jitter / math.sqrt(samples)
+
+
+def load_input_offsets():
+    """Return {binding: offset seconds} for the applied keys of the latest run."""
+    try:
+        with open(CALIBRATION_PATH, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+        run = profile.get("run")
+        if run is None:
+            debug_log("load_input_offsets: profile has no run id; recalibrate")
+            return {}
+        return {parse_binding_id(k): float(v["offset"]) for k, v in profile.get("keys", {}).items()
+                if v.get("run") == run and v.get("applied")}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        debug_log(f"load_input_offsets failed: {e}")
+        return {}
+
+
+input_offsets = load_input_offsets()
+
+
+def save_input_profile(measurements, keys):
+    """Store one calibration run over every binding in keys.
+
+    measurements: {binding: (median offset, jitter, samples)}. Returns
+    (profile, None), or (None, reason) when the run is discarded and the
+    previous profile is kept.
+    """
+    global input_offsets
+    missing = [binding_name(k) for k in keys if k not in measurements]
+    if missing:
+        return None, f"not measured: {', '.join(missing)}"
+    noisy = [binding_name(k) for k in keys if measurements[k][1] > CALIBRATION_MAX_JITTER]
+    if noisy:
+        return None, f"too noisy: {', '.join(noisy)}"
+    base_key = min(keys, key=lambda k: measurements[k][0])
+    base_median, base_jitter, base_samples = measurements[base_key]
+    base_ci = median_ci(base_jitter, base_samples)
+    run = time_module.strftime("%Y%m%d-%H%M%S")
+    profile = {"run": run, "updated": time_module.time(), "keys": {}}
+    for key in keys:
+        median, jitter, samples = measurements[key]
+        offset = median - base_median
+        ci = 0.0 if key == base_key else math.hypot(median_ci(jitter, samples), base_ci)
+        profile["keys"][binding_id(key)] = {
+            "name": binding_name(key),
+            "run": run,
+            "offset": offset,
+            "ci": ci,
+            # only when the interval is clearly tighter than the correction
+            "applied": offset > 0 and ci < offset / 2,
+            "jitter": jitter,
+            "samples": samples,
+        }
+    try:
+        with open(CALIBRATION_PATH, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2)
+    except Exception as e:
+        debug_log(f"save_input_profile failed: {e}")
+        return None, "could not save"
+    input_offsets = load_input_offsets()
+    return profile, None
+
+
+def calibrate_key(player_idx, key):
+    """Run the metronome for one binding (key or gamepad button).
+    Returns (median, jitter, samples) or None."""
+    taps = []
+    beat_times = []
+    radius = 40
+    interval = round(CALIBRATION_INTERVAL * NS_PER_SECOND)
+    start = now_ns() + NS_PER_SECOND  # one second to get ready
+    total = CALIBRATION_WARMUP + CALIBRATION_BEATS
+    last_drawn = None
+    while True:
+        now = now_ns()
+        beat = (now - start) // interval if now >= start else -1
+        if beat >= total:
+            break
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit(); sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                return None
+            if input_mux.binding_for(event) == key:
+                taps.append(now_ns())
+            handle_window_events(event)
+        # flash for the first 100ms after each beat
+        flash = beat >= 0 and (now - start) - beat * interval < NS_PER_SECOND // 10
+        state = (beat, flash)
+        if state != last_drawn:
+            if flash and (not beat_times or beat_times[-1][0] != beat):
+                beat_times.append((beat, start + beat * interval))
+            draw_gradient_background(WIN, DARK_BG, (20, 25, 40))
+            draw_text(f"Player {player_idx + 1}: tap {binding_name(key)} on each flash",
+                      ACCENT_CYAN, -120, "small")
+            draw_text(f"{max(0, beat + 1)}/{total}   ESC to cancel", TEXT_GRAY, -80, "tiny")
+            color = ACCENT_YELLOW if flash else CARD_BG
+            pygame.draw.circle(WIN, color, (WIDTH // 2, HEIGHT // 2 + 40), radius)
+            present()
+            last_drawn = state
+        time_module.sleep(0.001)
+
+    offsets = []
+    for tap in taps:
+        if not beat_times:
+            break
+        beat, nearest = min(beat_times, key=lambda bt: abs(tap - bt[1]))
+        error = (tap - nearest) / NS_PER_SECOND
+        # taps that belong to warm-up beats are discarded
+        if beat >= CALIBRATION_WARMUP and abs(error) <= CALIBRATION_MAX_ERROR:
+            offsets.append(error)
+    if len(offsets) < CALIBRATION_BEATS // 2:
+        debug_log(f"calibrate_key: only {len(offsets)} usable taps for P{player_idx+1}")
+        return None
+    offsets.sort()
+    median = offsets[len(offsets) // 2]
+    mean = sum(offsets) / len(offsets)
+    jitter = math.sqrt(sum((o - mean) ** 2 for o in offsets) / len(offsets))
+    debug_log(f"calibrate_key: P{player_idx+1} median={median*1000:.1f}ms jitter={jitter*1000:.1f}ms n={len(offsets)}")
+    return (median, jitter, len(offsets))
+
+
+def show_calibration():
+    """Calibrate every current player key as one run, then show the result."""
+    keys = list(settings.player_keys)
+    measurements = {}
+    for idx, key in enumerate(keys):
+        result = calibrate_key(idx, key)
+        if result is None:
+            break  # the run needs every key
+        measurements[key] = result
+    profile, reason = save_input_profile(measurements, keys)
+
+    draw_gradient_background(WIN, DARK_BG, (20, 25, 40))
+    draw_text("Input Lag Calibration", ACCENT_CYAN, -180)
+    if profile is None:
+        draw_text(f"Run discarded ({reason}); previous offsets kept", ACCENT_ORANGE, -140, "tiny")
+    for i, key in enumerate(keys):
+        name = binding_name(key)
+        stored = profile["keys"][binding_id(key)] if profile else None
+        if stored is not None:
+            state = "applied" if stored["applied"] else "not applied"
+            line = (f"P{i+1} {name}: +{stored['offset'] * 1000:.1f}ms "
+                    f"+/- {stored['ci'] * 1000:.1f}ms {state} "
+                    f"(jitter {stored['jitter'] * 1000:.1f}ms, {stored['samples']} taps)")
+        elif key in measurements:
+            line = f"P{i+1} {name}: jitter {measurements[key][1] * 1000:.1f}ms"
+        else:
+            line = f"P{i+1} {name}: not measured"
+        draw_text(line, TEXT_GRAY, -110 + i * 28, "tiny")
+    draw_text("Press ENTER to return", ACCENT_PURPLE, 180, "small")
+    present()
+    pygame.event.clear()
+    waiting = True
+    while waiting:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_ESCAPE):
+                waiting = False
+        clock.tick(30)
+
+
+def wait_for_go(round_num, scores, schedule=None):
+    """Pre-round phase. Waits the scheduled time, detects false starts.
+    Returns a tuple (result, value) where result is one of:
       - "menu" (user requested menu)
-      - "false_start" (a player pressed early; key is the pygame key pressed)
-      - "go" (safe to proceed to reaction phase; key is None)
+      - "false_start" (a player pressed early; value is that player's index)
+      - "go" (safe to proceed to reaction phase; key is the GO text color)
     """
+    global current_schedule, audio_play_time
+    if schedule is None:
+        if current_schedule is None:
+            current_schedule = new_match_schedule()
+        schedule = current_schedule
+    wait_time, color_code = schedule.get(round_num)
+    cue = audio_cues.get(color_code) if audio_cues else None
+    input_mux.sync(settings.player_keys)
+    scoreboard.sync(scores)
     sync_window_size()
     draw_gradient_background(WIN, DARK_BG, (25, 15, 35))
     draw_text(f"Round {round_num}", ACCENT_PURPLE, -140)
     draw_text("Wait for it...", ACCENT_YELLOW, -90, "small")
-    pygame.display.flip()
-
-
-    # Random waiting interval (players must NOT press during this time)
-    wait_time = random.uniform(1.0, 2.2)
-    start = time_module.perf_counter()
-    while time_module.perf_counter() - start < wait_time:
+    scoreboard.draw(WIN)
+    present()
+    # Render (and upload) the GO frame now so showing it later is one copy
+    frame, frame_key = hud_go_frame(color_code)
+    renderer_backend.prepare_frame(frame_key, frame)
+
+
+    # Scheduled waiting interval (players must NOT press during this time)
+    start = now_ns()
+    deadline = start + round(wait_time * NS_PER_SECOND)
+    pulse_period = round(PULSE_PERIOD * NS_PER_SECOND)
+    while now_ns() < deadline:
+        if EFFECTS_ANIMATED:
+            phase = ((now_ns() - start) % pulse_period) / pulse_period
+            draw_gradient_background(WIN, DARK_BG, (25, 15, 35))
+            fx.radial_pulse(WIN, ACCENT_PURPLE, phase * min(WIDTH, HEIGHT) * 0.6, 40, 0.5 * (1 - phase))
+            draw_text(f"Round {round_num}", ACCENT_PURPLE, -140)
+            draw_text("Wait for it...", ACCENT_YELLOW, -90, "small")
+            scoreboard.draw(WIN)
+            present()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    if show_pause_menu() == "menu":
-                        return ("menu", None)
-                if event.key in settings.player_keys:
-                    # False start detected
-                    return ("false_start", event.key)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                if show_pause_menu() == "menu":
+                    return ("menu", None)
+            player = input_mux.player_for(event)
+            if player is not None:
+                # False start detected
+                return ("false_start", player)
             handle_window_events(event)
         clock.tick(120)
-
-
-    # Show GO with color variation (80% green safe, 20% trap colors)
-    is_trap = random.random() < 0.2
-    if is_trap:
-        trap_colors = [
-            ((80, 10, 40), (120, 20, 60), ACCENT_RED, "GO!"),      # Red trap
-            ((80, 60, 10), (120, 100, 20), ACCENT_ORANGE, "GO!"),  # Orange trap
-            ((10, 10, 80), (20, 20, 120), ACCENT_BLUE, "GO!"),     # Blue trap
-            ((80, 10, 80), (120, 20, 120), ACCENT_PURPLE, "GO!"),  # Purple trap
-        ]
-        bg1, bg2, text_color, text = random.choice(trap_colors)
-        draw_gradient_background(WIN, bg1, bg2)
-        draw_text(text, text_color, -50)
-        go_color = text_color  # Track the color for reaction_phase
-    else:
-        # Safe green GO
-        draw_gradient_background(WIN, (10, 80, 40), (20, 120, 60))
-        draw_text("GO!", ACCENT_GREEN, -50)
-        go_color = ACCENT_GREEN
+        if metrics is not None:
+            metrics.frame_seconds.observe(clock.get_time() / 1000.0)
+
+
+    audio_play_time = None
+    # From here until adjudication the GC stays quiet
+    enter_critical_window()
+    # Show GO in the scheduled color (green safe, anything else is a trap)
+    go_color = go_visuals(color_code)[2]  # Track the color for reaction_phase
+    if (WIDTH, HEIGHT) != frame.get_size():
+        # resized while waiting
+        frame, frame_key = hud_go_frame(color_code)
    
-    pygame.display.flip()
+    flip_start = now_ns()
+    if cue is not None:
+        # Sound and picture are started back to back
+        audio_play_time = flip_start
+        cue.play()
+    renderer_backend.present_frame(frame_key, frame)
+    shown = now_ns()
+    if metrics is not None:
+        metrics.flip_seconds.observe((shown - flip_start) / NS_PER_SECOND)
+    if recorder is not None:
+        # after the flip, like every frame present() captures
+        recorder.capture(frame, shown, "go", owned=True)
+    if GoShown in events.wanted:
+        events.emit(GoShown, round_num, go_color, go_color != ACCENT_GREEN, flip_start)
     # small pause so GO is visible before reaction_phase begins
-    time_module.sleep(0.08)
+    sleep_until(now_ns() + round(GO_HOLD * NS_PER_SECOND))
     return ("go", go_color)
 
 
@@ -850,99 +2434,186 @@ def reaction_phase(round_num, scores, go_color=None):
     players: list of player indices (for winner/fault) or None
     reaction_time: float time (for winner/fault)
     go_color: the color shown (GREEN is safe, others are traps)
+    Every player's time (None if they did not press) is left in
+    last_player_times for stats. Timing inside runs on integer now_ns();
+    seconds are only produced once the window has closed.
     """
-    # Screen already drawn by wait_for_go, just start timing
-    reaction_start = time_module.perf_counter()
-    player_times = [None] * settings.num_players
-    EPS = 0.0006
+    global last_player_times, last_audio_times, last_window_start_ns, last_late_mask
+    enter_critical_window()
+    # Everything the loop touches is built before the clock starts so the
+    # window itself allocates as little as possible
+    num_players = settings.num_players
+    player_keys = list(settings.player_keys)
+    input_mux.sync(player_keys)
+    route = input_mux.route  # (device, button) -> player
+    key_polls, button_polls = input_mux.pollers()
+    player_ns = [None] * num_players
+    sources = [0] * num_players  # index into SOURCE_NAMES; logged after adjudication
+    last_player_times = [None] * num_players
+    # Per-key input lag from calibration, subtracted before adjudication
+    if COMPENSATE_INPUT_LAG and input_offsets:
+        offsets = [round(input_offsets.get(k, 0.0) * NS_PER_SECOND) for k in player_keys]
+    else:
+        offsets = [0] * num_players
+    # A slow key pressed first is seen up to max_offset after a faster one
+    max_offset = max(offsets)
    
     # Determine if this was a safe round or trap
     if go_color is None:
         go_color = ACCENT_GREEN  # Default to safe
+    is_trap = go_color != ACCENT_GREEN
+
+
+    timeout = 2 * NS_PER_SECOND  # no response timeout
+    late_grace = round(LATE_PRESS_GRACE * NS_PER_SECOND)
+    counted = None  # press times the round was decided on
+    grace_end = 0
+    aggressive_window = round(AGGRESSIVE_WINDOW * NS_PER_SECOND)
+    check_interval = CHECK_INTERVAL_NS
+    poll_sleep = POLL_SLEEP
+    sleep = time_module.sleep
+    loops = max_batch = max_gap = 0
+    get_events = pygame.event.get
+    get_pressed = pygame.key.get_pressed
+    KEYDOWN = pygame.KEYDOWN
+    JOYBUTTONDOWN = pygame.JOYBUTTONDOWN
+    # Screen already drawn by wait_for_go, just start timing
+    reaction_start = now_ns()
+    last_check = prev_time = reaction_start
+    result = None
+    try:
+        while True:
+            # Event handling for immediate keydown detection
+            batch = get_events()
+            loops += 1
+            if len(batch) > max_batch:
+                max_batch = len(batch)
+            for event in batch:
+                etype = event.type
+                if etype == KEYDOWN:
+                    idx = route.get((KEYBOARD, event.key))
+                    if idx is not None:
+                        if player_ns[idx] is None:
+                            t = now_ns() - reaction_start - offsets[idx]
+                            player_ns[idx] = t if t > 0 else 0
+                            sources[idx] = 1
+                        continue
+                    if event.key == pygame.K_ESCAPE:
+                        # The window is void once paused; let the GC run again
+                        leave_critical_window()
+                        if show_pause_menu() == "menu":
+                            return ("menu", None, None)
+                elif etype == JOYBUTTONDOWN:
+                    idx = route.get((event.instance_id, event.button))
+                    if idx is not None and player_ns[idx] is None:
+                        t = now_ns() - reaction_start - offsets[idx]
+                        player_ns[idx] = t if t > 0 else 0
+                        sources[idx] = 3
+                    continue
+                elif etype == pygame.QUIT:
+                    pygame.quit(); sys.exit()
+                handle_window_events(event)
+
+
+            # Polling to catch held keys and buttons
+            current_time = now_ns()
+            if current_time - prev_time > max_gap:
+                max_gap = current_time - prev_time
+            prev_time = current_time
+            if current_time - last_check >= check_interval:
+                last_check = current_time
+                now = current_time - reaction_start
+                if key_polls:
+                    keys = get_pressed()
+                    for i, key in key_polls:
+                        if player_ns[i] is None and keys[key]:
+                            t = now - offsets[i]
+                            player_ns[i] = t if t > 0 else 0
+                            sources[i] = 2
+                for i, joystick, button in button_polls:
+                    if player_ns[i] is None and joystick.get_button(button):
+                        t = now - offsets[i]
+                        player_ns[i] = t if t > 0 else 0
+                        sources[i] = 4
+
+
+                if counted is None:
+                    # The window stays open after the first press until no
+                    # key still up could beat the earliest compensated press
+                    earliest = None
+                    waiting = False
+                    for t in player_ns:
+                        if t is None:
+                            waiting = True
+                        elif earliest is None or t < earliest:
+                            earliest = t
+                    if earliest is not None:
+                        if not waiting or now - max_offset >= earliest:
+                            # Decided; later presses are kept for stats only
+                            counted = player_ns[:]
+                            grace_end = now + late_grace
+                            if not waiting:
+                                result = "pressed"
+                    elif now > timeout:
+                        result = "no_response"
+                elif now >= grace_end or None not in player_ns:
+                    result = "pressed"
+                if result is not None:
+                    break
 
 
-    last_check = reaction_start
-    timeout = 2.0  # no response timeout
-
-
-    while True:
-        # Event handling for immediate keydown detection
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    if show_pause_menu() == "menu":
-                        return ("menu", None, None)
-                if event.key in settings.player_keys:
-                    idx = settings.player_keys.index(event.key)
-                    if player_times[idx] is None:
-                        player_times[idx] = time_module.perf_counter() - reaction_start
-                        debug_log(f"KEYDOWN detected for P{idx+1} at {player_times[idx]:.6f}")
-            handle_window_events(event)
-
-
-        # Polling to catch held keys
-        current_time = time_module.perf_counter()
-        if current_time - last_check >= CHECK_INTERVAL:
-            last_check = current_time
-            keys = pygame.key.get_pressed()
-            now = current_time - reaction_start
-            for i, k in enumerate(settings.player_keys):
-                if player_times[i] is None and keys[k]:
-                    player_times[i] = now
-                    debug_log(f"POLL detected for P{i+1} at {now:.6f}")
-
-
-            pressed = [(i, t) for i, t in enumerate(player_times) if t is not None]
-            pressed_count = len(pressed)
-
-
-            # No presses yet: handle timeouts
-            elapsed = current_time - reaction_start
-            if pressed_count == 0 and elapsed > timeout:
-                return ("no_response", None, None)
-
-
-            if pressed_count > 0:
-                # Check if this was a trap round (non-green GO)
-                if go_color != ACCENT_GREEN:
-                    # Trap round: anyone who pressed gets a fault
-                    faulted = [i for i, _ in pressed]
-                    if len(faulted) == 1:
-                        return ("fault", faulted, pressed[0][1])
-                    else:
-                        # Multiple faulted: find slowest (last to press loses point)
-                        times = [t for _, t in pressed]
-                        max_time = max(times)
-                        slowest = [i for i, t in pressed if abs(t - max_time) < EPS]
-                        if len(slowest) > 1:
-                            return ("tie", None, None)
-                        else:
-                            return ("fault", slowest, max_time)
-                else:
-                    # Safe green round: determine fastest
-                    times = [(i, t) for i, t in pressed]
-                    min_time = min(t for _, t in times)
-                    fastest = [i for i, t in times if abs(t - min_time) < EPS]
-                    if len(fastest) > 1:
-                        return ("tie", None, None)
-                    else:
-                        return ("winner", fastest, min_time)
-
-
-        # adapt sleeping
-        elapsed = time_module.perf_counter() - reaction_start
-        if elapsed < AGGRESSIVE_WINDOW:
-            pygame.event.pump()
-            time_module.sleep(0.001)
-        else:
-            clock.tick(TICK_RATE)
+            # adapt sleeping (strategy chosen by clock_selftest)
+            if current_time - reaction_start < aggressive_window:
+                pygame.event.pump()
+                sleep(poll_sleep)
+            else:
+                clock.tick(TICK_RATE)
+    finally:
+        alloc_blocks = leave_critical_window()
+        # Loop health for metrics, read after the window closes
+        last_window_stats[:] = [loops, max_gap / NS_PER_SECOND, max_batch, alloc_blocks]
+
+    # Timed window is over: adjudicate and log
+    last_window_start_ns = reaction_start
+    last_player_times = [None if t is None else t / NS_PER_SECOND for t in player_ns]
+    last_late_mask = 0
+    if counted is not None:
+        for i in range(num_players):
+            if counted[i] is None and player_ns[i] is not None:
+                last_late_mask |= 1 << i
+    for i in range(num_players):
+        if sources[i]:
+            how = SOURCE_NAMES[sources[i]]
+            debug_log(f"{how.upper()} detected for P{i+1} at {player_ns[i] / NS_PER_SECOND:.9f}")
+            events.emit(KeyPressed, round_num, i, last_player_times[i], how)
+    if audio_play_time is not None:
+        last_audio_times = audio_reaction_times(player_ns, reaction_start)
+        label = "AUDIO reaction (estimated latency)" if audio_latency_estimated else "AUDIO reaction"
+        for i, t in enumerate(last_audio_times):
+            if t is not None:
+                debug_log(f"{label} for P{i+1}: {t:.6f}")
+    else:
+        last_audio_times = []
+    if DEBUG:
+        debug_log(f"reaction window: loops={loops} max_gap={max_gap / 1e6:.2f}ms alloc_blocks={alloc_blocks}")
+    if result == "no_response":
+        return ("no_response", None, None)
+    # Same rules the what-if re-scorer (adjudication.py) replays
+    status, players, reaction_ns = adjudicate_ns(counted, is_trap, DEFAULT_RULES)
+    return (status, players, None if reaction_ns is None else reaction_ns / NS_PER_SECOND)
 
 
+# Times from the most recent reaction_phase (index = player, None = no press)
+last_player_times = []
+last_window_start_ns = 0  # now_ns() the press times are measured from
+last_late_mask = 0  # bit per player whose press came after the round was decided
+# [loop iterations, longest gap between polls (s), largest event batch,
+#  net memory blocks allocated during the critical window]
+last_window_stats = [0, 0.0, 0, 0]
 
 
-def show_round_winner(winners, reaction_time=None, false_start=False, wait_for_input=True):
+def show_round_winner(winners, reaction_time=None, false_start=False, wait_for_input=True,
+                      trap_color=None):
     global WIN
     draw_gradient_background(WIN, DARK_BG, (30, 20, 40))
     if false_start:
@@ -979,16 +2650,28 @@ def show_round_winner(winners, reaction_time=None, false_start=False, wait_for_i
             else:
                 winners_text = ", ".join([f"P{w+1}" for w in winners])
                 draw_text(f"{winners_text} Win!", ACCENT_YELLOW, -60)
+    draw_sketch_summary(settings.num_players, 60)
                
     draw_text("Press SPACE for next round", TEXT_GRAY, 160, "tiny")
     draw_text("Press ESC to pause", TEXT_GRAY, 190, "tiny")
-    pygame.display.flip()
+    if EFFECTS_ANIMATED and false_start:
+        # Short flash that fades into the result screen: in the trap's own
+        # colour for a trap fault, red for a false start
+        flash_color = trap_color or ACCENT_RED
+        result_screen = WIN.copy()
+        for alpha in range(160, 0, -20):
+            WIN.blit(result_screen, (0, 0))
+            fx.fade(WIN, flash_color, alpha)
+            present()
+            clock.tick(60)
+        WIN.blit(result_screen, (0, 0))
+    present()
 
 
     # Wait for restart (or auto-advance when wait_for_input is False)
     if not wait_for_input:
         # Briefly show the result then continue automatically
-        pygame.display.flip()
+        present()
         time_module.sleep(1.2)
         return "continue"
 
@@ -1002,6 +2685,9 @@ def show_round_winner(winners, reaction_time=None, false_start=False, wait_for_i
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     waiting = False
+                elif event.key == pygame.K_F8 and recorder is not None:
+                    # Dispute: keep this round's frames
+                    recorder.flag()
                 elif event.key == pygame.K_ESCAPE and not settings.paused:
                     settings.paused = True
                     result = show_pause_menu()
@@ -1034,7 +2720,8 @@ def show_match_winner(scores):
     draw_text(f"Final Scores: {score_text}", WHITE, -20, "small")
     draw_text("Press SPACE to Play Again", ACCENT_GREEN, 80, "small")
     draw_text("Press ENTER to Return to Menu", TEXT_GRAY, 120, "tiny")
-    pygame.display.flip()
+    draw_sketch_summary(len(scores), 150)
+    present()
 
 
     while True:
@@ -1049,8 +2736,23 @@ def show_match_winner(scores):
                 elif event.key == pygame.K_RETURN:
                     pygame.event.clear()
                     return True  # Return to menu
+                elif event.key == pygame.K_F8 and recorder is not None:
+                    # Dispute over the round that decided the match
+                    recorder.flag()
             handle_window_events(event)
         clock.tick(30)
+
+
+def compose_pause(old_screen):
+    """Draw the pause screen over the frame that was showing."""
+    try:
+        WIN.blit(old_screen, (0, 0))  # Restore background
+    except Exception:
+        # If the surface can't be blitted, fill dark as fallback
+        draw_gradient_background(WIN, DARK_BG, (25, 30, 45))
+    WIN.blit(atlas.layer("pause", (WIDTH, HEIGHT), build_pause_layer), (0, 0))
+
+
 def show_pause_menu():
     global WIN
     try:
@@ -1058,29 +2760,20 @@ def show_pause_menu():
         old_screen = WIN.copy()
 
 
-        # Create modern pause overlay with blur effect (simulated)
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((15, 20, 30, 200))  # Deep semi-transparent overlay
-
-
         # Clear all pending events and wait a moment
         pygame.event.clear()
         time_module.sleep(0.2)  # Longer delay to ensure key release
 
 
         paused = True
+        drawn_size = None
         while paused:
-            # Draw pause menu
-            try:
-                WIN.blit(old_screen, (0, 0))  # Restore background
-            except Exception:
-                # If the surface can't be blitted, fill dark as fallback
-                draw_gradient_background(WIN, DARK_BG, (25, 30, 45))
-            WIN.blit(overlay, (0, 0))  # Add overlay
-            draw_text("PAUSED", ACCENT_CYAN, -60)
-            draw_text("Press ESC to Resume", ACCENT_GREEN, 20, "small")
-            draw_text("Press M for Menu", TEXT_GRAY, 60, "small")
-            pygame.display.flip()
+            # Composite the pause screen only when the window size changes;
+            # the overlay and its text come prebuilt from the atlas
+            if drawn_size != (WIDTH, HEIGHT):
+                compose_pause(old_screen)
+                drawn_size = (WIDTH, HEIGHT)
+            present()
 
 
             # Wait for a key press
@@ -1099,13 +2792,15 @@ def show_pause_menu():
                     # Ensure paused flag is cleared globally
                     settings.paused = False
                     return "menu"
+            else:
+                handle_window_events(event)
 
 
         # Clear events before resuming
         pygame.event.clear()
         # Restore the screen
         WIN.blit(old_screen, (0, 0))
-        pygame.display.flip()
+        present()
         return "resume"
     except Exception as e:
         # Log and recover: return to menu to avoid getting stuck
@@ -1119,17 +2814,19 @@ def show_pause_menu():
 
 
 def handle_window_events(event):
-    global WIN, WIDTH, HEIGHT
     if event.type == pygame.VIDEORESIZE:
         if not settings.fullscreen:
-            # Enforce minimum size
-            WIDTH = max(event.w, MIN_WIDTH)
-            HEIGHT = max(event.h, MIN_HEIGHT)
-            # Set new window size (avoid setting SDL env vars at runtime)
-            WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
+            display.window_resized((event.w, event.h))
             if DEBUG:
                 debug_log(f"VIDEORESIZE -> WIDTH={WIDTH}, HEIGHT={HEIGHT}")
+    elif event.type == pygame.WINDOWSIZECHANGED and RENDER_BACKEND == "texture":
+        # The texture backend's window doesn't send VIDEORESIZE
+        if not settings.fullscreen:
+            display.window_resized((event.x, event.y))
     # Note: Some pygame builds don't expose WINDOWEVENT — manual maximize is handled via VIDEORESIZE
+    elif event.type in (pygame.JOYDEVICEADDED, pygame.JOYDEVICEREMOVED):
+        # Every loop passes its events through here, so hot-plug is seen anywhere
+        input_mux.device_event(event)
     elif event.type == pygame.KEYDOWN:
         # Fullscreen toggle removed — do not handle F11 here
         pass
@@ -1140,23 +2837,18 @@ def sync_window_size():
     and update WIDTH/HEIGHT accordingly without recreating the window surface.
     Returns True if a size change was synced.
     """
-    global WIDTH, HEIGHT, WIN
     try:
         # Some SDL builds expose get_window_size; fallback to surface size
-        try:
-            w, h = pygame.display.get_window_size()
-        except Exception:
-            surf = pygame.display.get_surface()
-            if surf:
-                w, h = surf.get_size()
-            else:
-                return False
+        size = renderer_backend.window_size()
+        if not size:
+            return False
+        w, h = size
 
 
         # Only update when not fullscreen (we manage fullscreen separately)
         if not settings.fullscreen and (w != WIDTH or h != HEIGHT):
-            WIDTH = max(w, MIN_WIDTH)
-            HEIGHT = max(h, MIN_HEIGHT)
+            size = (max(w, MIN_WIDTH), max(h, MIN_HEIGHT))
+            display.adopt(renderer_backend.sync(size), size)
             debug_log(f"sync_window_size: detected external size change -> WIDTH={WIDTH}, HEIGHT={HEIGHT}")
             return True
     except Exception as e:
@@ -1164,104 +2856,1546 @@ def sync_window_size():
     return False
 
 
+###############
+# METRICS
+###############
+# Optional Prometheus-style endpoint for cabinet monitoring. Enable with
+# --metrics (or --metrics=PORT). The game thread only bumps plain counters and
+# bucket arrays (no locks); the HTTP server runs on its own daemon thread and
+# renders whatever values it sees, so a scrape can never stall the game loop.
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464
+metrics = None  # GameMetrics while the endpoint is running
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.bounds = list(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, out):
+        out.append(f"# HELP {self.name} {self.help_text}")
+        out.append(f"# TYPE {self.name} histogram")
+        counts = list(self.counts)  # snapshot; the game thread keeps writing
+        cumulative = 0
+        for bound, c in zip(self.bounds, counts):
+            cumulative += c
+            out.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        out.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        out.append(f"{self.name}_sum {self.sum}")
+        out.append(f"{self.name}_count {cumulative}")
+
+
+class GameMetrics:
+    # every status wait_for_go / reaction_phase can produce
+    ROUND_STATUSES = ("winner", "tie", "fault", "no_response", "false_start", "menu")
+
+    def __init__(self):
+        self.started = time_module.time()
+        self.rounds = dict.fromkeys(self.ROUND_STATUSES, 0)
+        self.traps_shown = 0
+        self.matches = 0
+        self.event_queue_depth = 0
+        self.reaction_seconds = Histogram(
+            "reaction_duel_reaction_seconds", "Player reaction times on GREEN rounds.",
+            (0.1, 0.15, 0.2, 0.25, 0.3, 0.35, 0.4, 0.5, 0.75, 1.0, 2.0))
+        self.frame_seconds = Histogram(
+            "reaction_duel_frame_seconds", "Frame interval while waiting for GO.",
+            (0.002, 0.005, 0.0083, 0.0167, 0.025, 0.033, 0.05, 0.1, 0.25))
+        self.flip_seconds = Histogram(
+            "reaction_duel_go_flip_seconds", "Time spent presenting the GO frame.",
+            (0.0005, 0.001, 0.002, 0.004, 0.008, 0.016, 0.033, 0.066))
+        self.loop_gap_seconds = Histogram(
+            "reaction_duel_loop_gap_seconds", "Longest gap between input polls per reaction window.",
+            (0.0005, 0.001, 0.0015, 0.002, 0.003, 0.005, 0.01, 0.02, 0.05))
+        self.event_batch = Histogram(
+            "reaction_duel_event_batch_size", "Largest event queue drain per reaction window.",
+            (0, 1, 2, 4, 8, 16, 32, 64))
+
+    def observe_round(self, status, go_color=None):
+        self.rounds[status] = self.rounds.get(status, 0) + 1
+        if go_color is not None and go_color != ACCENT_GREEN:
+            self.traps_shown += 1
+
+    def observe_window(self, player_times, go_color, window_stats):
+        if go_color == ACCENT_GREEN:
+            for t in player_times:
+                if t is not None:
+                    self.reaction_seconds.observe(t)
+        max_gap, max_batch = window_stats[1], window_stats[2]
+        self.loop_gap_seconds.observe(max_gap)
+        self.event_batch.observe(max_batch)
+        self.event_queue_depth = max_batch
+
+    def render(self):
+        out = []
+        out.append("# HELP reaction_duel_rounds_total Rounds finished, by outcome.")
+        out.append("# TYPE reaction_duel_rounds_total counter")
+        for status, c in list(self.rounds.items()):
+            out.append(f'reaction_duel_rounds_total{{status="{status}"}} {c}')
+        out.append("# HELP reaction_duel_traps_total Trap (non-green) GO screens shown.")
+        out.append("# TYPE reaction_duel_traps_total counter")
+        out.append(f"reaction_duel_traps_total {self.traps_shown}")
+        out.append("# HELP reaction_duel_matches_total Matches played to completion.")
+        out.append("# TYPE reaction_duel_matches_total counter")
+        out.append(f"reaction_duel_matches_total {self.matches}")
+        out.append("# HELP reaction_duel_event_queue_depth Events drained in one batch in the last window.")
+        out.append("# TYPE reaction_duel_event_queue_depth gauge")
+        out.append(f"reaction_duel_event_queue_depth {self.event_queue_depth}")
+        out.append("# HELP reaction_duel_uptime_seconds Seconds since metrics started.")
+        out.append("# TYPE reaction_duel_uptime_seconds gauge")
+        out.append(f"reaction_duel_uptime_seconds {time_module.time() - self.started:.3f}")
+        for hist in (self.reaction_seconds, self.frame_seconds, self.flip_seconds,
+                     self.loop_gap_seconds, self.event_batch):
+            hist.render(out)
+        return "\n".join(out) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics") or metrics is None:
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # keep scrapes out of stderr
+        pass
+
+
+def _metrics_round(event):
+    if event.go_color is not None:
+        metrics.observe_window(event.player_times, event.go_color, last_window_stats)
+    metrics.observe_round(event.status, event.go_color)
+
+
+def _metrics_match(event):
+    metrics.matches += 1
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """Start the metrics endpoint on a daemon thread; returns the server."""
+    global metrics
+    metrics = GameMetrics()
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        debug_log(f"metrics: could not bind {host}:{port}: {e}")
+        metrics = None
+        return None
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    events.subscribe(RoundResolved, _metrics_round)
+    events.subscribe(MatchEnded, _metrics_match)
+    debug_log(f"metrics: serving http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+###############
+# PROFILING
+###############
+# Off by default. Enable with --profile on the command line or F9 in the main
+# menu (F9 again stops and writes the files). Each phase gets its own cProfile
+# plus a sampling thread that records the main thread's Python stack, tagged
+# with the phase it was in, as collapsed stacks for flamegraph.pl/speedscope.
+# When disabled run_phase is a plain call, so there is no cost.
+PROFILE_DIR = os.path.join(os.path.dirname(__file__), "profiles")
+PROFILE_SAMPLE_INTERVAL = 0.001  # seconds between stack samples
+current_phase = None  # name of the phase main is currently running
+profiler = None  # PhaseProfiler while profiling is on
+
+
+class PhaseProfiler:
+    def __init__(self, out_dir, sample_interval=PROFILE_SAMPLE_INTERVAL):
+        self.out_dir = out_dir
+        self.sample_interval = sample_interval
+        self.profiles = {}  # phase name -> cProfile.Profile
+        self.samples = {}  # phase name -> {collapsed stack: count}
+        self._main_ident = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="phase-sampler", daemon=True)
+        self._sampler.start()
+
+    def run(self, name, fn, *args, **kwargs):
+        prof = self.profiles.get(name)
+        if prof is None:
+            prof = self.profiles[name] = cProfile.Profile()
+        prof.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            prof.disable()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._main_ident)
+            phase = current_phase
+            if frame is None or phase is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.append(phase)
+            key = ";".join(reversed(stack))
+            counts = self.samples.setdefault(phase, {})
+            counts[key] = counts.get(key, 0) + 1
+
+    def stop(self):
+        """Stop sampling and write <phase>.prof, .txt and .collapsed files."""
+        self._stop.set()
+        self._sampler.join(timeout=1.0)
+        for prof in self.profiles.values():
+            prof.disable()
+        os.makedirs(self.out_dir, exist_ok=True)
+        for name, prof in self.profiles.items():
+            base = os.path.join(self.out_dir, name)
+            try:
+                prof.dump_stats(base + ".prof")
+                # Human-readable top entries: shows draw_gradient_background,
+                # Font.render and event.get side by side by cumulative time
+                with open(base + ".txt", "w", encoding="utf-8") as f:
+                    stats = pstats.Stats(prof, stream=f)
+                    stats.sort_stats("cumulative").print_stats(30)
+            except Exception as e:
+                debug_log(f"profiler: failed to write {name} stats: {e}")
+        for name, counts in list(self.samples.items()):
+            try:
+                with open(os.path.join(self.out_dir, name + ".collapsed"), "w", encoding="utf-8") as f:
+                    for stack, count in sorted(counts.items()):
+                        f.write(f"{stack} {count}\n")
+            except Exception as e:
+                debug_log(f"profiler: failed to write {name} samples: {e}")
+        debug_log(f"profiler: wrote {len(self.profiles)} phase profiles to {self.out_dir}")
+
+
+def start_profiling():
+    global profiler
+    if profiler is None:
+        out_dir = os.path.join(PROFILE_DIR, time_module.strftime("%Y%m%d-%H%M%S"))
+        profiler = PhaseProfiler(out_dir)
+        debug_log(f"profiler: started, writing to {out_dir}")
+
+
+def stop_profiling():
+    global profiler
+    if profiler is not None:
+        active, profiler = profiler, None
+        active.stop()
+
+
+def toggle_profiling():
+    if profiler is None:
+        start_profiling()
+    else:
+        stop_profiling()
+
+
+atexit.register(stop_profiling)
+
+
+def run_phase(name, fn, *args, **kwargs):
+    """Run one game phase, profiled only when profiling is on."""
+    global current_phase
+    current_phase = name
+    if profiler is None:
+        return fn(*args, **kwargs)
+    return profiler.run(name, fn, *args, **kwargs)
+
+
+###############
+# SPECTATOR BROADCAST
+###############
+# Optional TCP feed for scoreboards on other screens (--broadcast[=[HOST:]PORT]).
+# It listens on localhost only unless a host is given, e.g.
+# --broadcast=0.0.0.0:9470 to serve screens on other machines.
+# An asyncio loop on its own thread fans newline-delimited JSON events out to
+# every subscriber. Each subscriber has a bounded queue: when it overflows the
+# backlog is replaced by one snapshot of the current state, and a subscriber
+# that keeps overflowing is dropped. Events raised during a round are buffered
+# in a deque and handed to the loop only once the round is adjudicated, so
+# the feed never adds work to the timed window.
+BROADCAST_HOST = "127.0.0.1"
+BROADCAST_PORT = 9470
+SUBSCRIBER_QUEUE = 64  # events buffered per subscriber before snapshotting
+SUBSCRIBER_MAX_LAG = 2  # snapshots in a row before a subscriber is dropped
+SUBSCRIBER_SNDBUF = 64 * 1024  # kernel send buffer per subscriber socket
+broadcast = None  # SpectatorBroadcast while the feed is running
+
+
+class _Subscriber:
+    def __init__(self, writer):
+        self.writer = writer
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE)
+        self.lag = 0  # consecutive overflows
+        self.delivered = 0  # lines written since the last overflow
+        self.task = None
+
+
+class SpectatorBroadcast:
+    def __init__(self, host=BROADCAST_HOST, port=BROADCAST_PORT):
+        self.host = host
+        self.port = port
+        self.subscribers = set()
+        self.snapshot = {"type": "snapshot", "round": 0, "scores": []}
+        self.dropped = 0
+        self.snapshots = 0
+        self._pending = collections.deque()
+        self._ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="spectator-feed", daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._on_connect, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            debug_log(f"broadcast: could not bind {self.host}:{self.port}: {e}")
+            self.server = None
+            self._ready.set()
+            return
+        self._ready.set()
+        self.loop.run_forever()
+
+    # --- game thread side -------------------------------------------------
+    def defer(self, event):
+        """Queue an event without waking the loop (safe inside the timed window)."""
+        self._pending.append(event)
+
+    def publish(self, event=None):
+        """Send any deferred events plus this one to all subscribers."""
+        if event is not None:
+            self._pending.append(event)
+        if not self._pending or self.server is None:
+            return
+        batch = []
+        while self._pending:
+            batch.append(self._pending.popleft())
+        self.loop.call_soon_threadsafe(self._fanout, batch)
+
+    def close(self):
+        if self.server is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        try:
+            future.result(5.0)
+        except Exception as e:
+            debug_log(f"broadcast: shutdown error: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(5.0)
+
+    async def _shutdown(self):
+        self.server.close()
+        tasks = [sub.task for sub in self.subscribers if sub.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # --- loop thread side -------------------------------------------------
+    def _fanout(self, batch):
+        for event in batch:
+            if "scores" in event:
+                self.snapshot = {"type": "snapshot", "round": event.get("round", self.snapshot["round"]),
+                                 "scores": event["scores"]}
+            line = (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+            for sub in list(self.subscribers):
+                self._offer(sub, line)
+
+    def _offer(self, sub, line):
+        try:
+            sub.queue.put_nowait(line)
+            return
+        except asyncio.QueueFull:
+            pass
+        # Slow consumer: drop its backlog and send a snapshot instead
+        sub.lag += 1
+        sub.delivered = 0
+        if sub.lag > SUBSCRIBER_MAX_LAG:
+            self._drop(sub)
+            return
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        self.snapshots += 1
+        snap = (json.dumps(self.snapshot, separators=(",", ":")) + "\n").encode("utf-8")
+        sub.queue.put_nowait(snap)
+
+    def _drop(self, sub):
+        if sub in self.subscribers:
+            self.subscribers.discard(sub)
+            self.dropped += 1
+            if sub.task is not None:
+                sub.task.cancel()
+            sub.writer.close()
+
+    async def _on_connect(self, reader, writer):
+        sub = _Subscriber(writer)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # Keep the kernel from soaking up a slow reader's backlog so
+            # backpressure shows up in our queue instead of in memory
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SUBSCRIBER_SNDBUF)
+            except OSError:
+                pass
+        self.subscribers.add(sub)
+        hello = dict(self.snapshot, players=settings.num_players, points_to_win=settings.points_to_win)
+        sub.queue.put_nowait((json.dumps(hello, separators=(",", ":")) + "\n").encode("utf-8"))
+        sub.task = asyncio.current_task()
+        try:
+            while True:
+                line = await sub.queue.get()
+                writer.write(line)
+                await writer.drain()
+                # a full queue's worth delivered without overflowing: caught up
+                sub.delivered += 1
+                if sub.delivered >= SUBSCRIBER_QUEUE:
+                    sub.lag = 0
+        except (asyncio.CancelledError, ConnectionError, OSError):
+            pass
+        finally:
+            self.subscribers.discard(sub)
+            writer.close()
+
+
+def _broadcast_event(event):
+    """Heavy bus subscriber: go/press wait in the deferred buffer until the
+    round result, so spectators never see a round before it is decided."""
+    if isinstance(event, RoundStarted):
+        broadcast.publish({"type": "round_start", "round": event.round_num, "scores": event.scores})
+    elif isinstance(event, GoShown):
+        broadcast.defer({"type": "go", "round": event.round_num, "color": list(event.go_color),
+                         "trap": event.trap})
+    elif isinstance(event, KeyPressed):
+        broadcast.defer({"type": "press", "round": event.round_num, "player": event.player,
+                         "time": event.time})
+    elif isinstance(event, RoundResolved):
+        broadcast.publish({"type": "round_result", "round": event.round_num, "status": event.status,
+                           "players": event.players, "reaction_time": event.reaction_time,
+                           "scores": event.scores})
+    elif isinstance(event, MatchEnded):
+        broadcast.publish({"type": "match_end", "scores": event.scores,
+                           "winners": list(event.winners)})
+
+
+def start_broadcast(port=BROADCAST_PORT, host=BROADCAST_HOST):
+    global broadcast
+    broadcast = SpectatorBroadcast(host, port)
+    if broadcast.server is None:
+        broadcast = None
+    else:
+        for event_type in (RoundStarted, GoShown, KeyPressed, RoundResolved, MatchEnded):
+            events.subscribe(event_type, _broadcast_event, heavy=True)
+        debug_log(f"broadcast: spectator feed on {host}:{broadcast.port}")
+    return broadcast
+
+
+def broadcast_selftest(subscribers=300, events=600, slow_every=10):
+    """Run the feed against simulated local subscribers and print a summary.
+
+    Every slow_every-th subscriber connects but never reads, to exercise the
+    snapshot/drop path; the rest must receive every event in order.
+    """
+    feed = SpectatorBroadcast("127.0.0.1", 0)
+    results = {"complete": 0, "incomplete": 0}
+
+    async def client(idx):
+        if idx % slow_every == 0:
+            # tiny receive buffer so backpressure reaches the server quickly
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            sock.connect(("127.0.0.1", feed.port))
+            sock.setblocking(False)
+            reader, writer = await asyncio.open_connection(sock=sock)
+            await asyncio.sleep(3.0)
+            writer.close()
+            return
+        reader, writer = await asyncio.open_connection("127.0.0.1", feed.port)
+        seen = -1
+        try:
+            while seen < events - 1:
+                line = await asyncio.wait_for(reader.readline(), 10.0)
+                if not line:
+                    break
+                msg = json.loads(line)
+                if msg.get("type") == "round_result":
+                    seen = msg["round"]
+        except asyncio.TimeoutError:
+            pass
+        results["complete" if seen == events - 1 else "incomplete"] += 1
+        writer.close()
+
+    async def run_clients():
+        tasks = [asyncio.ensure_future(client(i)) for i in range(subscribers)]
+        while len(feed.subscribers) < subscribers:
+            await asyncio.sleep(0.01)
+        publish_cost = 0.0
+        for r in range(events):
+            # padding makes the never-reading clients fill their socket buffers
+            t0 = time_module.perf_counter()
+            feed.publish({"type": "round_result", "round": r, "scores": [r, r], "pad": "x" * 4096})
+            publish_cost += time_module.perf_counter() - t0
+            # far faster than real rounds, but slow enough for healthy readers
+            await asyncio.sleep(0.002)
+        await asyncio.gather(*tasks)
+        return publish_cost
+
+    publish_cost = asyncio.run(run_clients())
+    print(f"subscribers={subscribers} events={events} complete={results['complete']} "
+          f"incomplete={results['incomplete']} snapshots={feed.snapshots} dropped={feed.dropped} "
+          f"publish_cost={publish_cost / events * 1e6:.1f}us/event")
+    feed.close()
+    return results
+
+
+###############
+# ROUND EXPORT
+###############
+# Optional columnar export of every round for offline analysis (--export).
+# Rows are buffered in typed arrays (one per column) and written out as a
+# chunk file at the end of every match, every EXPORT_FLUSH_INTERVAL seconds
+# or every EXPORT_ROW_GROUP rows, whichever comes first, so memory is bounded
+# however long the session runs and a crash loses at most the current match.
+# Parquet (pyarrow, imported only once exporting starts) is used when
+# installed, then NumPy .npz chunks, then plain CSV chunks. Per-player
+# columns are padded to MAX_PLAYERS with NaN / 0 so every column loads
+# straight into a 1-D NumPy array.
+EXPORT_DIR = os.path.join(os.path.dirname(__file__), "exports")
+EXPORT_ROW_GROUP = 1024
+EXPORT_FLUSH_INTERVAL = 60.0  # seconds
+exporter = None  # RoundExporter while exporting
+pyarrow = None  # imported by RoundExporter
+
+# also used by SESSION HISTORY; effects.py has already loaded it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class RoundExporter:
+    # (column name, array typecode, numpy dtype)
+    BASE_COLUMNS = [
+        ("match", 'q', "int64"),
+        ("round", 'i', "int32"),
+        ("seed", 'q', "int64"),
+        ("points_to_win", 'h', "int16"),
+        ("num_players", 'b', "int8"),
+        ("wait_time", 'd', "float64"),
+        ("go_color", 'b', "int8"),
+        ("status", 'b', "int8"),
+        ("players_mask", 'q', "int64"),
+        ("reaction_time", 'd', "float64"),
+        ("late_mask", 'q', "int64"),  # presses after the decision (stats only)
+    ]
+
+    def __init__(self, out_dir=EXPORT_DIR, row_group=EXPORT_ROW_GROUP, fmt=None):
+        global pyarrow
+        self.out_dir = out_dir
+        self.row_group = row_group
+        if fmt in (None, "parquet") and pyarrow is None:
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                pyarrow = None
+        if fmt is None:
+            fmt = "parquet" if pyarrow is not None else ("npz" if numpy is not None else "csv")
+        self.fmt = fmt
+        self.session = time_module.strftime("%Y%m%d-%H%M%S")
+        self.columns = list(self.BASE_COLUMNS)
+        for i in range(MAX_PLAYERS):
+            self.columns.append((f"p{i+1}_time", 'd', "float64"))
+        for i in range(MAX_PLAYERS):
+            self.columns.append((f"p{i+1}_delta", 'b', "int8"))
+        self._reset_buffers()
+        self.groups_written = 0
+        self.rows_written = 0
+        self.last_flush = time_module.monotonic()
+        self._match = 0
+        self._schedule = None
+        self._last_scores = []
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _reset_buffers(self):
+        self.buffers = [array(code) for _, code, _ in self.columns]
+
+    def resume(self, schedule, scores):
+        """A resumed match: deltas continue from its journaled scores."""
+        self._schedule = schedule
+        self._match += 1
+        self._last_scores = list(scores)
+
+    def add_round(self, round_num, status, players, reaction_time, scores, player_times, schedule):
+        if schedule is not self._schedule:
+            # a new schedule means a new match
+            self._schedule = schedule
+            self._match += 1
+            self._last_scores = [0] * len(scores)
+        if schedule is not None:
+            wait_time, color_code = schedule.get(round_num)
+            seed = schedule.seed
+        else:
+            wait_time, color_code, seed = float("nan"), -1, -1
+        mask = 0
+        for p in players or ():
+            mask |= 1 << p
+        row = [self._match, round_num, seed, settings.points_to_win, len(scores),
+               wait_time, color_code, STATUS_CODES.get(status, -1), mask,
+               float("nan") if reaction_time is None else reaction_time,
+               0 if status == "false_start" else last_late_mask]
+        nan = float("nan")
+        for i in range(MAX_PLAYERS):
+            t = player_times[i] if i < len(player_times) else None
+            row.append(nan if t is None or status == "false_start" else t)
+        for i in range(MAX_PLAYERS):
+            if i < len(scores):
+                before = self._last_scores[i] if i < len(self._last_scores) else 0
+                row.append(scores[i] - before)
+            else:
+                row.append(0)
+        self._last_scores = list(scores)
+        for buf, value in zip(self.buffers, row):
+            buf.append(value)
+        if (len(self.buffers[0]) >= self.row_group or
+                time_module.monotonic() - self.last_flush >= EXPORT_FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows as one chunk file."""
+        rows = len(self.buffers[0])
+        self.last_flush = time_module.monotonic()
+        if rows == 0:
+            return
+        try:
+            if self.fmt == "parquet":
+                self._write_parquet()
+            elif self.fmt == "npz":
+                self._write_npz()
+            else:
+                self._write_csv()
+            self.groups_written += 1
+            self.rows_written += rows
+        except Exception as e:
+            debug_log(f"export: failed to write row group: {e}")
+        self._reset_buffers()
+
+    def _chunk_path(self, ext):
+        return os.path.join(self.out_dir, f"rounds-{self.session}-{self.groups_written:05d}.{ext}")
+
+    def _write_parquet(self):
+        # pyarrow exposes its types under the numpy dtype names (pyarrow.int64() ...)
+        arrays = [pyarrow.array(buf, type=getattr(pyarrow, dtype)())
+                  for buf, (_, _, dtype) in zip(self.buffers, self.columns)]
+        table = pyarrow.Table.from_arrays(arrays, names=[name for name, _, _ in self.columns])
+        # a closed file per chunk: an open writer has no footer until close()
+        pyarrow.parquet.write_table(table, self._chunk_path("parquet"))
+
+    def _write_npz(self):
+        # frombuffer gives zero-copy views over the array module buffers
+        arrays = {name: numpy.frombuffer(buf, dtype=dtype)
+                  for buf, (name, _, dtype) in zip(self.buffers, self.columns)}
+        numpy.savez(self._chunk_path("npz"), **arrays)
+
+    def _write_csv(self):
+        with open(self._chunk_path("csv"), "w", encoding="utf-8") as f:
+            f.write(",".join(name for name, _, _ in self.columns) + "\n")
+            for row in zip(*self.buffers):
+                f.write(",".join(repr(v) for v in row) + "\n")
+
+    def close(self):
+        self.flush()
+        debug_log(f"export: {self.rows_written} rounds in {self.groups_written} {self.fmt} group(s)")
+
+
+def _export_round(event):
+    exporter.add_round(event.round_num, event.status, event.players, event.reaction_time,
+                       event.scores, event.player_times, event.schedule)
+
+
+def _export_match_end(event):
+    exporter.flush()
+
+
+def start_export(out_dir=EXPORT_DIR):
+    global exporter
+    exporter = RoundExporter(out_dir)
+    atexit.register(exporter.close)
+    events.subscribe(RoundResolved, _export_round)
+    events.subscribe(MatchEnded, _export_match_end)
+    debug_log(f"export: writing {exporter.fmt} to {out_dir}")
+    return exporter
+
+
+###############
+# SESSION HISTORY
+###############
+# Every press this session as typed array columns (one row per player per
+# round: round, match, player, time, status, trap). Columns grow by doubling
+# into a fresh buffer, so appends are amortized O(1) and views handed out
+# earlier stay valid without copying; they just keep the old buffer alive.
+# Each player's GREEN-round times also get their own column plus a running
+# prefix sum, so the graph screen can take any rolling average in O(1) and
+# only re-renders when rounds were added or the window changed.
+HISTORY_ROLLING = 20  # rounds in the rolling average
+HISTORY_INITIAL = 1024  # rows per column before the first growth
+HISTORY_MAX_TIME = 1.5  # seconds; the graph's y axis never goes past this
+
+
+class GrowableColumn:
+    def __init__(self, typecode, capacity=HISTORY_INITIAL):
+        self.typecode = typecode
+        self.buffer = array(typecode, [0]) * capacity
+        self.length = 0
+
+    def append(self, value):
+        if self.length == len(self.buffer):
+            # a new buffer rather than resizing: outstanding views pin the old one
+            self.buffer = self.buffer + array(self.typecode, [0]) * len(self.buffer)
+        self.buffer[self.length] = value
+        self.length += 1
+
+    def view(self):
+        """Zero-copy memoryview of the filled rows."""
+        return memoryview(self.buffer)[:self.length]
+
+    def array(self):
+        """Zero-copy NumPy view of the filled rows (NumPy must be installed)."""
+        return numpy.frombuffer(self.buffer, dtype=self.typecode, count=self.length)
+
+
+class SessionHistory:
+    COLUMNS = (("round", 'I'), ("match", 'I'), ("player", 'B'),
+               ("time", 'f'), ("status", 'b'), ("trap", 'b'))
+
+    def __init__(self):
+        self.columns = {name: GrowableColumn(code) for name, code in self.COLUMNS}
+        self.rounds = 0
+        self.match = 1
+        self.times = []  # per player: GREEN-round times (seconds)
+        self.prefix = []  # per player: prefix[k] = sum of the first k times
+
+    def __len__(self):
+        return self.columns["round"].length
+
+    def column(self, name):
+        return self.columns[name].view()
+
+    def record(self, event):
+        self.rounds += 1
+        status = STATUS_CODES.get(event.status, -1)
+        trap = event.go_color is not None and event.go_color != ACCENT_GREEN
+        if event.status == "false_start":
+            presses = [(p, float("nan")) for p in event.players or ()]
+        else:
+            presses = [(i, t) for i, t in enumerate(event.player_times or ()) if t is not None]
+        cols = self.columns
+        for player, t in presses:
+            cols["round"].append(self.rounds)
+            cols["match"].append(self.match)
+            cols["player"].append(player)
+            cols["time"].append(t)
+            cols["status"].append(status)
+            cols["trap"].append(trap)
+            if not trap and event.status != "false_start":
+                while len(self.times) <= player:
+                    self.times.append(GrowableColumn('f'))
+                    prefix = GrowableColumn('d')
+                    prefix.append(0.0)
+                    self.prefix.append(prefix)
+                self.times[player].append(t)
+                prefix = self.prefix[player]
+                prefix.append(prefix.buffer[prefix.length - 1] + t)
+
+    def match_ended(self, event):
+        self.match += 1
+
+    def rolling(self, player, end, window=HISTORY_ROLLING):
+        """Mean of the player's GREEN times [end - window, end)."""
+        start = max(0, end - window)
+        if end <= start:
+            return None
+        prefix = self.prefix[player].buffer
+        return (prefix[end] - prefix[start]) / (end - start)
+
+
+session_history = SessionHistory()
+events.subscribe(RoundResolved, session_history.record)
+events.subscribe(MatchEnded, session_history.match_ended)
+
+
+def history_columns(history, player, width):
+    """Per pixel column (min, max, rolling mean at the column's last round).
+
+    With more rounds than pixels every column covers a run of rounds, so a
+    redraw does one pass over the data (vectorized with NumPy) no matter how
+    long the session has been.
+    """
+    n = history.times[player].length
+    bins = min(n, width)
+    if bins == 0:
+        return []
+    starts = [c * n // bins for c in range(bins)]
+    ends = starts[1:] + [n]
+    if numpy is not None:
+        times = history.times[player].array()
+        prefix = history.prefix[player].array()
+        idx = numpy.array(starts, dtype=numpy.intp)
+        mins = numpy.minimum.reduceat(times, idx)
+        maxs = numpy.maximum.reduceat(times, idx)
+        end = numpy.array(ends, dtype=numpy.intp)
+        begin = numpy.maximum(end - HISTORY_ROLLING, 0)
+        means = (prefix[end] - prefix[begin]) / (end - begin)
+        return list(zip(mins.tolist(), maxs.tolist(), means.tolist()))
+    times = history.times[player].view()
+    return [(min(times[s:e]), max(times[s:e]), history.rolling(player, e))
+            for s, e in zip(starts, ends)]
+
+
+def draw_history_graph(surface, rect, history, focus=None):
+    """Plot each player's GREEN-round times (thin) and rolling mean (thick)."""
+    players = [p for p in range(len(history.times)) if history.times[p].length]
+    if focus is not None:
+        players = [p for p in players if p == focus]
+    series = {p: history_columns(history, p, rect.width) for p in players}
+    top = max((mx for cols in series.values() for _, mx, _ in cols), default=0.3)
+    y_max = min(HISTORY_MAX_TIME, max(0.3, math.ceil(top * 10) / 10))
+
+    def y(t):
+        return rect.bottom - int(min(t, y_max) / y_max * rect.height)
+
+    pygame.draw.rect(surface, CARD_BG, rect)
+    step = 0.1 if y_max <= 0.6 else 0.25
+    tick = step
+    while tick < y_max + 1e-9:
+        pygame.draw.line(surface, (45, 52, 70), (rect.left, y(tick)), (rect.right, y(tick)))
+        label = atlas.text(TINY, f"{tick * 1000:.0f}", TEXT_GRAY)
+        surface.blit(label, (rect.left - label.get_width() - 6, y(tick) - label.get_height() // 2))
+        tick += step
+    # spreads first, then every rolling mean on top of all of them
+    lines = []
+    for p, cols in series.items():
+        color = HUD_COLORS[p % len(HUD_COLORS)]
+        faint = tuple(c // 2 for c in color)
+        x_scale = rect.width / len(cols)
+        means = []
+        for c, (lo, hi, mean) in enumerate(cols):
+            x = rect.left + int(c * x_scale)
+            pygame.draw.line(surface, faint, (x, y(hi)), (x, y(lo)))
+            means.append((x, y(mean)))
+        lines.append((color, means))
+    for color, means in lines:
+        if len(means) > 1:
+            pygame.draw.lines(surface, color, False, means, 2)
+    return y_max
+
+
+history_graph_cache = [None, None]  # [key, rendered surface]
+display.on_resize(lambda size: history_graph_cache.__setitem__(slice(None), [None, None]))
+
+
+def show_session_graph():
+    """Graph screen: reaction times this session. TAB cycles the focused player."""
+    focus = None
+    pygame.event.clear()
+    while True:
+        sync_window_size()
+        key = (WIDTH, HEIGHT, focus, len(session_history))
+        if history_graph_cache[0] != key:
+            frame = pygame.Surface((WIDTH, HEIGHT))
+            draw_gradient_background(frame, DARK_BG, (20, 25, 40))
+            draw_text("Session Reaction Times", ACCENT_CYAN, -HEIGHT // 2 + 40, "small", surface=frame)
+            rect = pygame.Rect(70, 80, WIDTH - 100, HEIGHT - 190)
+            if any(t.length for t in session_history.times):
+                draw_history_graph(frame, rect, session_history, focus)
+            else:
+                draw_text("No rounds played yet this session", TEXT_GRAY, 0, "small", surface=frame)
+            legend = []
+            for p, times in enumerate(session_history.times):
+                if times.length and focus in (None, p):
+                    mean = session_history.rolling(p, times.length)
+                    legend.append((f"P{p+1} {mean * 1000:.0f}ms ({times.length})", HUD_COLORS[p % len(HUD_COLORS)]))
+            x, y = rect.left, rect.bottom + 12
+            for text, color in legend:
+                label = atlas.text(TINY, text, color)
+                if x + label.get_width() > rect.right:
+                    x, y = rect.left, y + 22
+                frame.blit(label, (x, y))
+                x += label.get_width() + 18
+            hint = (f"mean of last {HISTORY_ROLLING} green rounds | {session_history.rounds} rounds"
+                    f" | TAB: {'all players' if focus is None else f'P{focus + 1}'} | ENTER to return")
+            draw_text(hint, TEXT_GRAY, HEIGHT // 2 - 24, "tiny", surface=frame)
+            history_graph_cache[:] = [key, atlas.convert(frame)]
+        WIN.blit(history_graph_cache[1], (0, 0))
+        present()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_RETURN, pygame.K_ESCAPE):
+                    return
+                if event.key == pygame.K_TAB:
+                    players = len(session_history.times)
+                    focus = 0 if focus is None else focus + 1
+                    if focus >= players:
+                        focus = None
+            handle_window_events(event)
+        clock.tick(30)
+
+
+###############
+# RESULTS UPLOAD
+###############
+# Optional uploader (--upload[=URL]) that ships finished rounds and matches to
+# a central aggregator (aggregator.py). Bus subscribers only append records
+# to memory; a background thread seals them every UPLOAD_INTERVAL (or every
+# UPLOAD_BATCH records) into gzip batch files in OUTBOX_DIR, written
+# atomically, then POSTs the outbox oldest first and deletes a file only once
+# the server has acknowledged it. The game never waits on the network, a dead
+# aggregator just lets the outbox grow, and batches left over from a crash or
+# an offline session are sent on the next run. Every record carries an id
+# (cabinet:session:sequence) and every batch an Idempotency-Key, so a retried
+# batch is never counted twice.
+UPLOAD_URL = "http://127.0.0.1:9480/ingest"
+OUTBOX_DIR = os.path.join(os.path.dirname(__file__), "outbox")
+UPLOAD_BATCH = 500  # records per batch file
+UPLOAD_INTERVAL = 2.0  # seconds between seal/send passes
+UPLOAD_TIMEOUT = 5.0
+UPLOAD_MAX_BACKOFF = 60.0
+CABINET_ID = socket.gethostname()
+uploader = None  # ResultUploader while uploading
+
+
+class ResultUploader:
+    def __init__(self, url=UPLOAD_URL, outbox_dir=OUTBOX_DIR, cabinet=CABINET_ID,
+                 batch_size=UPLOAD_BATCH, interval=UPLOAD_INTERVAL):
+        self.url = url
+        self.outbox_dir = outbox_dir
+        self.cabinet = cabinet
+        self.batch_size = batch_size
+        self.interval = interval
+        self.session = f"{time_module.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.pending = collections.deque()
+        self.seq = 0
+        self.batches = 0
+        self.sent = 0  # records acknowledged by the server
+        self.failures = 0
+        self._match = 0
+        self._schedule = None
+        self._wake = threading.Event()
+        self._stop = False
+        os.makedirs(outbox_dir, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name="uploader", daemon=True)
+        self.thread.start()
+
+    def add(self, kind, fields):
+        """Queue one record; called on the game thread, never blocks."""
+        self.seq += 1
+        record = {"id": f"{self.cabinet}:{self.session}:{self.seq}", "kind": kind,
+                  "cabinet": self.cabinet, "session": self.session, "ts": time_module.time()}
+        record.update(fields)
+        self.pending.append(record)
+        if len(self.pending) >= self.batch_size:
+            self._wake.set()
+
+    def add_round(self, event):
+        if event.schedule is not self._schedule:
+            self._schedule = event.schedule
+            self._match += 1
+        self.add("round", {"match": self._match, "round": event.round_num, "status": event.status,
+                           "players": event.players, "reaction_time": event.reaction_time,
+                           "trap": event.go_color is not None and event.go_color != ACCENT_GREEN,
+                           "scores": event.scores, "times": event.player_times})
+
+    def add_match(self, event):
+        self.add("match", {"match": self._match, "scores": event.scores,
+                           "winners": list(event.winners)})
+
+    def seal(self):
+        """Move pending records into a gzip batch file in the outbox."""
+        import gzip
+        while self.pending:
+            records = []
+            while self.pending and len(records) < self.batch_size:
+                records.append(self.pending.popleft())
+            self.batches += 1
+            batch_id = f"{self.cabinet}:{self.session}:b{self.batches}"
+            name = f"batch-{self.session}-{self.batches:06d}.json.gz"
+            body = json.dumps({"batch": batch_id, "cabinet": self.cabinet, "records": records},
+                              separators=(",", ":")).encode("utf-8")
+            path = os.path.join(self.outbox_dir, name)
+            try:
+                with open(path + ".tmp", "wb") as f:
+                    f.write(gzip.compress(body, 6))
+                os.replace(path + ".tmp", path)
+            except OSError as e:
+                debug_log(f"upload: could not write {name}: {e}")
+                self.pending.extendleft(reversed(records))
+                return
+
+    def send_outbox(self):
+        """POST sealed batches oldest first; stop at the first failure."""
+        import gzip
+        import urllib.request
+        try:
+            names = sorted(n for n in os.listdir(self.outbox_dir)
+                           if n.startswith("batch-") and n.endswith(".json.gz"))
+        except OSError:
+            return True
+        for name in names:
+            path = os.path.join(self.outbox_dir, name)
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+                # cabinet:session:bN; file names alone can repeat across cabinets
+                key = json.loads(gzip.decompress(body)).get("batch") or name
+                request = urllib.request.Request(self.url, data=body, method="POST", headers={
+                    "Content-Type": "application/json",
+                    "Content-Encoding": "gzip",
+                    "Idempotency-Key": key,
+                })
+                with urllib.request.urlopen(request, timeout=UPLOAD_TIMEOUT) as response:
+                    reply = json.loads(response.read() or b"{}")
+                os.remove(path)
+                self.sent += reply.get("accepted", 0) + reply.get("duplicates", 0)
+            except Exception as e:
+                self.failures += 1
+                debug_log(f"upload: {name} not sent: {e}")
+                return False
+        return True
+
+    def _run(self):
+        backoff = self.interval
+        while not self._stop:
+            self._wake.wait(backoff)
+            self._wake.clear()
+            self.seal()
+            if self.send_outbox():
+                backoff = self.interval
+            else:
+                backoff = min(UPLOAD_MAX_BACKOFF, backoff * 2)
+
+    def close(self, timeout=2.0):
+        """Seal what's pending and make one last send attempt."""
+        self._stop = True
+        self._wake.set()
+        self.thread.join(timeout)
+        self.seal()
+        self.send_outbox()
+
+
+def start_upload(url=UPLOAD_URL, outbox_dir=OUTBOX_DIR):
+    global uploader
+    uploader = ResultUploader(url, outbox_dir)
+    atexit.register(uploader.close)
+    events.subscribe(RoundResolved, uploader.add_round)
+    events.subscribe(MatchEnded, uploader.add_match)
+    debug_log(f"upload: sending results to {url} (outbox {outbox_dir})")
+    return uploader
+
+
+###############
+# FRAME RECORDER
+###############
+# Debug recorder (--record, or --record=flagged) for settling disputed rounds.
+# present() blits every frame it shows into a ring of RECORD_FRAMES reused
+# surfaces and keeps the flip timestamp with it; the prerendered GO frame is
+# kept by reference. When a round finishes (with =flagged, only when F8 is
+# pressed on its result or match-winner screen) the round's frames go to a
+# writer thread that saves them as PNGs plus an index.json lining each press
+# up with the frame that was on screen at that moment. The main thread never
+# encodes or writes; the writer hands surfaces back through a queue.
+# At most 2 * RECORD_FRAMES window-sized surfaces exist: the ring plus rounds
+# the writer hasn't finished; a round that would go past that is dropped.
+RECORD_DIR = os.path.join(os.path.dirname(__file__), "recordings")
+RECORD_FRAMES = 90  # ring size; a round keeps its most recent frames
+RECORD_MODES = ("all", "flagged")
+
+
+class FrameRecorder:
+    def __init__(self, out_dir=RECORD_DIR, mode="all", capacity=RECORD_FRAMES):
+        import queue
+        if mode not in RECORD_MODES:
+            raise ValueError(f"unknown record mode {mode!r} (expected all or flagged)")
+        self.out_dir = out_dir
+        self.mode = mode
+        self.capacity = capacity
+        self.ring = collections.deque()  # (seq, flip ns, phase, surface, owned)
+        self.pool = []  # spare ring surfaces, handed back by the writer
+        self.outstanding = 0  # copied frames the writer still holds (main thread only)
+        self.seq = 0
+        self.round_start = 0  # seq of the first frame of the current round
+        self.match = 1
+        self.pending = None  # finished round not yet written (flagged mode)
+        self.last_dir = None
+        self.dropped = 0
+        self.session = time_module.strftime("%Y%m%d-%H%M%S")
+        self.queue = queue.Queue()
+        self.returned = queue.Queue()  # surfaces the writer is done with
+        self.thread = threading.Thread(target=self._run, name="frame-recorder", daemon=True)
+        self.thread.start()
+
+    def capture(self, surface, t_ns, phase=None, owned=False):
+        """Keep a frame shown at t_ns. owned=True keeps a prerendered surface by reference."""
+        if owned:
+            frame = surface
+        else:
+            frame = self.pool.pop() if self.pool else None
+            if frame is None or frame.get_size() != surface.get_size():
+                frame = surface.copy()
+            else:
+                frame.blit(surface, (0, 0))
+        self.ring.append((self.seq, t_ns, phase or current_phase, frame, not owned))
+        self.seq += 1
+        if len(self.ring) > self.capacity:
+            old = self.ring.popleft()
+            if old[4]:
+                self.pool.append(old[3])
+
+    def round_started(self, event):
+        self._reclaim()
+        self.round_start = self.seq
+        self.pending = None
+
+    def _reclaim(self):
+        """Take back the surfaces of rounds the writer has finished."""
+        while not self.returned.empty():
+            copies = self.returned.get_nowait()
+            self.pool.extend(copies)
+            self.outstanding -= len(copies)
+
+    def round_resolved(self, event):
+        self.pending = {
+            "match": self.match,
+            "round": event.round_num,
+            "status": event.status,
+            "players": event.players,
+            "reaction_time": event.reaction_time,
+            "trap": event.go_color is not None and event.go_color != ACCENT_GREEN,
+            "player_times": list(event.player_times or ()),
+            "window_start_ns": last_window_start_ns if event.go_color is not None else None,
+        }
+        if self.mode == "all":
+            self.dump()
+
+    def match_ended(self, event):
+        self.match += 1
+
+    def flag(self):
+        """F8 on the round result screen: keep this round."""
+        if self.pending is not None:
+            self.pending["flagged"] = True
+            self.dump()
+        elif self.last_dir is not None:
+            self.queue.put(("flag", self.last_dir))
+        debug_log("recorder: round flagged")
+
+    def dump(self):
+        """Hand the current round's frames to the writer thread."""
+        self._reclaim()
+        info, self.pending = self.pending, None
+        frames = []
+        while self.ring and self.ring[-1][0] >= self.round_start:
+            frames.append(self.ring.pop())
+        frames.reverse()
+        self.round_start = self.seq
+        copies = [f[3] for f in frames if f[4]]
+        if self.outstanding + len(copies) > self.capacity:
+            self.dropped += 1
+            self.pool.extend(copies)
+            debug_log(f"recorder: writer busy, dropped round {info['round']}")
+            return
+        self.outstanding += len(copies)
+        path = os.path.join(self.out_dir, f"{self.session}-m{info['match']:03d}-r{info['round']:03d}")
+        self.queue.put(("round", path, info, frames))
+        self.last_dir = path
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            try:
+                if job[0] == "flag":
+                    with open(os.path.join(job[1], "FLAGGED"), "w") as f:
+                        f.write("flagged on the result screen\n")
+                else:
+                    self._write(*job[1:])
+            except Exception as e:
+                debug_log(f"recorder: write failed: {e}")
+            finally:
+                if job[0] == "round":
+                    self.returned.put([f[3] for f in job[3] if f[4]])
+
+    def _write(self, path, info, frames):
+        os.makedirs(path, exist_ok=True)
+        go_ns = next((t for _, t, phase, _, _ in frames if phase == "go"), None)
+        index = []
+        for n, (seq, t_ns, phase, surface, _) in enumerate(frames):
+            name = f"{n:04d}.png"
+            pygame.image.save(surface, os.path.join(path, name))
+            index.append({"file": name, "seq": seq, "flip_ns": t_ns, "phase": phase,
+                          "ms_from_go": None if go_ns is None else (t_ns - go_ns) / 1e6})
+        presses = []
+        start = info["window_start_ns"]
+        for player, t in enumerate(info["player_times"]):
+            if t is None or start is None:
+                continue
+            press_ns = start + round(t * NS_PER_SECOND)
+            # the frame that was on screen when the key went down
+            shown = [f["file"] for f in index if f["flip_ns"] <= press_ns]
+            presses.append({"player": player + 1, "time": t, "press_ns": press_ns,
+                            "ms_from_go": None if go_ns is None else (press_ns - go_ns) / 1e6,
+                            "frame": shown[-1] if shown else None})
+        info = dict(info, go_ns=go_ns, frames=index, presses=presses,
+                    note="press times are after input-lag compensation")
+        tmp = os.path.join(path, "index.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=1)
+        os.replace(tmp, os.path.join(path, "index.json"))
+
+    def close(self, timeout=5.0):
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+
+def start_recorder(mode="all", out_dir=RECORD_DIR):
+    global recorder
+    recorder = FrameRecorder(out_dir, mode)
+    atexit.register(recorder.close)
+    events.subscribe(RoundStarted, recorder.round_started)
+    events.subscribe(RoundResolved, recorder.round_resolved)
+    events.subscribe(MatchEnded, recorder.match_ended)
+    debug_log(f"recorder: keeping {recorder.capacity} frames, writing {mode} rounds to {out_dir}")
+    return recorder
+
+
+###############
+# MATCH JOURNAL
+###############
+# Append-only JSONL journal of the match in progress so a crash, power blip or
+# stray exit doesn't lose it. Every record is a full snapshot (scores, next
+# round, settings, schedule seed), never a delta, so resuming reads only the
+# last complete line from the end of the file instead of replaying it; a torn
+# final line from a crash is skipped. Records are buffered as rounds resolve
+# and written with one fsync per commit(), which main() calls between rounds,
+# so the disk never gets touched inside the timed window. After
+# JOURNAL_COMPACT_LINES records the file is atomically rewritten to just the
+# latest one.
+JOURNAL_PATH = os.path.join(os.path.dirname(__file__), "match_journal.jsonl")
+JOURNAL_COMPACT_LINES = 256
+
+
+class MatchJournal:
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self.buffer = []
+        self.lines = None  # records in the file since the last compaction
+        self._file = None
+        self.last = None  # latest snapshot, committed or not
+
+    def record(self, state, scores, round_num, schedule):
+        """Buffer a snapshot. state is "playing" or "ended"."""
+        self.last = {
+            "v": 1,
+            "state": state,
+            "round": round_num,  # next round to play
+            "scores": list(scores),
+            "points_to_win": settings.points_to_win,
+            "num_players": settings.num_players,
+            "bindings": [binding_id(b) for b in settings.player_keys],
+            "seed": schedule.seed if schedule is not None else None,
+            "ts": time_module.time(),
+        }
+        self.buffer.append(json.dumps(self.last, separators=(",", ":")))
+
+    def commit(self):
+        """Write buffered records with one fsync; call between rounds only."""
+        if not self.buffer:
+            return
+        try:
+            head = ""
+            if self._file is None:
+                head = self._torn_tail()
+                self._file = open(self.path, "a", encoding="utf-8")
+                if self.lines is None:
+                    self.lines = 0 if self._file.tell() == 0 else JOURNAL_COMPACT_LINES
+            self._file.write(head + "\n".join(self.buffer) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.lines += len(self.buffer)
+            self.buffer = []
+            if self.lines > JOURNAL_COMPACT_LINES:
+                self.compact()
+        except Exception as e:
+            debug_log(f"journal commit failed: {e}")
+
+    def _torn_tail(self):
+        """Newline to end a line a crash left half-written, so ours stays parseable."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                return "" if f.read(1) == b"\n" else "\n"
+        except OSError:
+            return ""  # missing or empty
+
+    def compact(self):
+        """Atomically replace the journal with its latest record."""
+        if self.last is None:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.last, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.replace(tmp, self.path)
+        try:
+            dir_fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass  # not supported on every platform (e.g. Windows)
+        self.lines = 1
+
+    def latest(self):
+        """Last complete snapshot in the file, read backwards from the end."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                end = f.tell()
+                chunk = 4096
+                data = b""
+                while end > 0:
+                    start = max(0, end - chunk)
+                    f.seek(start)
+                    data = f.read(end - start) + data
+                    end = start
+                    lines = data.split(b"\n")
+                    # lines[0] may be partial unless we reached the file start
+                    candidates = lines if end == 0 else lines[1:]
+                    for line in reversed(candidates):
+                        try:
+                            snapshot = json.loads(line)
+                        except ValueError:
+                            continue  # empty or torn line
+                        if isinstance(snapshot, dict) and snapshot.get("v") == 1:
+                            return snapshot
+                    chunk *= 2
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            debug_log(f"journal read failed: {e}")
+        return None
+
+    def resumable(self):
+        snapshot = self.latest()
+        if snapshot is not None and snapshot.get("state") == "playing" and snapshot.get("round", 1) > 1:
+            return snapshot
+        return None
+
+    def close(self):
+        self.commit()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+journal = MatchJournal()
+atexit.register(journal.close)
+
+
+def _journal_round(event):
+    journal.record("playing", event.scores, event.round_num + 1, event.schedule)
+
+
+def _journal_match_start(event):
+    if event.round_num == 1:
+        journal.record("playing", event.scores, 1, current_schedule)
+
+
+def _journal_match_end(event):
+    journal.record("ended", event.scores, 0, None)
+
+
+events.subscribe(RoundStarted, _journal_match_start)
+events.subscribe(RoundResolved, _journal_round)
+events.subscribe(MatchEnded, _journal_match_end)
+
+
+def resume_match(snapshot):
+    """Restore settings from a journal snapshot; returns (scores, round_num, schedule)."""
+    settings.points_to_win = snapshot["points_to_win"]
+    settings.num_players = snapshot["num_players"]
+    settings.player_keys = [parse_binding_id(b) for b in snapshot["bindings"]]
+    schedule = new_match_schedule(snapshot["seed"])
+    if exporter is not None:
+        exporter.resume(schedule, snapshot["scores"])
+    debug_log(f"journal: resumed round {snapshot['round']} scores {snapshot['scores']}")
+    return list(snapshot["scores"]), snapshot["round"], schedule
+
+
+###############
+# ROUND HOOKS
+###############
+def round_finished(round_num, status, players, reaction_time, go_color, scores):
+    """Called by main once a round is adjudicated and scores are updated.
+
+    Announces the round (and the end of the match, if this round decided it)
+    on the event bus; stats, metrics, export and broadcast all subscribe there.
+    go_color is None for a false start, which has no press times.
+    """
+    player_times = last_player_times if go_color is not None else []
+    events.emit(RoundResolved, round_num, status, players, reaction_time, go_color,
+                list(scores), player_times, current_schedule)
+    if max(scores) >= settings.points_to_win:
+        events.emit(MatchEnded, list(scores), match_winners(scores))
+    # the timed window is over; this is the one fsync per round
+    journal.commit()
+
+
 def main():
+    global current_schedule
+    clock_selftest()
     while True:
         # Show menu
-        if not show_menu():
+        choice = run_phase("show_menu", show_menu)
+        if not choice:
             pygame.quit()
             sys.exit()
        
-        # Initialize scores for all players
-        scores = [0] * settings.num_players
-        round_num = 1
+        if choice == "resume":
+            scores, round_num, current_schedule = resume_match(journal.resumable())
+        else:
+            # Initialize scores for all players
+            scores = [0] * settings.num_players
+            round_num = 1
+            current_schedule = new_match_schedule()
        
         # Main game loop
         while True:
             # Keep our stored size synced when entering a new round
             sync_window_size()
+            events.emit(RoundStarted, round_num, list(scores))
             # Wait for the GO signal
-            result, go_color = wait_for_go(round_num, scores)
+            result, go_color = run_phase("wait_for_go", wait_for_go, round_num, scores, current_schedule)
 
 
             if result == "menu":
+                if metrics is not None:
+                    metrics.observe_round("menu")
                 break
 
 
             if result == "false_start":
                 # Find which player false started
-                if go_color in settings.player_keys:
-                    false_starter = settings.player_keys.index(go_color)
+                if go_color is not None:
+                    false_starter = go_color
                     # Deduct a point from the offending player (not below 0)
-                    scores[false_starter] = max(0, scores[false_starter] - 1)
+                    apply_round(scores, "false_start", [false_starter], DEFAULT_RULES)
+                    round_finished(round_num, "false_start", [false_starter], None, None, scores)
 
 
                     # If this round causes the match to end, skip round screen and show match winner
                     match_over = max(scores) >= settings.points_to_win
                     if match_over:
-                        return_to_menu = show_match_winner(scores)
+                        return_to_menu = run_phase("show_match_winner", show_match_winner, scores)
                         if return_to_menu:
                             break
                         else:
                             # Start new match immediately (reset scores and continue)
                             scores = [0] * settings.num_players
                             round_num = 1
+                            current_schedule = new_match_schedule()
                             continue
                     else:
-                        action = show_round_winner([false_starter], None, True)
+                        action = run_phase("show_round_winner", show_round_winner, [false_starter], None, True)
                         if action == "menu":
                             break
 
 
             else:
                 # Regular round (pass go_color to reaction_phase)
-                status, players, reaction_time = reaction_phase(round_num, scores, go_color)
+                status, players, reaction_time = run_phase("reaction_phase", reaction_phase, round_num, scores, go_color)
                 if status == "menu":
+                    if metrics is not None:
+                        metrics.observe_round("menu", go_color)
                     break
 
 
                 if status == "no_response":
                     # No one responded in time
-                    action = show_round_winner(None, None, False)
+                    round_finished(round_num, status, players, reaction_time, go_color, scores)
+                    action = run_phase("show_round_winner", show_round_winner, None, None, False)
                     if action == "menu":
                         break
                 elif status == "tie":
                     # Exact tie -- no points awarded
-                    action = show_round_winner([], None, False)
+                    round_finished(round_num, status, players, reaction_time, go_color, scores)
+                    action = run_phase("show_round_winner", show_round_winner, [], None, False)
                     if action == "menu":
                         break
                 elif status == "winner":
                     # Award point(s) to winner(s)
-                    for winner in players:
-                        scores[winner] += 1
+                    apply_round(scores, status, players, DEFAULT_RULES)
+                    round_finished(round_num, status, players, reaction_time, go_color, scores)
                     match_over = max(scores) >= settings.points_to_win
                     if match_over:
-                        return_to_menu = show_match_winner(scores)
+                        return_to_menu = run_phase("show_match_winner", show_match_winner, scores)
                         if return_to_menu:
                             break
                         else:
                             scores = [0] * settings.num_players
                             round_num = 1
+                            current_schedule = new_match_schedule()
                             continue
                     else:
-                        action = show_round_winner(players, reaction_time, False)
+                        action = run_phase("show_round_winner", show_round_winner, players, reaction_time, False)
                         if action == "menu":
                             break
                 elif status == "fault":
                     # Deduct a point from the offending player(s)
-                    for offender in players:
-                        scores[offender] = max(0, scores[offender] - 1)
+                    apply_round(scores, status, players, DEFAULT_RULES)
+                    round_finished(round_num, status, players, reaction_time, go_color, scores)
                     match_over = max(scores) >= settings.points_to_win
                     if match_over:
-                        return_to_menu = show_match_winner(scores)
+                        return_to_menu = run_phase("show_match_winner", show_match_winner, scores)
                         if return_to_menu:
                             break
                         else:
                             scores = [0] * settings.num_players
                             round_num = 1
+                            current_schedule = new_match_schedule()
                             continue
                     else:
                         # Show fault screen
-                        action = show_round_winner(players, reaction_time, True)
+                        action = run_phase("show_round_winner", show_round_winner, players, reaction_time, True,
+                                           trap_color=go_color)
                         if action == "menu":
                             break
 
@@ -1272,6 +4406,41 @@ def main():
 
 
 if __name__ == "__main__":
+    if "--profile" in sys.argv:
+        start_profiling()
+    for arg in sys.argv[1:]:
+        if arg == "--metrics" or arg.startswith("--metrics="):
+            _, _, port = arg.partition("=")
+            start_metrics_server(int(port) if port else METRICS_PORT)
+        elif arg == "--export" or arg.startswith("--export="):
+            _, _, path = arg.partition("=")
+            start_export(path or EXPORT_DIR)
+        elif arg == "--upload" or arg.startswith("--upload="):
+            _, _, url = arg.partition("=")
+            start_upload(url or UPLOAD_URL)
+        elif arg == "--record" or arg.startswith("--record="):
+            _, _, mode = arg.partition("=")
+            try:
+                start_recorder(mode or "all")
+            except ValueError as e:
+                sys.exit(f"--record: {e}")
+        elif arg == "--effects":
+            EFFECTS_ANIMATED = True
+        elif arg == "--audio":
+            init_audio_cues()
+        elif arg == "--broadcast" or arg.startswith("--broadcast="):
+            _, _, where = arg.partition("=")
+            host, _, port = where.rpartition(":")
+            start_broadcast(int(port) if port else BROADCAST_PORT, host or BROADCAST_HOST)
+        elif arg.startswith("--broadcast-selftest"):
+            _, _, count = arg.partition("=")
+            broadcast_selftest(int(count) if count else 300)
+            pygame.quit()
+            sys.exit()
+        elif arg == "--bench-events":
+            event_bus_benchmark()
+            pygame.quit()
+            sys.exit()
     main()
 
 
@@ -0,0 +1,260 @@
+"""Long-session soak test for Reaction Duel.
+
+Drives the real main() flow headlessly (menu -> wait_for_go -> reaction_phase
+-> show_round_winner -> show_match_winner -> next match) with scripted input
+for many matches, sampling memory, pygame surfaces, object counts by type,
+event-queue depth and dequeue time along the way. Exits non-zero when
+anything grows or drifts past the thresholds.
+
+Dequeue time is how long after the reaction window opens the first scripted
+press is picked up. Scripted presses are injected on the window's first
+poll, so this measures the loop's event handling, not a GO-to-press latency.
+
+    SDL_VIDEODRIVER=dummy python soak.py --matches 20000 --csv soak.csv
+
+Waits, the GO hold and frame-rate caps are shortened so a run takes minutes
+rather than days; everything else is the code the cabinets run.
+"""
+import argparse
+import collections
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import reaction_duel as game
+
+
+class SoakDone(Exception):
+    pass
+
+
+class FastClock:
+    """Stand-in for pygame.time.Clock that doesn't sleep between frames."""
+
+    def tick(self, framerate=0):
+        return 0
+
+    def get_time(self):
+        return 0
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        # peak, not current, but still catches steady growth
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def count_objects():
+    objects = gc.get_objects()
+    counts = collections.Counter(type(o).__name__ for o in objects)
+    # Surfaces aren't gc-tracked themselves; find them through their referrers
+    surfaces = {id(r) for o in objects for r in gc.get_referents(o) if isinstance(r, pygame.Surface)}
+    counts["Surface"] = len(surfaces)
+    return counts
+
+
+class ScriptedInput:
+    """Replaces pygame.event.get and answers whatever phase main() is in."""
+
+    def __init__(self, matches, seed, false_start_rate=0.05):
+        self.target = matches
+        self.rng = random.Random(seed)
+        self.false_start_rate = false_start_rate
+        self.matches = 0
+        self.rounds = 0
+        self.max_queue = 0
+        self.dequeue_times = []
+        self._real_get = pygame.event.get
+        self._phase_calls = 0
+        self._last_phase = None
+        self._pressed_this_round = False
+
+    def key(self, key):
+        return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)
+
+    def get(self, *args, **kwargs):
+        events = self._real_get(*args, **kwargs)
+        phase = game.current_phase
+        if phase != self._last_phase:
+            self._last_phase = phase
+            self._phase_calls = 0
+            self._pressed_this_round = False
+        self._phase_calls += 1
+        events = list(events) + self.script(phase)
+        return events
+
+    def script(self, phase):
+        keys = game.settings.player_keys
+        if phase == "show_menu":
+            if self.matches >= self.target:
+                raise SoakDone()
+            return [self.key(pygame.K_SPACE)]
+        if phase == "wait_for_go":
+            if self._phase_calls == 1 and self.rng.random() < self.false_start_rate:
+                return [self.key(self.rng.choice(keys))]
+            return []
+        if phase == "reaction_phase":
+            if self._pressed_this_round:
+                return []
+            self._pressed_this_round = True
+            # usually one presser, sometimes several to exercise ties/faults
+            pressers = self.rng.sample(keys, self.rng.choice((1, 1, 1, 2)))
+            return [self.key(k) for k in pressers]
+        if phase == "show_round_winner":
+            self.rounds += 1
+            self.max_queue = max(self.max_queue, game.last_window_stats[2])
+            if game.last_player_times:
+                times = [t for t in game.last_player_times if t is not None]
+                if times:
+                    self.dequeue_times.append(min(times))
+            return [self.key(pygame.K_SPACE)]
+        if phase == "show_match_winner":
+            if self._phase_calls == 1:
+                self.matches += 1
+            # every tenth match, and the last one, goes back through the menu
+            to_menu = self.matches % 10 == 0 or self.matches >= self.target
+            return [self.key(pygame.K_RETURN if to_menu else pygame.K_SPACE)]
+        return []
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else 0.0
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="reaction-soak-")
+    game.log_store.open(os.path.join(workdir, "reaction_debug.log"))
+    game.STATS_PATH = os.path.join(workdir, "reaction_stats.json")
+    game.journal.path = os.path.join(workdir, "match_journal.jsonl")
+    game.WAIT_RANGE = (0.0, 0.002)
+    game.GO_HOLD = 0.0
+    game.LATE_PRESS_GRACE = 0.002
+    game.clock = FastClock()
+    game.settings.points_to_win = args.points
+    while game.settings.num_players < args.players:
+        game.settings.add_player()
+
+    script = ScriptedInput(args.matches, args.seed)
+    pygame.event.get = script.get
+
+    samples = []
+    next_sample = 0
+    start = time.perf_counter()
+
+    def take_sample():
+        gc.collect()
+        counts = count_objects()
+        samples.append({
+            "matches": script.matches,
+            "rounds": script.rounds,
+            "elapsed": time.perf_counter() - start,
+            "rss": rss_bytes(),
+            "surfaces": counts["Surface"],
+            # bounded LRU caches (surface atlas); growth there is expected
+            "cached": len(game.atlas.texts) + len(game.atlas.buttons),
+            "objects": counts,
+            "queue_max": script.max_queue,
+            "dequeue_p50": median(script.dequeue_times),
+        })
+        script.max_queue = 0
+        script.dequeue_times = []
+        s = samples[-1]
+        print(f"[{s['elapsed']:7.1f}s] matches={s['matches']:6d} rounds={s['rounds']:7d} "
+              f"rss={s['rss'] / 2**20:7.1f}MB surfaces={s['surfaces']:4d} "
+              f"queue_max={s['queue_max']:3d} dequeue_p50={s['dequeue_p50'] * 1000:6.2f}ms", flush=True)
+
+    # sample between phases, never inside the timed window
+    real_run_phase = game.run_phase
+
+    def sampling_run_phase(name, fn, *a, **kw):
+        nonlocal next_sample
+        if name in ("show_menu", "wait_for_go") and script.matches >= next_sample:
+            take_sample()
+            next_sample = script.matches + args.sample_every
+        return real_run_phase(name, fn, *a, **kw)
+
+    game.run_phase = sampling_run_phase
+    try:
+        game.main()
+    except SoakDone:
+        pass
+    finally:
+        pygame.event.get = script._real_get
+        game.run_phase = real_run_phase
+    if not samples or samples[-1]["matches"] != script.matches:
+        take_sample()
+
+    if args.csv:
+        with open(args.csv, "w", encoding="utf-8") as f:
+            f.write("matches,rounds,elapsed,rss,surfaces,cached,queue_max,dequeue_p50\n")
+            for s in samples:
+                f.write(f"{s['matches']},{s['rounds']},{s['elapsed']:.3f},{s['rss']},"
+                        f"{s['surfaces']},{s['cached']},{s['queue_max']},{s['dequeue_p50']:.6f}\n")
+    return check(samples, args)
+
+
+def check(samples, args):
+    """Compare the first post-warm-up sample with the last; return failures."""
+    if len(samples) < 3:
+        print("not enough samples to judge drift; run more matches")
+        return []
+    base, last = samples[1], samples[-1]
+    failures = []
+    rss_growth = (last["rss"] - base["rss"]) / 2**20
+    if rss_growth > args.max_rss_growth:
+        failures.append(f"RSS grew {rss_growth:.1f}MB (limit {args.max_rss_growth}MB)")
+    surface_growth = (last["surfaces"] - last["cached"]) - (base["surfaces"] - base["cached"])
+    if surface_growth > args.max_surface_growth:
+        failures.append(f"surfaces grew by {surface_growth} (limit {args.max_surface_growth})")
+    for name, count in last["objects"].most_common():
+        growth = count - base["objects"].get(name, 0)
+        if growth > args.max_object_growth:
+            failures.append(f"{name} objects grew by {growth} (limit {args.max_object_growth})")
+    queue_max = max(s["queue_max"] for s in samples)
+    if queue_max > args.max_queue:
+        failures.append(f"event queue reached {queue_max} (limit {args.max_queue})")
+    dequeue_drift = (last["dequeue_p50"] - base["dequeue_p50"]) * 1000
+    if dequeue_drift > args.max_dequeue_drift:
+        failures.append(f"dequeue time p50 drifted {dequeue_drift:.2f}ms (limit {args.max_dequeue_drift}ms)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak-test the full game loop headlessly.")
+    parser.add_argument("--matches", type=int, default=20000)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--points", type=int, default=3, help="points to win each match")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sample-every", type=int, default=500, help="matches between samples")
+    parser.add_argument("--csv", help="write the sample timeline here")
+    parser.add_argument("--max-rss-growth", type=float, default=32.0, help="MB")
+    parser.add_argument("--max-surface-growth", type=int, default=16)
+    parser.add_argument("--max-object-growth", type=int, default=5000)
+    parser.add_argument("--max-queue", type=int, default=32)
+    parser.add_argument("--max-dequeue-drift", type=float, default=2.0, help="ms")
+    args = parser.parse_args(argv)
+
+    failures = run(args)
+    if failures:
+        print("SOAK FAILED")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("SOAK PASSED")
+
+
+if __name__ == "__main__":
+    main()
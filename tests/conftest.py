@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def game(tmp_path):
+    """reaction_duel with its log and journal moved into tmp_path."""
+    import reaction_duel
+    reaction_duel.log_store.open(str(tmp_path / "reaction_debug.log"))
+    reaction_duel.journal.path = str(tmp_path / "match_journal.jsonl")
+    return reaction_duel
@@ -0,0 +1,50 @@
+import pytest
+
+import adjudication
+
+
+@pytest.fixture
+def recorded(game, tmp_path, monkeypatch):
+    """Play a few matches through main() while exporting every round."""
+    import soak
+    monkeypatch.setattr(game, "WAIT_RANGE", (0.0, 0.002))
+    monkeypatch.setattr(game, "GO_HOLD", 0.0)
+    monkeypatch.setattr(game, "LATE_PRESS_GRACE", 0.002)
+    monkeypatch.setattr(game, "clock", soak.FastClock())
+    monkeypatch.setattr(game, "STATS_PATH", str(tmp_path / "reaction_stats.json"))
+    monkeypatch.setattr(game.settings, "points_to_win", 3)
+    out_dir = str(tmp_path / "export")
+    exporter = game.RoundExporter(out_dir, fmt="csv")
+    monkeypatch.setattr(game, "exporter", exporter)
+    final_scores = []
+
+    def match_end(event):
+        final_scores.append(list(event.scores))
+
+    subscriptions = [(game.RoundResolved, game._export_round),
+                     (game.MatchEnded, game._export_match_end),
+                     (game.MatchEnded, match_end)]
+    for event_type, handler in subscriptions:
+        game.events.subscribe(event_type, handler)
+    script = soak.ScriptedInput(4, seed=7, false_start_rate=0.2)
+    monkeypatch.setattr(game.pygame.event, "get", script.get)
+    try:
+        with pytest.raises(soak.SoakDone):
+            game.main()
+    finally:
+        for event_type, handler in subscriptions:
+            game.events.unsubscribe(event_type, handler)
+        exporter.close()
+    return out_dir, final_scores
+
+
+def test_replay_matches_live_scores(recorded):
+    out_dir, final_scores = recorded
+    matches = adjudication.group_matches(adjudication.load_rounds(out_dir))
+    assert len(matches) == len(final_scores) == 4
+    for (_, match), live in zip(sorted(matches), final_scores):
+        winners, scores, played, finished = adjudication.replay_match(match, adjudication.DEFAULT_RULES)
+        assert finished
+        assert played == len(match[2])
+        assert scores == live
+        assert winners == adjudication.match_winners(live)
@@ -0,0 +1,44 @@
+"""Input lag calibration runs: one reference per run, noisy runs discarded."""
+import pytest
+
+
+@pytest.fixture
+def cal(game, tmp_path, monkeypatch):
+    monkeypatch.setattr(game, "CALIBRATION_PATH", str(tmp_path / "input_calibration.json"))
+    return game
+
+
+def test_partial_run_is_discarded(cal):
+    keys = [cal.pygame.K_a, cal.pygame.K_l]
+    profile, reason = cal.save_input_profile({keys[0]: (0.01, 0.002, 20)}, keys)
+    assert profile is None and "not measured" in reason
+
+
+def test_noisy_run_is_discarded(cal):
+    keys = [cal.pygame.K_a, cal.pygame.K_l]
+    measurements = {keys[0]: (0.0, 0.002, 20), keys[1]: (0.02, cal.CALIBRATION_MAX_JITTER * 2, 20)}
+    profile, reason = cal.save_input_profile(measurements, keys)
+    assert profile is None and "too noisy" in reason
+    assert cal.input_offsets == {}
+
+
+def test_offset_applied_only_when_confident(cal):
+    keys = [cal.pygame.K_a, cal.pygame.K_l, cal.pygame.K_q]
+    measurements = {
+        keys[0]: (0.000, 0.002, 20),
+        keys[1]: (0.012, 0.002, 20),  # +12ms, CI ~2ms: applied
+        keys[2]: (0.008, 0.025, 20),  # +8ms, CI ~20ms: not applied
+    }
+    profile, reason = cal.save_input_profile(measurements, keys)
+    assert reason is None
+    assert cal.input_offsets == {keys[1]: pytest.approx(0.012)}
+
+
+def test_runs_are_not_merged(cal, monkeypatch):
+    keys = [cal.pygame.K_a, cal.pygame.K_l]
+    cal.save_input_profile({keys[0]: (0.0, 0.002, 20), keys[1]: (0.012, 0.002, 20)}, keys)
+    assert keys[1] in cal.input_offsets
+    monkeypatch.setattr(cal.time_module, "strftime", lambda fmt: "later-run")
+    other = [cal.pygame.K_q, cal.pygame.K_p]
+    cal.save_input_profile({other[0]: (0.0, 0.002, 20), other[1]: (0.015, 0.002, 20)}, other)
+    assert set(cal.input_offsets) == {other[1]}
@@ -0,0 +1,53 @@
+import json
+
+
+def journal_with_rounds(game, tmp_path, rounds):
+    journal = game.MatchJournal(str(tmp_path / "match_journal.jsonl"))
+    schedule = game.RoundSchedule(42, rounds=4)
+    for round_num in range(1, rounds + 1):
+        journal.record("playing", [round_num, 0], round_num + 1, schedule)
+        journal.commit()
+    return journal
+
+
+def test_latest_skips_torn_final_line(game, tmp_path):
+    journal = journal_with_rounds(game, tmp_path, 3)
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"v":1,"state":"playing","round":9,"sco')
+    snapshot = game.MatchJournal(journal.path).resumable()
+    assert snapshot["round"] == 4
+    assert snapshot["scores"] == [3, 0]
+    assert snapshot["seed"] == 42
+
+
+def test_commit_after_torn_line_stays_readable(game, tmp_path):
+    journal = journal_with_rounds(game, tmp_path, 2)
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"v":1,"sta')
+    resumed = game.MatchJournal(journal.path)
+    resumed.record("playing", [2, 1], 4, game.RoundSchedule(42))
+    resumed.commit()
+    resumed.close()
+    assert game.MatchJournal(journal.path).latest()["scores"] == [2, 1]
+
+
+def test_latest_after_compaction(game, tmp_path, monkeypatch):
+    monkeypatch.setattr(game, "JOURNAL_COMPACT_LINES", 4)
+    journal = journal_with_rounds(game, tmp_path, 7)
+    journal.close()
+    with open(journal.path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert len(lines) < 7
+    assert json.loads(lines[-1])["round"] == 8
+    snapshot = game.MatchJournal(journal.path).resumable()
+    assert snapshot["round"] == 8
+    assert snapshot["scores"] == [7, 0]
+
+
+def test_ended_match_is_not_resumable(game, tmp_path):
+    journal = journal_with_rounds(game, tmp_path, 3)
+    journal.record("ended", [3, 0], 0, None)
+    journal.close()
+    assert game.MatchJournal(journal.path).resumable() is None
@@ -0,0 +1,25 @@
+def test_same_seed_same_schedule(game):
+    a = game.RoundSchedule(1234, rounds=8)
+    b = game.RoundSchedule(1234, rounds=64)
+    # rounds generated on demand match a longer precomputed block
+    assert [a.get(n) for n in range(1, 65)] == [b.get(n) for n in range(1, 65)]
+    c = game.RoundSchedule(1235, rounds=64)
+    assert [c.get(n) for n in range(1, 65)] != [b.get(n) for n in range(1, 65)]
+
+
+def test_new_match_schedule_uses_seed(game, monkeypatch):
+    monkeypatch.setattr(game.settings, "points_to_win", 5)
+    a = game.new_match_schedule(99)
+    b = game.new_match_schedule(99)
+    assert a.seed == b.seed == 99
+    assert list(a.waits) == list(b.waits) and list(a.colors) == list(b.colors)
+
+
+def test_consecutive_trap_cap(game):
+    for seed in range(20):
+        schedule = game.RoundSchedule(seed, rounds=5000, trap_chance=0.9, max_consecutive_traps=2)
+        run = longest = 0
+        for color in schedule.colors:
+            run = run + 1 if color != game.GO_SAFE else 0
+            longest = max(longest, run)
+        assert longest == 2
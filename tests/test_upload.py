@@ -0,0 +1,92 @@
+"""ResultUploader against a real aggregator on loopback."""
+import os
+import shutil
+import socket
+import threading
+
+import pytest
+
+import aggregator
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = aggregator.make_server(str(tmp_path / "results.db"), "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url_of(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/ingest"
+
+
+def stored_rounds(server):
+    return server.RequestHandlerClass.store.stats()["rounds"]
+
+
+def make_uploader(game, url, outbox, cabinet):
+    # a long interval keeps the background thread out of the way
+    uploader = game.ResultUploader(url, str(outbox), cabinet=cabinet, interval=3600)
+    uploader.session = "20261019-120000-1"  # same second, same pid
+    return uploader
+
+
+def add_rounds(uploader, count):
+    for i in range(count):
+        uploader.add("round", {"match": 1, "round": i + 1, "status": "winner", "players": [0],
+                               "reaction_time": 0.2, "trap": False, "scores": [i + 1, 0],
+                               "times": [0.2, 0.3]})
+
+
+def outbox_files(path):
+    return sorted(n for n in os.listdir(path) if n.endswith(".json.gz"))
+
+
+def test_retried_batch_is_not_counted_twice(game, server, tmp_path):
+    outbox = tmp_path / "outbox"
+    uploader = make_uploader(game, url_of(server), outbox, "cab-a")
+    add_rounds(uploader, 5)
+    uploader.seal()
+    name = outbox_files(outbox)[0]
+    # the server got the batch but the acknowledgement was lost
+    shutil.copy(outbox / name, tmp_path / name)
+    assert uploader.send_outbox()
+    shutil.copy(tmp_path / name, outbox / name)
+    assert uploader.send_outbox()
+    assert stored_rounds(server) == 5
+    assert outbox_files(outbox) == []
+    uploader.close()
+
+
+def test_cabinets_with_the_same_session_do_not_collide(game, server, tmp_path):
+    a = make_uploader(game, url_of(server), tmp_path / "a", "cab-a")
+    b = make_uploader(game, url_of(server), tmp_path / "b", "cab-b")
+    for uploader in (a, b):
+        add_rounds(uploader, 3)
+        uploader.seal()
+    assert outbox_files(tmp_path / "a") == outbox_files(tmp_path / "b")
+    assert a.send_outbox() and b.send_outbox()
+    assert stored_rounds(server) == 6
+    a.close()
+    b.close()
+
+
+def test_outbox_drains_after_a_failed_post(game, server, tmp_path):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        dead_port = s.getsockname()[1]
+    outbox = tmp_path / "outbox"
+    uploader = make_uploader(game, f"http://127.0.0.1:{dead_port}/ingest", outbox, "cab-a")
+    add_rounds(uploader, 4)
+    uploader.seal()
+    add_rounds(uploader, 2)
+    uploader.seal()
+    assert not uploader.send_outbox()
+    assert len(outbox_files(outbox)) == 2
+    uploader.url = url_of(server)
+    assert uploader.send_outbox()
+    assert outbox_files(outbox) == []
+    assert stored_rounds(server) == 6
+    uploader.close()